@@ -0,0 +1,103 @@
+-- Acciones compuestas de coger y soltar ficha, ejecutadas dentro del simulador.
+--
+-- Se añade al child script (no threaded) de 'suctionPad' de Domibot.ttt, junto a la función
+-- setEffector que ya existe. Si el script ya tiene sysCall_init o sysCall_actuation, su
+-- contenido se añade al final de las funciones existentes.
+--
+-- DominoRobotController llama a pickAt o placeAt con simxCallScriptFunction (oneshot, sin
+-- esperar respuesta). La secuencia bajar eje Z -> activar/desactivar ventosa -> subir eje Z
+-- avanza en cada paso de simulación y, al terminar, escribe el identificador de la acción en la
+-- señal entera 'domibotAccionFin', que Python lee en streaming. Si la acción falla (el eje Z no
+-- llega a su objetivo antes del timeout o el script da un error) escribe el identificador en
+-- negativo: la señal se escribe siempre, así que la cola de acciones nunca se queda bloqueada.
+--
+-- Parámetros (inInts, inFloats):
+--   inInts[1]   identificador de la acción
+--   inFloats[1] desplazamiento del eje Z para bajar (m)
+--   inFloats[2] margen de asentamiento después de bajar (s)
+--   inFloats[3] margen de la ventosa (s)
+--   inFloats[4] margen de asentamiento después de subir (s)
+--   inFloats[5] tolerancia de llegada de la articulación (m)
+--   inFloats[6] tiempo máximo de cada movimiento del eje Z (s, de simulación)
+
+SENYAL_LISTAS = 'domibotAccionesFicha'
+SENYAL_FIN = 'domibotAccionFin'
+
+local colaAcciones = {}
+local accionEnCurso = nil
+local idEnCurso = nil
+
+function sysCall_init()
+    jointZ = sim.getObjectHandle('Joint3')
+    -- Python comprueba esta señal al conectar para saber si la escena tiene las acciones
+    sim.setIntegerSignal(SENYAL_LISTAS, 1)
+end
+
+function sysCall_actuation()
+    local ok, err = true, nil
+    if not accionEnCurso and #colaAcciones > 0 then
+        local accion = table.remove(colaAcciones, 1)
+        accionEnCurso = coroutine.create(ejecutarAccion)
+        idEnCurso = accion.id
+        ok, err = coroutine.resume(accionEnCurso, accion)
+    elseif accionEnCurso then
+        ok, err = coroutine.resume(accionEnCurso)
+    end
+    if not ok then
+        -- La acción ha fallado por un error del script: se avisa a Python igualmente
+        sim.addLog(sim.verbosity_errors, err)
+        sim.setIntegerSignal(SENYAL_FIN, -idEnCurso)
+    end
+    if accionEnCurso and coroutine.status(accionEnCurso) == 'dead' then
+        accionEnCurso = nil
+    end
+end
+
+local function encolarAccion(inInts, inFloats, activar)
+    table.insert(colaAcciones, {
+        id = inInts[1], activar = activar,
+        bajada = inFloats[1], margenBajada = inFloats[2], margenVentosa = inFloats[3],
+        margenSubida = inFloats[4], tolerancia = inFloats[5], timeout = inFloats[6] or 5.0
+    })
+    return {}, {}, {}, ''
+end
+
+function pickAt(inInts, inFloats, inStrings, inBuffer)
+    return encolarAccion(inInts, inFloats, 1)
+end
+
+function placeAt(inInts, inFloats, inStrings, inBuffer)
+    return encolarAccion(inInts, inFloats, 0)
+end
+
+local function esperar(segundos)
+    local fin = sim.getSimulationTime() + segundos
+    while sim.getSimulationTime() < fin do coroutine.yield() end
+end
+
+-- Devuelve false si el eje Z no llega al objetivo antes de `timeout` segundos de simulación
+local function moverZ(objetivo, tolerancia, timeout)
+    local limite = sim.getSimulationTime() + timeout
+    sim.setJointTargetPosition(jointZ, objetivo)
+    while math.abs(sim.getJointPosition(jointZ) - objetivo) > tolerancia do
+        if sim.getSimulationTime() >= limite then return false end
+        coroutine.yield()
+    end
+    return true
+end
+
+function ejecutarAccion(accion)
+    local inicio = sim.getJointTargetPosition(jointZ)
+    if not moverZ(inicio + accion.bajada, accion.tolerancia, accion.timeout) then
+        -- No ha llegado abajo (p.ej. bloqueado sobre una ficha): no se toca la ventosa y se sube
+        moverZ(inicio, accion.tolerancia, accion.timeout)
+        sim.setIntegerSignal(SENYAL_FIN, -accion.id)
+        return
+    end
+    esperar(accion.margenBajada)
+    setEffector({accion.activar}, {}, {}, '')
+    esperar(accion.margenVentosa)
+    local subido = moverZ(inicio, accion.tolerancia, accion.timeout)
+    esperar(accion.margenSubida)
+    sim.setIntegerSignal(SENYAL_FIN, subido and accion.id or -accion.id)
+end
@@ -85,6 +85,20 @@ class ScaraControllerIntermediary:
             except Exception as e:
                 print(f"\nS'ha produït un error inesperat durant l'execució: {e}")
 
+    def _mover_articulaciones(self, angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0):
+        """
+        Mueve las cuatro articulaciones a través de la cola de movimientos del controlador, de
+        modo que el movimiento se puede fundir con la subida del eje Z de coger/soltar ficha.
+        """
+        cola = self.scara_controller.cua_moviments
+        cola.afegir({
+            self.scara_controller.EIX_BASE: angulo_joint1,
+            self.scara_controller.EIX_ARTICULACIO_SECUNDARIA: angulo_joint2,
+            self.scara_controller.EIX_Z: angulo_joint3,
+            self.scara_controller.EIX_CANELL: angulo_joint4
+        }, velocitat_index=velocitat_index)
+        return cola.executar()
+
     def move_posicion_inicial(self):
         """
         Mueve el robot a una posición para tomar una foto inicial.
@@ -94,7 +108,7 @@ class ScaraControllerIntermediary:
         angulo_joint3 = self.joint_angles['joint3']
         angulo_joint4 = 0
 
-        self.scara_controller.mou_a_posicio_eixos(angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0)
+        self._mover_articulaciones(angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0)
 
         # Actualizar los ángulos del robot
         self.joint_angles['joint1'] = angulo_joint1
@@ -102,7 +116,7 @@ class ScaraControllerIntermediary:
         self.joint_angles['joint3'] = angulo_joint3
         self.joint_angles['joint4'] = angulo_joint4
         
-        time.sleep(1)
+        self.scara_controller.esperar_estabilitzacio("desplacament")
     
     def move_posicion_recta(self):
         """
@@ -113,7 +127,7 @@ class ScaraControllerIntermediary:
         angulo_joint3 = self.joint_angles['joint3']
         angulo_joint4 = 0
 
-        self.scara_controller.mou_a_posicio_eixos(angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0)
+        self._mover_articulaciones(angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0)
 
         # Actualizar los ángulos del robot
         self.joint_angles['joint1'] = angulo_joint1
@@ -121,7 +135,7 @@ class ScaraControllerIntermediary:
         self.joint_angles['joint3'] = angulo_joint3
         self.joint_angles['joint4'] = angulo_joint4
         
-        time.sleep(1)
+        self.scara_controller.esperar_estabilitzacio("desplacament")
     
     def obtener_foto(self):
         print("Obteniendo foto del robot (simulación)...")
@@ -224,7 +238,7 @@ class ScaraControllerIntermediary:
             angulo_joint3 = self.joint_angles['joint3']
             angulo_joint4 = -(angulo_joint1 + angulo_joint2)+rotacion
 
-            self.scara_controller.mou_a_posicio_eixos(angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0)
+            self._mover_articulaciones(angulo_joint1, angulo_joint2, angulo_joint3, angulo_joint4, velocitat_index=0)
 
             # Actualizar los ángulos del robot
             self.joint_angles['joint1'] = angulo_joint1
@@ -238,66 +252,46 @@ class ScaraControllerIntermediary:
         except Exception as e:
             print("❌ Error al resolver cinemática inversa en XY:", e)
 
-        time.sleep(1)
+        self.scara_controller.esperar_estabilitzacio("desplacament")
     
     def coger_ficha(self):
         print("Cogiendo ficha...")
+        self._bajar_y_subir(self.scara_controller.electroiman.activar)
 
-        distancia_de_seguridad = 0.05  # Distancia de seguridad para evitar colisiones
-
-        # Bajamos el robot a una posición segura para coger la ficha
-        self.scara_controller.mou_a_posicio_eixos(
-            self.joint_angles['joint1'],
-            self.joint_angles['joint2'],
-            distancia_de_seguridad,  # Bajamos un poco
-            self.joint_angles['joint4'],
-            velocitat_index=0
-        )
-
-        time.sleep(2)
-
-        self.scara_controller.electroiman.activar()  # Activamos el electroimán para coger la ficha
-        time.sleep(1)
-
-        # Subimos el robot a la posición original
-        self.scara_controller.mou_a_posicio_eixos(
-            self.joint_angles['joint1'],
-            self.joint_angles['joint2'],
-            self.joint_angles['joint3'],  # Volvemos a la altura original
-            self.joint_angles['joint4'],
-            velocitat_index=0
-        )
+    def soltar_ficha(self):
+        print("Soltando ficha...")
+        self._bajar_y_subir(self.scara_controller.electroiman.desactivar)
 
-        time.sleep(2)
+    def _bajar_y_subir(self, accion_electroiman):
+        """
+        Baja hasta la ficha, acciona el electroimán al llegar y vuelve a subir.
 
-    
-    def soltar_ficha(self):
+        La bajada es una parada exacta (el electroimán se acciona cuando el eje Z ha llegado).
+        La subida se deja en marcha con fusión: el siguiente movimiento puede empezar a girar
+        la base cuando el eje Z ha hecho la mitad de la subida.
+        """
         distancia_de_seguridad = 0.05  # Distancia de seguridad para evitar colisiones
+        fusion_subida = 0.5  # Fracción final de la subida que se solapa con el siguiente movimiento
 
-        # Bajamos el robot a una posición segura para coger la ficha
-        self.scara_controller.mou_a_posicio_eixos(
-            self.joint_angles['joint1'],
-            self.joint_angles['joint2'],
-            distancia_de_seguridad,  # Bajamos un poco
-            self.joint_angles['joint4'],
-            velocitat_index=0
-        )
+        eje_z = self.scara_controller.EIX_Z
+        cola = self.scara_controller.cua_moviments
+        margenes = self.scara_controller.marges_estabilitzacio
 
-        time.sleep(2)
+        def accionar_electroiman():
+            # El eje Z ya ha llegado: solo esperamos el margen de asentamiento de la bajada
+            self.scara_controller.esperar_estabilitzacio("baixada")
+            return accion_electroiman()
 
-        self.scara_controller.electroiman.desactivar()  # Desactivamos el electroimán para soltar la ficha
-        time.sleep(1)
+        # Bajamos el robot a una posición segura para coger/soltar la ficha. Al llegar se acciona el
+        # electroimán y se espera el margen configurado para que agarre o suelte la ficha.
+        cola.afegir({eje_z: distancia_de_seguridad}, velocitat_index=0,
+                    accio=accionar_electroiman, espera_s=margenes["electroiman"], nom="bajar")
 
         # Subimos el robot a la posición original
-        self.scara_controller.mou_a_posicio_eixos(
-            self.joint_angles['joint1'],
-            self.joint_angles['joint2'],
-            self.joint_angles['joint3'],  # Volvemos a la altura original
-            self.joint_angles['joint4'],
-            velocitat_index=0
-        )
-
-        time.sleep(2)
+        cola.afegir({eje_z: self.joint_angles['joint3']}, velocitat_index=0,
+                    fusio=fusion_subida, nom="subir")
+
+        return cola.executar(esperar=False)
 
     def disconnect(self):
         print("Desconectando el robot (simulación)...")
@@ -0,0 +1,388 @@
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from .controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+
+class VerificadorPosicio(ABC):
+    """
+    Comprova, després de cada moviment de prova de l'AutoAjustEixos, que l'eix ha arribat
+    realment a l'angle ordenat (sense perdre passos).
+
+    Les subclasses han d'implementar `verificar` (si no, no es poden instanciar) i, si cal,
+    `preparar` (abans de cada moviment) i `recuperar` (després d'una prova fallida, per tornar
+    a tenir una posició coneguda).
+    """
+
+    def preparar(self, controlador: "ScaraController", axis_id: int):
+        """Es crida just abans de cada moviment de prova."""
+        pass
+
+    @abstractmethod
+    def verificar(self, controlador: "ScaraController", axis_id: int, angle_esperat: float) -> bool:
+        """
+        Args:
+            controlador (ScaraController): Controlador que ha fet el moviment.
+            axis_id (int): ID de l'eix provat.
+            angle_esperat (float): Angle de l'articulació on hauria de ser l'eix (graus).
+
+        Returns:
+            bool: True si la posició real coincideix amb l'esperada.
+        """
+
+    def recuperar(self, controlador: "ScaraController", axis_id: int):
+        """Es crida després d'una prova fallida. Per defecte no fa res."""
+        pass
+
+
+class VerificadorModel(VerificadorPosicio):
+    """
+    Verificador amb el model simulat del motor (ModelMotorPasAPas connectat al GPIO virtual).
+
+    Compara el desplaçament real del model amb el que ha comptat el motor durant el moviment
+    de prova. Com que es comparen desplaçaments, no cal corregir res després d'una fallada.
+    """
+
+    def __init__(self, models: Dict[int, "ModelMotorPasAPas"], tolerancia_graus: float = 0.5):
+        """
+        Args:
+            models (Dict[int, ModelMotorPasAPas]): Model de cada eix pas a pas (per ID d'eix).
+            tolerancia_graus (float): Diferència màxima admesa (graus del motor).
+        """
+        if tolerancia_graus < 0:
+            raise ValueError("`tolerancia_graus` ha de ser no negativa.")
+        self.models = models
+        self.tolerancia_graus = tolerancia_graus
+        self._inicis = {} # axis_id -> (graus del motor, graus del model) abans del moviment
+
+    def preparar(self, controlador: "ScaraController", axis_id: int):
+        self._inicis[axis_id] = (controlador.motors[axis_id].obtenir_posicio_graus(),
+                                 self.models[axis_id].obtenir_posicio_graus())
+
+    def verificar(self, controlador: "ScaraController", axis_id: int, angle_esperat: float) -> bool:
+        inici_motor, inici_model = self._inicis.pop(axis_id)
+        desplacament_motor = controlador.motors[axis_id].obtenir_posicio_graus() - inici_motor
+        desplacament_model = self.models[axis_id].obtenir_posicio_graus() - inici_model
+        return abs(desplacament_motor - desplacament_model) <= self.tolerancia_graus
+
+
+class VerificadorCamera(VerificadorPosicio):
+    """
+    Verificador amb una mesura externa de l'angle (p.ex. un fiducial vist per la càmera).
+
+    La mesura la fa la funció `mesurar_angle(axis_id)`, que retorna l'angle real de
+    l'articulació en graus. Després d'una fallada, el comptador de passos del motor es
+    corregeix amb l'angle mesurat.
+    """
+
+    def __init__(self, mesurar_angle: Callable[[int], Optional[float]], tolerancia_graus: float = 1.0):
+        """
+        Args:
+            mesurar_angle (Callable[[int], float]): Retorna l'angle mesurat de l'articulació (graus) o None si no s'ha pogut mesurar.
+            tolerancia_graus (float): Diferència màxima admesa (graus de l'articulació).
+        """
+        if tolerancia_graus < 0:
+            raise ValueError("`tolerancia_graus` ha de ser no negativa.")
+        self.mesurar_angle = mesurar_angle
+        self.tolerancia_graus = tolerancia_graus
+
+    def verificar(self, controlador: "ScaraController", axis_id: int, angle_esperat: float) -> bool:
+        angle_mesurat = self.mesurar_angle(axis_id)
+        if angle_mesurat is None:
+            print(f"AutoAjustEixos: No s'ha pogut mesurar l'angle de l'eix {axis_id}. Es dona la prova per fallida.")
+            return False
+        return abs(angle_mesurat - angle_esperat) <= self.tolerancia_graus
+
+    def recuperar(self, controlador: "ScaraController", axis_id: int):
+        angle_mesurat = self.mesurar_angle(axis_id)
+        if angle_mesurat is None:
+            return
+        motor = controlador.motors[axis_id]
+        angle_motor = controlador._angle_a_motor(axis_id, angle_mesurat)
+        motor.posicio_actual_passos = int(round(angle_motor / 360.0 * motor.passos_per_volta))
+        controlador._sincronitzar_angle_eix(axis_id)
+        print(f"AutoAjustEixos: Posició de l'eix {axis_id} corregida amb la mesura ({angle_mesurat:.2f}°).")
+
+
+class VerificadorOperador(VerificadorPosicio):
+    """
+    Verificador manual: l'operador confirma per consola si l'eix ha arribat a l'angle
+    esperat i, després d'una fallada, torna a col·locar l'eix a mà on el controlador creu que és.
+    """
+
+    def __init__(self, entrada: Callable[[str], str] = input):
+        """
+        Args:
+            entrada (Callable[[str], str]): Funció per llegir la resposta de l'operador.
+        """
+        self.entrada = entrada
+
+    def verificar(self, controlador: "ScaraController", axis_id: int, angle_esperat: float) -> bool:
+        resposta = self.entrada(f"L'eix {axis_id} és a {angle_esperat:.2f}°? [s/n]: ")
+        return resposta.strip().lower() in ("s", "si", "sí", "y", "yes")
+
+    def recuperar(self, controlador: "ScaraController", axis_id: int):
+        self.entrada(f"Col·loca l'eix {axis_id} a {controlador._current_angles[axis_id]:.2f}° i prem Intro.")
+
+
+class ResultatAjust:
+    """
+    Resultat de l'ajust d'un eix. Les velocitats i acceleracions són de l'articulació.
+    """
+
+    def __init__(self, axis_id: int, nom_eix: str):
+        self.axis_id = axis_id
+        self.nom_eix = nom_eix
+        self.velocitat_fiable = None # graus/s més ràpida que ha superat totes les proves
+        self.acceleracio_fiable = None # graus/s² més alta que ha superat totes les proves
+        self.velocitat_config = None # velocitat_fiable amb el factor de seguretat aplicat
+        self.acceleracio_config = None # acceleracio_fiable amb el factor de seguretat aplicat
+        self.proves = 0
+        self.fallades = 0
+
+    @property
+    def ajustat(self) -> bool:
+        return self.velocitat_fiable is not None and self.acceleracio_fiable is not None
+
+    def __repr__(self):
+        if not self.ajustat:
+            return f"ResultatAjust(eix={self.nom_eix}, NO ajustat, proves={self.proves}, fallades={self.fallades})"
+        return (f"ResultatAjust(eix={self.nom_eix}, velocitat={self.velocitat_fiable:.1f}°/s -> {self.velocitat_config:.1f}°/s, "
+                f"acceleracio={self.acceleracio_fiable:.1f}°/s² -> {self.acceleracio_config:.1f}°/s², "
+                f"proves={self.proves}, fallades={self.fallades})")
+
+
+class AutoAjustEixos:
+    """
+    Troba la velocitat i l'acceleració màximes fiables de cada eix pas a pas d'un ScaraController.
+
+    Per a cada eix es fan moviments de prova d'anada i tornada i, després de cada tram, un
+    `VerificadorPosicio` comprova que l'eix ha arribat on toca. L'ajust es fa en dues etapes
+    amb cerca binària:
+        1. Velocitat, amb l'acceleració actual de l'eix.
+        2. Acceleració, amb la velocitat trobada a l'etapa 1.
+    Un valor és fiable si supera `repeticions` proves seguides. Els límits trobats es
+    multipliquen per `factor_seguretat` abans d'escriure'ls a la configuració del controlador:
+    la llista `speeds` s'escala mantenint les proporcions i `acceleration` es fixa.
+
+    El servomotor del canell no es pot ajustar (no té retroalimentació de passos) i s'omet.
+    """
+
+    def __init__(self,
+                 controlador: "ScaraController",
+                 verificador: VerificadorPosicio,
+                 velocitats: tuple = (10.0, 240.0),
+                 acceleracions: tuple = (90.0, 5760.0),
+                 amplitud_graus: float = 45.0,
+                 repeticions: int = 2,
+                 resolucio_relativa: float = 0.05,
+                 factor_seguretat: float = 0.8):
+        """
+        Args:
+            controlador (ScaraController): Controlador amb els eixos a ajustar.
+            verificador (VerificadorPosicio): Comprova la posició real després de cada moviment de prova.
+            velocitats (tuple): Interval (mínim, màxim) de velocitats a provar (graus/s de l'articulació).
+            acceleracions (tuple): Interval (mínim, màxim) d'acceleracions a provar (graus/s² de l'articulació).
+            amplitud_graus (float): Recorregut mínim de cada tram de prova (graus de l'articulació). S'allarga
+                                    si cal perquè la rampa arribi a la velocitat de creuer.
+            repeticions (int): Proves d'anada i tornada que ha de superar un valor per ser fiable.
+            resolucio_relativa (float): La cerca s'atura quan l'interval és més petit que aquesta fracció del valor fiable.
+            factor_seguretat (float): Fracció (0-1] dels límits trobats que s'escriu a la configuració.
+        """
+        if not 0 < velocitats[0] < velocitats[1]:
+            raise ValueError("`velocitats` ha de ser un interval (mínim, màxim) de valors positius.")
+        if not 0 < acceleracions[0] < acceleracions[1]:
+            raise ValueError("`acceleracions` ha de ser un interval (mínim, màxim) de valors positius.")
+        if amplitud_graus <= 0:
+            raise ValueError("`amplitud_graus` ha de ser positiva.")
+        if repeticions < 1:
+            raise ValueError("`repeticions` ha de ser com a mínim 1.")
+        if not 0 < resolucio_relativa < 1:
+            raise ValueError("`resolucio_relativa` ha de ser entre 0 i 1.")
+        if not 0 < factor_seguretat <= 1:
+            raise ValueError("`factor_seguretat` ha de ser entre 0 (exclòs) i 1.")
+
+        self.controlador = controlador
+        self.verificador = verificador
+        self.velocitats = velocitats
+        self.acceleracions = acceleracions
+        self.amplitud_graus = amplitud_graus
+        self.repeticions = repeticions
+        self.resolucio_relativa = resolucio_relativa
+        self.factor_seguretat = factor_seguretat
+        self.resultats = {} # axis_id -> ResultatAjust
+
+    # --- Ajust ---
+
+    def ajustar(self, eixos: List[int] = None) -> Dict[int, ResultatAjust]:
+        """
+        Ajusta els eixos indicats (per defecte tots els pas a pas) i n'actualitza la configuració
+        del controlador. Els eixos que no s'han pogut ajustar conserven la configuració actual.
+
+        Args:
+            eixos (List[int]): (Opcional) IDs dels eixos a ajustar.
+
+        Returns:
+            Dict[int, ResultatAjust]: Resultat de cada eix ajustat.
+        """
+        controlador = self.controlador
+        if eixos is None:
+            eixos = [axis_id for axis_id, motor in controlador.motors.items() if isinstance(motor, MotorPasAPas)]
+
+        # Les proves no es poden barrejar amb moviments encuats ni amb altres moviments síncrons
+        controlador.esperar_moviments()
+        controlador.cua_moviments.esperar()
+        with controlador._lock_moviment:
+            for axis_id in eixos:
+                nom_eix = controlador._get_axis_name(axis_id)
+                if not isinstance(controlador.motors[axis_id], MotorPasAPas):
+                    print(f"AutoAjustEixos: L'eix '{nom_eix}' no és un motor pas a pas. S'omet.")
+                    continue
+                if controlador.senyal_cancelacio.activa:
+                    print(f"AutoAjustEixos: Ajust aturat ({controlador.senyal_cancelacio.motiu}).")
+                    break
+                resultat = self._ajustar_eix(axis_id)
+                self.resultats[axis_id] = resultat
+                if resultat.ajustat:
+                    self._aplicar(resultat)
+                print(f"AutoAjustEixos: {resultat}")
+        return self.resultats
+
+    def _ajustar_eix(self, axis_id: int) -> ResultatAjust:
+        controlador = self.controlador
+        nom_eix = controlador._get_axis_name(axis_id)
+        resultat = ResultatAjust(axis_id, nom_eix)
+        angle_inicial = controlador._current_angles[axis_id]
+        print(f"\n--- AutoAjustEixos: Ajustant l'eix '{nom_eix}' des de {angle_inicial:.2f}° ---")
+
+        # Etapa 1: velocitat amb l'acceleració actual de l'eix
+        acceleracio_actual = self._acceleracio_actual(axis_id)
+        resultat.velocitat_fiable = self._cercar(lambda velocitat: self._provar(axis_id, velocitat, acceleracio_actual, resultat),
+                                                 *self.velocitats)
+        if resultat.velocitat_fiable is not None:
+            # Etapa 2: acceleració amb la velocitat trobada
+            resultat.acceleracio_fiable = self._cercar(lambda acceleracio: self._provar(axis_id, resultat.velocitat_fiable, acceleracio, resultat),
+                                                       *self.acceleracions)
+        if resultat.ajustat:
+            resultat.velocitat_config = resultat.velocitat_fiable * self.factor_seguretat
+            resultat.acceleracio_config = resultat.acceleracio_fiable * self.factor_seguretat
+
+        # Tornar a l'angle inicial a la velocitat més lenta de la configuració
+        velocitat_lenta = controlador._get_speed_value(axis_id, -1) * controlador.config[nom_eix]["reduction_ratio"]
+        controlador._executar_moviment_eix(axis_id, angle_inicial, velocitat_lenta)
+        return resultat
+
+    def _cercar(self, provar: Callable[[float], bool], minim: float, maxim: float) -> Optional[float]:
+        """Cerca binària del valor més alt de [minim, maxim] que supera `provar`. None si ni el mínim el supera."""
+        if not provar(minim):
+            return None
+        if provar(maxim):
+            return maxim
+        fiable, fallit = minim, maxim
+        while fallit - fiable > self.resolucio_relativa * fiable:
+            if self.controlador.senyal_cancelacio.activa:
+                break
+            candidat = (fiable + fallit) / 2
+            if provar(candidat):
+                fiable = candidat
+            else:
+                fallit = candidat
+        return fiable
+
+    def _provar(self, axis_id: int, velocitat: float, acceleracio: Optional[float], resultat: ResultatAjust) -> bool:
+        """
+        Fa `repeticions` moviments d'anada i tornada amb una velocitat i acceleració (de l'articulació)
+        i verifica la posició després de cada tram.
+        """
+        controlador = self.controlador
+        nom_eix = controlador._get_axis_name(axis_id)
+        reduction_ratio = controlador.config[nom_eix]["reduction_ratio"]
+        perfil_rampa = controlador.motors[axis_id].perfil_rampa
+
+        for _ in range(self.repeticions):
+            angle_origen = controlador._current_angles[axis_id]
+            for angle_objectiu in (self._angle_prova(axis_id, velocitat, acceleracio), angle_origen):
+                if controlador.senyal_cancelacio.activa:
+                    return False
+                resultat.proves += 1
+                self.verificador.preparar(controlador, axis_id)
+                completat = controlador._executar_moviment_eix(axis_id, angle_objectiu, velocitat * reduction_ratio,
+                                                               acceleracio * reduction_ratio if acceleracio else 0, perfil_rampa)
+                if not (completat and self.verificador.verificar(controlador, axis_id, angle_objectiu)):
+                    resultat.fallades += 1
+                    print(f"AutoAjustEixos: Eix '{nom_eix}' FALLA a {velocitat:.1f}°/s, "
+                          f"{acceleracio or 0:.1f}°/s² (tram cap a {angle_objectiu:.2f}°).")
+                    self.verificador.recuperar(controlador, axis_id)
+                    return False
+        print(f"AutoAjustEixos: Eix '{nom_eix}' correcte a {velocitat:.1f}°/s, {acceleracio or 0:.1f}°/s².")
+        return True
+
+    def _angle_prova(self, axis_id: int, velocitat: float, acceleracio: Optional[float]) -> float:
+        """
+        Extrem del tram de prova: cap al límit amb més recorregut lliure, prou lluny perquè la rampa
+        arribi a la velocitat de creuer (les dues rampes juntes recorren v²/a).
+        """
+        controlador = self.controlador
+        angle_actual = controlador._current_angles[axis_id]
+        limit_min, limit_max = controlador.config[controlador._get_axis_name(axis_id)]["limits"]
+        recorregut = self.amplitud_graus
+        if acceleracio:
+            recorregut = max(recorregut, 1.2 * velocitat ** 2 / acceleracio)
+        if limit_max - angle_actual >= angle_actual - limit_min:
+            return min(angle_actual + recorregut, limit_max)
+        return max(angle_actual - recorregut, limit_min)
+
+    def _acceleracio_actual(self, axis_id: int) -> Optional[float]:
+        """Acceleració de l'articulació que utilitza ara l'eix (configuració o rampa per defecte del motor)."""
+        config_eix = self.controlador.config[self.controlador._get_axis_name(axis_id)]
+        acceleracio = config_eix.get("acceleration")
+        if acceleracio is None and self.controlador.motors[axis_id].acceleracio_graus_per_segon2:
+            acceleracio = self.controlador.motors[axis_id].acceleracio_graus_per_segon2 / config_eix["reduction_ratio"]
+        return acceleracio
+
+    # --- Configuració ---
+
+    def _aplicar(self, resultat: ResultatAjust):
+        """Escala `speeds` perquè la més ràpida sigui la velocitat ajustada i fixa `acceleration`."""
+        config_eix = self.controlador.config[resultat.nom_eix]
+        escala = resultat.velocitat_config / max(config_eix["speeds"])
+        config_eix["speeds"] = [round(velocitat * escala, 1) for velocitat in config_eix["speeds"]]
+        config_eix["acceleration"] = round(resultat.acceleracio_config, 1)
+
+    def desar_config(self, ruta_fitxer: str) -> bool:
+        """
+        Escriu la configuració dels eixos ajustats a la secció `scara_controller.config` d'un
+        fitxer de configuració JSON (p.ex. info/robot_config.json). La resta del fitxer no es toca.
+
+        Args:
+            ruta_fitxer (str): Ruta del fitxer de configuració.
+
+        Returns:
+            bool: True si s'ha desat, False en cas d'error.
+        """
+        try:
+            with open(ruta_fitxer, "r", encoding="utf-8") as f:
+                config_data = json.load(f)
+            config_eixos = config_data["scara_controller"]["config"]
+            for resultat in self.resultats.values():
+                if resultat.ajustat:
+                    config_eixos[resultat.nom_eix] = self.controlador.config[resultat.nom_eix]
+            temporal = ruta_fitxer + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.write(_json_compacte(config_data) + "\n")
+            os.replace(temporal, ruta_fitxer)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"ERROR: No s'ha pogut desar la configuració ajustada a '{ruta_fitxer}': {e}")
+            return False
+        print(f"AutoAjustEixos: Configuració ajustada desada a '{ruta_fitxer}'.")
+        return True
+
+
+def _json_compacte(dades) -> str:
+    """JSON indentat com robot_config.json: les llistes de valors simples en una sola línia."""
+    text = json.dumps(dades, indent=2, ensure_ascii=False)
+    return re.sub(r"\[\s*([^\[\]{}]*?)\s*\]",
+                  lambda m: "[" + ", ".join(valor.strip() for valor in m.group(1).split(",")) + "]",
+                  text)
@@ -0,0 +1,336 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+from .PlanificadorTrajectories import temps_minim, velocitat_per_durada
+
+TOLERANCIA_GRAUS = 1e-6 # Per sota d'aquesta diferència es considera que un eix no es mou
+
+class PuntTrajectoria:
+    """
+    Punt de pas d'una trajectòria encuada a una CuaMoviments.
+
+    `fusio` (0-1) és la fracció final del segment que arriba a aquest punt durant la qual ja
+    pot començar el segment següent (p.ex. 0.5: la base comença a girar quan l'eix Z ha fet
+    la meitat de la pujada). 0 vol dir aturada exacta al punt. Un punt amb `accio` (p.ex.
+    activar l'electroimant) o amb `espera_s` sempre és una aturada exacta: l'acció s'executa
+    quan tots els eixos hi han arribat i després s'espera `espera_s` segons.
+    """
+
+    def __init__(self, angles: Dict[int, float], velocitat_index: int = -2, fusio: float = 0.0,
+                 accio: Callable[[], bool] = None, espera_s: float = 0.0, nom: str = None):
+        """
+        Args:
+            angles (Dict[int, float]): Angle objectiu per ID d'eix. Els eixos absents es queden on són.
+            velocitat_index (int): Índex de la velocitat a utilitzar (com a `mou_a_posicio_eixos`).
+            fusio (float): Fracció (0-1) del segment que es pot solapar amb el següent.
+            accio (Callable): (Opcional) Funció a executar en arribar al punt. Si retorna False, la trajectòria es dona per fallida.
+            espera_s (float): Temps d'espera (segons) després d'arribar al punt i executar l'acció.
+            nom (str): (Opcional) Nom descriptiu del punt.
+        """
+        if not 0.0 <= fusio <= 1.0:
+            raise ValueError("`fusio` ha de ser entre 0 i 1.")
+        if espera_s < 0:
+            raise ValueError("`espera_s` ha de ser no negatiu.")
+        self.angles = dict(angles)
+        self.velocitat_index = velocitat_index
+        self.fusio = fusio
+        self.accio = accio
+        self.espera_s = espera_s
+        self.nom = nom
+
+    @property
+    def aturada_exacta(self) -> bool:
+        return self.fusio <= 0 or self.accio is not None or self.espera_s > 0
+
+    def __repr__(self):
+        return (f"PuntTrajectoria({self.nom + ', ' if self.nom else ''}angles={self.angles}, "
+                f"fusio={self.fusio}, accio={'sí' if self.accio else 'no'}, espera={self.espera_s}s)")
+
+
+class OrdrePlanificada:
+    """
+    Moviment d'un eix dins de la línia de temps d'una CuaMoviments.
+
+    `inici` i `fi` són instants absoluts (`time.perf_counter()`) planificats. Una mateixa ordre
+    pot cobrir diversos segments quan l'eix continua en el mateix sentit sense aturar-se.
+    """
+
+    def __init__(self, eix: int, angle_inicial: float, angle_objectiu: float, inici: float, fi: float,
+                 parametres: tuple, velocitat_maxima: float = None, acceleracio: float = None):
+        self.eix = eix
+        self.angle_inicial = angle_inicial
+        self.angle_objectiu = angle_objectiu
+        self.inici = inici
+        self.fi = fi
+        self.parametres = parametres # (velocitat, acceleració, perfil) en unitats del motor
+        self.velocitat_maxima = velocitat_maxima # graus/s de l'articulació (None pel servomotor)
+        self.acceleracio = acceleracio # graus/s² de l'articulació
+        self.enviada = False
+
+    def __repr__(self):
+        return (f"OrdrePlanificada(eix={self.eix}, {self.angle_inicial:.2f}° -> {self.angle_objectiu:.2f}°, "
+                f"t=[{self.inici:.3f}, {self.fi:.3f}])")
+
+
+class SegmentPlanificat:
+    """Segment de la trajectòria que porta al `punt`, amb les ordres dels eixos que s'hi mouen."""
+
+    def __init__(self, punt: PuntTrajectoria, inici: float, durada: float, ordres: Dict[int, OrdrePlanificada]):
+        self.punt = punt
+        self.inici = inici
+        self.durada = durada
+        self.ordres = ordres
+
+    @property
+    def fi(self) -> float:
+        return self.inici + self.durada
+
+    def __repr__(self):
+        return f"SegmentPlanificat(punt={self.punt.nom or self.punt.angles}, inici={self.inici:.3f}, durada={self.durada:.3f}s, eixos={sorted(self.ordres)})"
+
+
+class CuaMoviments:
+    """
+    Cua de moviments del ScaraController amb fusió de segments i planificació anticipada.
+
+    Els punts de pas s'encuen amb `afegir` i s'executen amb `executar`. En lloc d'aturar tots
+    els eixos a cada punt, la cua construeix una línia de temps per eix:
+        * Un segment pot començar quan el segment anterior ha fet la fracció `1 - fusio`
+          del seu recorregut, sempre que els eixos que mou ja estiguin lliures.
+        * Si un eix continua en el mateix sentit després d'un punt amb fusió, els dos trams
+          s'uneixen en un sol perfil (no desaccelera fins a zero al punt de pas), sempre que
+          els límits de velocitat i acceleració ho permetin.
+    Les ordres de cada eix s'envien al seu treballador (`ScaraController.executor_eixos`) amb
+    l'instant d'inici planificat. Els punts amb aturada exacta (acció o espera) esperen que
+    tots els eixos hi hagin arribat.
+
+    Si l'últim punt executat té fusió i `executar(esperar=False)`, els moviments següents que
+    s'encuin mentre encara s'està movent s'hi fusionen (p.ex. la pujada de l'eix Z després
+    d'agafar una fitxa amb el gir cap al següent objectiu).
+    """
+
+    def __init__(self, controlador: "ScaraController"):
+        self.controlador = controlador
+        self._punts = deque()
+        self._lock = threading.RLock()
+        self._barreres = [] # Barreres dels segments enviats que encara no s'han esperat
+        self._segment_obert = None # Últim segment enviat, si el següent s'hi pot fusionar
+        self._fi_eixos = {} # eix -> instant planificat en què acaba l'última ordre enviada
+        self._angles_previstos = None # eix -> angle en acabar les ordres enviades
+
+    # --- Encuament de punts ---
+
+    def afegir(self, angles: Dict[int, float], velocitat_index: int = -2, fusio: float = 0.0,
+               accio: Callable[[], bool] = None, espera_s: float = 0.0, nom: str = None) -> PuntTrajectoria:
+        """
+        Afegeix un punt de pas a la cua (vegeu `PuntTrajectoria`). No mou res fins a `executar`.
+
+        Returns:
+            PuntTrajectoria: El punt encuat.
+        """
+        return self.afegir_punt(PuntTrajectoria(angles, velocitat_index, fusio, accio, espera_s, nom))
+
+    def afegir_punt(self, punt: PuntTrajectoria) -> PuntTrajectoria:
+        for eix in punt.angles:
+            if eix not in self.controlador.motors:
+                raise ValueError(f"L'eix {eix} no existeix al ScaraController.")
+        with self._lock:
+            self._punts.append(punt)
+        return punt
+
+    def punts_pendents(self) -> List[PuntTrajectoria]:
+        """Retorna els punts encuats que encara no s'han planificat ni enviat."""
+        with self._lock:
+            return list(self._punts)
+
+    def buidar(self):
+        """Descarta els punts encuats que encara no s'han enviat."""
+        with self._lock:
+            self._punts.clear()
+
+    # --- Planificació ---
+
+    def planificar(self, punts: List[PuntTrajectoria], angles_inicials: Dict[int, float], inici: float,
+                   fi_eixos: Dict[int, float] = None, segment_anterior: SegmentPlanificat = None) -> List[SegmentPlanificat]:
+        """
+        Construeix la línia de temps dels punts sense moure res.
+
+        Args:
+            punts (List[PuntTrajectoria]): Punts de pas en ordre.
+            angles_inicials (Dict[int, float]): Angle de partida de cada eix.
+            inici (float): Instant (perf_counter) a partir del qual es pot començar.
+            fi_eixos (Dict[int, float]): Instant en què cada eix queda lliure (ordres ja enviades).
+            segment_anterior (SegmentPlanificat): Segment ja enviat amb el qual es pot fusionar el primer punt.
+
+        Returns:
+            List[SegmentPlanificat]: Un segment per punt.
+
+        Raises:
+            IndexError: Si l'índex de velocitat no és vàlid per a algun eix.
+        """
+        angles = dict(angles_inicials)
+        fi_eixos = dict(fi_eixos or {})
+        tipus_perfil = self.controlador.planificador.tipus_perfil
+        anterior = segment_anterior
+        segments = []
+
+        for punt in punts:
+            objectius = {eix: angle for eix, angle in punt.angles.items() if abs(angle - angles[eix]) > TOLERANCIA_GRAUS}
+            pla = self.controlador.planificar_moviment(objectius, punt.velocitat_index, angles_inicials=angles)
+            parametres = self.controlador._parametres_eixos(pla, objectius, punt.velocitat_index)
+
+            # Eixos que poden allargar la seva ordre del segment anterior (mateix sentit, encara no enviada)
+            fusionables = {}
+            if anterior is not None and not anterior.punt.aturada_exacta:
+                for eix, objectiu in objectius.items():
+                    previa = anterior.ordres.get(eix)
+                    if (previa is not None and not previa.enviada and eix in pla.perfils
+                            and (objectiu - previa.angle_objectiu) * (previa.angle_objectiu - previa.angle_inicial) > 0):
+                        fusionables[eix] = previa
+
+            inici_segment = inici if anterior is None else max(inici, anterior.inici + anterior.durada * (1 - anterior.punt.fusio))
+            for eix in objectius:
+                if eix in fusionables:
+                    # L'eix fusionat ha de poder recórrer els dos trams seguits dins dels seus límits.
+                    # Sempre acaba abans que aturant-se al punt de pas i tornant a arrencar.
+                    previa = fusionables[eix]
+                    durada_fusio = temps_minim(abs(objectius[eix] - previa.angle_inicial),
+                                               min(previa.velocitat_maxima, self.controlador._get_speed_value(eix, punt.velocitat_index)),
+                                               pla.perfils[eix].acceleracio, tipus_perfil)
+                    inici_segment = max(inici_segment, previa.inici + durada_fusio - pla.durada)
+                else:
+                    inici_segment = max(inici_segment, fi_eixos.get(eix, inici))
+            fi_segment = inici_segment + pla.durada
+
+            ordres = {}
+            for eix, objectiu in objectius.items():
+                reduction_ratio = self.controlador.config[self.controlador._get_axis_name(eix)]["reduction_ratio"]
+                if eix in fusionables:
+                    ordre = fusionables[eix]
+                    distancia = abs(objectiu - ordre.angle_inicial)
+                    velocitat = velocitat_per_durada(distancia, fi_segment - ordre.inici, ordre.acceleracio, tipus_perfil)
+                    ordre.angle_objectiu = objectiu
+                    ordre.fi = fi_segment
+                    ordre.velocitat_maxima = min(ordre.velocitat_maxima, self.controlador._get_speed_value(eix, punt.velocitat_index))
+                    ordre.parametres = (velocitat * reduction_ratio, ordre.parametres[1], ordre.parametres[2])
+                else:
+                    perfil = pla.perfils.get(eix)
+                    ordre = OrdrePlanificada(eix, angles[eix], objectiu, inici_segment, fi_segment, parametres[eix],
+                                             self.controlador._get_speed_value(eix, punt.velocitat_index) if perfil else None,
+                                             perfil.acceleracio if perfil else None)
+                ordres[eix] = ordre
+                fi_eixos[eix] = fi_segment
+
+            segment = SegmentPlanificat(punt, inici_segment, pla.durada, ordres)
+            segments.append(segment)
+            angles.update(punt.angles)
+            anterior = segment
+
+        return segments
+
+    # --- Execució ---
+
+    def executar(self, esperar: bool = True) -> bool:
+        """
+        Planifica i envia tots els punts encuats.
+
+        Args:
+            esperar (bool): Si és True, bloqueja fins que acaben tots els moviments. Si és False,
+                            retorna quan s'han enviat (després de l'última aturada exacta), de
+                            manera que els punts que s'encuin després s'hi poden fusionar.
+
+        Returns:
+            bool: True si tots els moviments (i accions) esperats han acabat amb èxit.
+        """
+        with self._lock:
+            correcte = True
+            while self._punts:
+                tram = []
+                while self._punts:
+                    punt = self._punts.popleft()
+                    tram.append(punt)
+                    if punt.aturada_exacta:
+                        break
+
+                for punt in tram:
+                    for eix, angle in punt.angles.items():
+                        if not self.controlador._validate_angle(eix, angle):
+                            print(f"ERROR: Angle {angle:.2f}° fora de límits al punt {punt}. Es descarta la resta de la trajectòria.")
+                            self._punts.clear()
+                            return False
+
+                if self._segment_obert is None and not self._barreres:
+                    # Sense moviments en curs: es parteix de la posició real del controlador
+                    self._angles_previstos = dict(enumerate(self.controlador._current_angles))
+                    self._fi_eixos = {}
+                try:
+                    segments = self.planificar(tram, self._angles_previstos, time.perf_counter(),
+                                               self._fi_eixos, self._segment_obert)
+                except IndexError as e:
+                    print(f"ERROR: {e}. Es descarta la resta de la trajectòria.")
+                    self._punts.clear()
+                    return False
+                self._enviar(segments)
+
+                darrer = tram[-1]
+                if darrer.aturada_exacta:
+                    correcte = self.esperar() and correcte
+                    if self.controlador.senyal_cancelacio.activa:
+                        print(f"CuaMoviments: Trajectòria interrompuda ({self.controlador.senyal_cancelacio.motiu}). Es descarten els punts restants.")
+                        self._punts.clear()
+                        return False
+                    if darrer.accio is not None and darrer.accio() is False:
+                        print(f"ADVERTÈNCIA: L'acció del punt {darrer} ha fallat.")
+                        correcte = False
+                    if darrer.espera_s > 0:
+                        self.controlador.senyal_cancelacio.esperar(darrer.espera_s)
+                else:
+                    self._segment_obert = segments[-1]
+
+            if esperar:
+                correcte = self.esperar() and correcte
+            return correcte
+
+    def _enviar(self, segments: List[SegmentPlanificat]):
+        executor = self.controlador.executor_eixos
+        for segment in segments:
+            noves = {eix: ordre for eix, ordre in segment.ordres.items() if not ordre.enviada}
+            if not noves:
+                continue
+            print(f"CuaMoviments: {segment}")
+            for ordre in noves.values():
+                ordre.enviada = True
+            self._barreres.append(executor.encuar({eix: (self._moure_eix_a_instant, (ordre,)) for eix, ordre in noves.items()}))
+        for segment in segments:
+            self._angles_previstos.update(segment.punt.angles)
+            for eix, ordre in segment.ordres.items():
+                self._fi_eixos[eix] = ordre.fi
+
+    def _moure_eix_a_instant(self, ordre: OrdrePlanificada) -> bool:
+        """L'executa el treballador de l'eix: espera l'instant planificat i mou l'eix."""
+        self.controlador.senyal_cancelacio.esperar(ordre.inici - time.perf_counter())
+        return self.controlador._executar_moviment_eix(ordre.eix, ordre.angle_objectiu, *ordre.parametres)
+
+    def esperar(self, timeout: float = None) -> bool:
+        """
+        Bloqueja fins que acaben tots els moviments enviats.
+
+        Returns:
+            bool: True si tots han acabat amb èxit (False si algun ha fallat o s'esgota el `timeout`).
+        """
+        with self._lock:
+            barreres = list(self._barreres)
+            limit = None if timeout is None else time.perf_counter() + timeout
+            for barrera in barreres:
+                restant = None if limit is None else max(0.0, limit - time.perf_counter())
+                if not barrera.esperar(restant):
+                    return False
+            self._barreres = [barrera for barrera in self._barreres if barrera not in barreres]
+            self._segment_obert = None
+            return all(barrera.correcte() for barrera in barreres)
+
+    def en_curs(self) -> bool:
+        """True si hi ha moviments enviats que encara no han acabat."""
+        return any(not barrera.completada() for barrera in self._barreres)
@@ -0,0 +1,202 @@
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+class OrdreEix:
+    """
+    Ordre pendent o en curs per a un treballador d'eix: una crida `funcio(*args)` que
+    retorna un booleà d'èxit, associada a la barrera del moviment del qual forma part.
+    """
+
+    def __init__(self, eix: int, funcio: Callable[..., bool], args: tuple, barrera: "BarreraMoviment", descripcio: str = None):
+        self.eix = eix
+        self.funcio = funcio
+        self.args = args
+        self.barrera = barrera
+        self.descripcio = descripcio or getattr(funcio, "__name__", "ordre")
+
+    def __repr__(self):
+        return f"OrdreEix(eix={self.eix}, {self.descripcio}{self.args}, moviment={self.barrera.id})"
+
+
+class BarreraMoviment:
+    """
+    Barrera de finalització d'un moviment repartit entre diversos treballadors d'eix.
+
+    Cada treballador hi registra el resultat de la seva ordre; la barrera s'obre quan
+    han acabat totes. `esperar()` bloqueja fins llavors.
+    """
+
+    def __init__(self, id_moviment: int, eixos: List[int]):
+        self.id = id_moviment
+        self.eixos = list(eixos)
+        self.resultats = {} # eix -> bool
+        self._condicio = threading.Condition()
+
+    def completar(self, eix: int, resultat: bool):
+        """Registra el resultat d'un eix i desperta els que esperen si ja han acabat tots."""
+        with self._condicio:
+            self.resultats[eix] = resultat
+            if self.completada():
+                self._condicio.notify_all()
+
+    def completada(self) -> bool:
+        return len(self.resultats) >= len(self.eixos)
+
+    def esperar(self, timeout: float = None) -> bool:
+        """Bloqueja fins que tots els eixos han acabat. Retorna False si s'esgota el `timeout`."""
+        with self._condicio:
+            return self._condicio.wait_for(self.completada, timeout)
+
+    def correcte(self) -> bool:
+        """True si tots els eixos han acabat amb èxit."""
+        return self.completada() and all(self.resultats.values())
+
+    def __repr__(self):
+        return f"BarreraMoviment(id={self.id}, acabats={len(self.resultats)}/{len(self.eixos)})"
+
+
+class ExecutorMoviments:
+    """
+    Executor de moviments amb un fil treballador permanent per eix.
+
+    Cada eix té la seva cua d'ordres; el treballador les executa en ordre i en registra el
+    resultat a la barrera del moviment. Un moviment de diversos eixos (`encuar`) posa una
+    ordre a la cua de cada eix amb una barrera comuna, de manera que el que espera (`esperar`
+    o `BarreraMoviment.esperar`) es desperta quan han acabat tots.
+
+    Els fils es creen una sola vegada (`iniciar`), així cada moviment s'estalvia crear i
+    unir fils. Les cues es poden inspeccionar amb `ordres_pendents()`.
+    """
+
+    def __init__(self, eixos: Dict[int, str], nom: str = "executor_moviments"):
+        """
+        Args:
+            eixos (Dict[int, str]): Nom de cada eix per ID. Es crea un treballador per eix.
+            nom (str): Nom identificatiu de l'executor (prefix dels fils).
+        """
+        if not eixos:
+            raise ValueError("L'ExecutorMoviments necessita com a mínim un eix.")
+        self.nom = nom
+        self.eixos = dict(eixos)
+
+        self._cues = {eix: deque() for eix in self.eixos}
+        self._en_curs = {eix: None for eix in self.eixos} # eix -> OrdreEix que s'està executant
+        self._ids = itertools.count(1)
+        self._condicio = threading.Condition()
+        self._fils = {}
+        self._en_marxa = False
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.aturar()
+
+    def iniciar(self):
+        """Arrenca un fil treballador per eix (si no estan ja en marxa)."""
+        with self._condicio:
+            if self._en_marxa:
+                return
+            self._en_marxa = True
+        for eix, nom_eix in self.eixos.items():
+            fil = threading.Thread(target=self._bucle, args=(eix,), name=f"{self.nom}_{nom_eix}", daemon=True)
+            self._fils[eix] = fil
+            fil.start()
+        print(f"ExecutorMoviments '{self.nom}': {len(self._fils)} treballadors d'eix iniciats.")
+
+    def aturar(self):
+        """
+        Atura els treballadors. Les ordres en curs acaben; les encuades es descarten i les
+        seves barreres es completen amb resultat False.
+        """
+        with self._condicio:
+            if not self._en_marxa:
+                return
+            self._en_marxa = False
+            descartades = [ordre for cua in self._cues.values() for ordre in cua]
+            for cua in self._cues.values():
+                cua.clear()
+            self._condicio.notify_all()
+        for ordre in descartades:
+            ordre.barrera.completar(ordre.eix, False)
+        for fil in self._fils.values():
+            if fil is not threading.current_thread():
+                fil.join()
+        self._fils.clear()
+        print(f"ExecutorMoviments '{self.nom}': Aturat ({len(descartades)} ordres descartades).")
+
+    # --- Encuament d'ordres ---
+
+    def encuar(self, ordres: Dict[int, Tuple[Callable[..., bool], tuple]]) -> BarreraMoviment:
+        """
+        Encua una ordre per eix com un sol moviment.
+
+        Args:
+            ordres (Dict[int, Tuple[Callable, tuple]]): Per a cada ID d'eix, la funció a executar i els seus arguments.
+
+        Returns:
+            BarreraMoviment: Barrera que s'obre quan acaben totes les ordres del moviment.
+        """
+        for eix in ordres:
+            if eix not in self._cues:
+                raise ValueError(f"L'eix {eix} no està registrat a l'ExecutorMoviments '{self.nom}'.")
+        barrera = BarreraMoviment(next(self._ids), list(ordres))
+        with self._condicio:
+            if not self._en_marxa:
+                print(f"ERROR: L'ExecutorMoviments '{self.nom}' no està en marxa. No es pot encuar el moviment.")
+                for eix in ordres:
+                    barrera.completar(eix, False)
+                return barrera
+            for eix, (funcio, args) in ordres.items():
+                self._cues[eix].append(OrdreEix(eix, funcio, tuple(args), barrera))
+            self._condicio.notify_all()
+        return barrera
+
+    def executar(self, ordres: Dict[int, Tuple[Callable[..., bool], tuple]], timeout: float = None) -> bool:
+        """
+        Encua un moviment i espera que acabi.
+
+        Returns:
+            bool: True si tots els eixos han acabat amb èxit (False si alguna ordre falla o s'esgota el `timeout`).
+        """
+        barrera = self.encuar(ordres)
+        return barrera.esperar(timeout) and barrera.correcte()
+
+    def ordres_pendents(self) -> Dict[int, List[OrdreEix]]:
+        """Retorna, per a cada eix, l'ordre en curs (si n'hi ha) seguida de les encuades."""
+        with self._condicio:
+            return {eix: ([self._en_curs[eix]] if self._en_curs[eix] else []) + list(cua)
+                    for eix, cua in self._cues.items()}
+
+    def esperar_tots(self, timeout: float = None) -> bool:
+        """Bloqueja fins que totes les cues queden buides i cap treballador té una ordre en curs."""
+        with self._condicio:
+            return self._condicio.wait_for(
+                lambda: not any(self._cues.values()) and not any(self._en_curs.values()), timeout)
+
+    # --- Fil treballador ---
+
+    def _bucle(self, eix: int):
+        cua = self._cues[eix]
+        while True:
+            with self._condicio:
+                while self._en_marxa and not cua:
+                    self._condicio.wait()
+                if not self._en_marxa:
+                    return
+                ordre = cua.popleft()
+                self._en_curs[eix] = ordre
+
+            try:
+                resultat = bool(ordre.funcio(*ordre.args))
+            except Exception as e:
+                print(f"ERROR: L'ordre {ordre} ha fallat: {e}")
+                resultat = False
+
+            with self._condicio:
+                self._en_curs[eix] = None
+                self._condicio.notify_all()
+            ordre.barrera.completar(eix, resultat)
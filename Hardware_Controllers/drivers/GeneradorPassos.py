@@ -0,0 +1,417 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+from .controladors.BackendGPIO import GPIO
+
+from .controladors.MotorPasAPasNoNormalitzat import MotorPasAPas, EstadistiquesMoviment, MARGE_ESPERA_ACTIVA_NS
+
+class MovimentEncuat:
+    """
+    Moviment d'un motor pendent o en curs dins del GeneradorPassos.
+
+    `instants` són els temps (segons, relatius a l'inici del moviment) en què s'ha de fer
+    cada pas, i `durada` l'instant en què el moviment es dona per acabat (després de l'últim delay).
+    Si el senyal de cancel·lació del motor l'interromp, `interromput` és True i `passos_fets`
+    indica fins on ha arribat.
+    """
+
+    def __init__(self, motor: MotorPasAPas, direccio: bool, instants: List[float], durada: float, grup: int = None):
+        self.motor = motor
+        self.direccio = direccio
+        self.instants = instants
+        self.durada = durada
+        self.grup = grup
+        self.passos_fets = 0
+        self.interromput = False
+        self.estadistiques = EstadistiquesMoviment(len(instants), durada)
+        self.completat = threading.Event()
+
+    @property
+    def passos(self) -> int:
+        return len(self.instants)
+
+    def esperar(self, timeout: float = None) -> bool:
+        """Bloqueja fins que el moviment acaba. Retorna False si s'esgota el `timeout`."""
+        return self.completat.wait(timeout)
+
+    def __repr__(self):
+        return (f"MovimentEncuat(motor={self.motor.nom}, passos={self.passos_fets}/{self.passos}, "
+                f"direccio={'endavant' if self.direccio else 'enrere'}, durada={self.durada:.3f}s, grup={self.grup})")
+
+
+class GeneradorPassos:
+    """
+    Generador de passos multiplexat: un sol fil planificador mou tots els motors pas a pas.
+
+    Cada motor té la seva cua de moviments. Els passos de tots els motors s'ordenen en una
+    única línia de temps (cua de prioritat per instant), i els passos que vencen dins de la
+    mateixa finestra de tick s'escriuen als GPIO amb una sola crida `GPIO.output(pins, valors)`.
+    Així s'evita tenir un fil per eix competint pel GIL i pel planificador del sistema.
+
+    Els moviments coordinats (`moure_coordinat`) reparteixen els passos dels eixos secundaris
+    sobre els ticks de l'eix principal amb l'algorisme de Bresenham (DDA), de manera que
+    tots els eixos comencen i acaben alhora.
+
+    S'utilitza com a gestor de context (`with GeneradorPassos(...) as generador:`), que
+    arrenca i atura el fil planificador.
+    """
+
+    def __init__(self, motors: List[MotorPasAPas], nom: str = "generador_passos", finestra_tick_s: float = 0.0002):
+        """
+        Args:
+            motors (List[MotorPasAPas]): Motors que controlarà el generador.
+            nom (str): Nom identificatiu del generador.
+            finestra_tick_s (float): Passos que vencen dins d'aquesta finestra (segons) s'agrupen en una sola escriptura.
+        """
+        if not motors:
+            raise ValueError("El GeneradorPassos necessita com a mínim un motor.")
+        self.nom = nom
+        self.motors = list(motors)
+        self.finestra_tick_ns = int(finestra_tick_s * 1e9)
+
+        self._cues = {motor.nom: deque() for motor in self.motors}
+        self._actius = {} # nom del motor -> (MovimentEncuat, inici_ns, índex del següent pas)
+        self._posicio_prevista = {} # nom del motor -> posició (passos) en acabar els moviments encuats
+        self._events = [] # Cua de prioritat de (instant_ns, seq, nom del motor)
+        self._seq = itertools.count()
+        self._grups = itertools.count(1)
+        self._condicio = threading.Condition()
+        self._fil = None
+        self._en_marxa = False
+
+        print(f"GeneradorPassos '{self.nom}' inicialitzat per als motors: {[motor.nom for motor in self.motors]}.")
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.aturar()
+
+    def iniciar(self):
+        """Arrenca el fil planificador (si no està ja en marxa)."""
+        with self._condicio:
+            if self._en_marxa:
+                print(f"GeneradorPassos '{self.nom}': Ja està en marxa.")
+                return
+            self._en_marxa = True
+        self._fil = threading.Thread(target=self._bucle, name=self.nom, daemon=True)
+        self._fil.start()
+        print(f"GeneradorPassos '{self.nom}': Fil planificador iniciat.")
+
+    def aturar(self):
+        """
+        Atura el fil planificador. Els moviments pendents es descarten i es desenergitzen
+        les bobines de tots els motors.
+        """
+        with self._condicio:
+            if not self._en_marxa:
+                return
+            self._en_marxa = False
+            self._condicio.notify_all()
+        if self._fil is not None:
+            self._fil.join()
+            self._fil = None
+
+        with self._condicio:
+            descartats = list(self._actius.values())
+            self._actius.clear()
+            self._events.clear()
+            for cua in self._cues.values():
+                descartats.extend((moviment, None, None) for moviment in cua)
+                cua.clear()
+            self._posicio_prevista.clear()
+        for moviment, _, _ in descartats:
+            moviment.completat.set()
+        for motor in self.motors:
+            motor._desenergitzar_pins()
+        print(f"GeneradorPassos '{self.nom}': Aturat ({len(descartats)} moviments descartats).")
+
+    # --- Encuament de moviments ---
+
+    def _comprovar_motor(self, motor: MotorPasAPas) -> bool:
+        if motor.nom not in self._cues:
+            raise ValueError(f"El motor '{motor.nom}' no està registrat al GeneradorPassos '{self.nom}'.")
+        if not motor._is_setup:
+            print(f"ERROR: El motor '{motor.nom}' no està configurat. No es pot encuar el moviment.")
+            return False
+        return True
+
+    @staticmethod
+    def _instants_des_de_delays(delays: List[float]) -> Tuple[List[float], float]:
+        """Converteix una llista de delays (pas i espera) en instants de cada pas i durada total."""
+        instants = list(itertools.accumulate([0.0] + delays[:-1]))[:len(delays)]
+        return instants, sum(delays)
+
+    def encuar_moviment(self, motor: MotorPasAPas, passos: int, direccio: bool, velocitat_graus_per_segon: float,
+                        acceleracio_graus_per_segon2: float = None, perfil_rampa: str = None) -> MovimentEncuat:
+        """
+        Afegeix un moviment relatiu a la cua del motor. No bloqueja.
+
+        Args:
+            motor (MotorPasAPas): Motor a moure.
+            passos (int): Nombre de passos (valor absolut).
+            direccio (bool): Direcció del moviment.
+            velocitat_graus_per_segon (float): Velocitat de creuer.
+            acceleracio_graus_per_segon2 (float): Acceleració de la rampa (None per la del motor, 0 sense rampa).
+            perfil_rampa (str): 'trapezoidal' o 'scurve' (None per la del motor).
+
+        Returns:
+            MovimentEncuat: El moviment encuat, o None si el motor no està configurat.
+        """
+        if not self._comprovar_motor(motor):
+            return None
+        if not isinstance(passos, int) or passos < 0:
+            raise ValueError("`passos` ha de ser un enter no negatiu.")
+        moviment = self._crear_moviment(motor, passos, direccio, velocitat_graus_per_segon, acceleracio_graus_per_segon2, perfil_rampa)
+        self._encuar([moviment])
+        return moviment
+
+    def encuar_posicions(self, ordres: List[Tuple[MotorPasAPas, float, float, float, str]]) -> Dict[str, MovimentEncuat]:
+        """
+        Encua moviments a posicions absolutes (graus del motor) per a diversos motors.
+        Si hi ha més d'un motor, tots els moviments comencen en el mateix tick.
+
+        Args:
+            ordres: Llista de (motor, graus_objectiu, velocitat_graus_per_segon, acceleracio_graus_per_segon2, perfil_rampa).
+
+        Returns:
+            Dict[str, MovimentEncuat]: Moviment encuat per nom de motor.
+        """
+        moviments = {}
+        with self._condicio:
+            for motor, graus_objectiu, velocitat, acceleracio, perfil in ordres:
+                if not self._comprovar_motor(motor):
+                    return {}
+                posicio_inicial = self._posicio_prevista.get(motor.nom, motor.posicio_actual_passos)
+                passos_objectiu = round(graus_objectiu / 360.0 * motor.passos_per_volta)
+                diferencia = passos_objectiu - posicio_inicial
+                direccio = MotorPasAPas.DIRECCIO_ENDAVANT if diferencia >= 0 else MotorPasAPas.DIRECCIO_ENRERE
+                moviments[motor.nom] = self._crear_moviment(motor, abs(diferencia), direccio, velocitat, acceleracio, perfil)
+            self._encuar(list(moviments.values()))
+        return moviments
+
+    def moure_coordinat(self, moviments: Dict[MotorPasAPas, Tuple[int, bool]], velocitat_graus_per_segon: float,
+                        acceleracio_graus_per_segon2: float = None, perfil_rampa: str = None) -> Dict[str, MovimentEncuat]:
+        """
+        Encua un moviment coordinat (interpolació lineal en espai de passos): l'eix amb més
+        passos marca el ritme amb el seu perfil, i els altres fan els seus passos en els
+        mateixos ticks segons l'algorisme de Bresenham. Tots comencen i acaben alhora.
+
+        Args:
+            moviments: Diccionari motor -> (passos, direccio).
+            velocitat_graus_per_segon (float): Velocitat de creuer de l'eix principal.
+            acceleracio_graus_per_segon2 (float): Acceleració de l'eix principal.
+            perfil_rampa (str): Forma de la rampa de l'eix principal.
+
+        Returns:
+            Dict[str, MovimentEncuat]: Moviment encuat per nom de motor.
+        """
+        for motor in moviments:
+            if not self._comprovar_motor(motor):
+                return {}
+        if not moviments:
+            return {}
+
+        principal = max(moviments, key=lambda motor: moviments[motor][0])
+        passos_principal = moviments[principal][0]
+        if acceleracio_graus_per_segon2 is None:
+            acceleracio_graus_per_segon2 = principal.acceleracio_graus_per_segon2
+        if perfil_rampa is None:
+            perfil_rampa = principal.perfil_rampa
+        delays = principal._calcular_programa_delays(passos_principal, velocitat_graus_per_segon, acceleracio_graus_per_segon2, perfil_rampa)
+        instants_principal, durada = self._instants_des_de_delays(delays)
+
+        resultat = {}
+        for motor, (passos, direccio) in moviments.items():
+            if motor is principal:
+                instants = instants_principal
+            else:
+                # DDA de Bresenham: l'eix secundari fa un pas cada cop que l'error acumulat supera els passos del principal
+                instants = []
+                error = 0
+                for instant in instants_principal:
+                    error += passos
+                    if error >= passos_principal:
+                        error -= passos_principal
+                        instants.append(instant)
+            resultat[motor.nom] = MovimentEncuat(motor, direccio, instants, durada)
+
+        self._encuar(list(resultat.values()))
+        return resultat
+
+    def _crear_moviment(self, motor, passos, direccio, velocitat, acceleracio, perfil) -> MovimentEncuat:
+        if acceleracio is None:
+            acceleracio = motor.acceleracio_graus_per_segon2
+        if perfil is None:
+            perfil = motor.perfil_rampa
+        delays = motor._calcular_programa_delays(passos, velocitat, acceleracio, perfil)
+        instants, durada = self._instants_des_de_delays(delays)
+        return MovimentEncuat(motor, direccio, instants, durada)
+
+    def _encuar(self, moviments: List[MovimentEncuat]):
+        with self._condicio:
+            grup = next(self._grups) if len(moviments) > 1 else None
+            for moviment in moviments:
+                nom = moviment.motor.nom
+                moviment.grup = grup
+                self._cues[nom].append(moviment)
+                posicio = self._posicio_prevista.get(nom, moviment.motor.posicio_actual_passos)
+                self._posicio_prevista[nom] = posicio + (moviment.passos if moviment.direccio else -moviment.passos)
+                print(f"GeneradorPassos '{self.nom}': Encuat {moviment}.")
+            self._condicio.notify_all()
+
+    # --- Consultes ---
+
+    def moviments_pendents(self) -> Dict[str, List[MovimentEncuat]]:
+        """Retorna, per cada motor, el moviment en curs (si n'hi ha) seguit dels encuats."""
+        with self._condicio:
+            pendents = {}
+            for nom, cua in self._cues.items():
+                llista = [self._actius[nom][0]] if nom in self._actius else []
+                llista.extend(cua)
+                pendents[nom] = llista
+            return pendents
+
+    def esperar_tots(self, timeout: float = None) -> bool:
+        """Bloqueja fins que no queda cap moviment pendent. Retorna False si s'esgota el `timeout`."""
+        with self._condicio:
+            return self._condicio.wait_for(lambda: not self._actius and not any(self._cues.values()), timeout)
+
+    # --- Fil planificador ---
+
+    def _activar_moviments(self, ara_ns: int):
+        """Posa en marxa els moviments al capdavant de les cues dels motors aturats."""
+        for nom, cua in self._cues.items():
+            if nom in self._actius or not cua:
+                continue
+            moviment = cua[0]
+            senyal = moviment.motor.senyal_cancelacio
+            if senyal is not None and senyal.activa:
+                # Cancel·lació activa: els moviments encuats del motor es descarten sense començar
+                while cua:
+                    descartat = cua.popleft()
+                    descartat.interromput = True
+                    descartat.completat.set()
+                self._posicio_prevista.pop(nom, None)
+                print(f"GeneradorPassos '{self.nom}': Moviments encuats de '{nom}' descartats ({senyal.motiu}).")
+                continue
+            if moviment.grup is not None:
+                # Un grup només arrenca quan tots els seus motors el tenen al capdavant i estan lliures
+                membres = [n for n, c in self._cues.items() if c and c[0].grup == moviment.grup]
+                total_grup = sum(1 for c in self._cues.values() for m in c if m.grup == moviment.grup)
+                if len(membres) != total_grup or any(n in self._actius for n in membres):
+                    continue
+            else:
+                membres = [nom]
+            for membre in membres:
+                moviment_membre = self._cues[membre].popleft()
+                moviment_membre.motor._registrar_inici_moviment()
+                self._actius[membre] = (moviment_membre, ara_ns, 0)
+                self._programar_seguent_event(membre)
+
+    def _programar_seguent_event(self, nom: str):
+        moviment, inici_ns, index = self._actius[nom]
+        if index < moviment.passos:
+            instant = moviment.instants[index]
+        else:
+            instant = moviment.durada # Event de final de moviment
+        heapq.heappush(self._events, (inici_ns + int(instant * 1e9), next(self._seq), nom))
+
+    def _esperar(self, segons: float):
+        """Espera alliberant el lock. Amb el rellotge virtual, l'espera només avança el temps simulat."""
+        if GPIO.rellotge_virtual_actiu:
+            time.sleep(segons)
+        else:
+            self._condicio.wait(segons)
+
+    def _bucle(self):
+        while True:
+            with self._condicio:
+                if not self._en_marxa:
+                    break
+                self._activar_moviments(time.perf_counter_ns())
+                if not self._events:
+                    self._condicio.wait()
+                    continue
+                deadline_ns = self._events[0][0]
+                restant_ns = deadline_ns - time.perf_counter_ns()
+                if restant_ns > MARGE_ESPERA_ACTIVA_NS:
+                    # Es dorm fins a 1 ms abans del deadline; un nou moviment encuat pot despertar el fil abans
+                    self._esperar((restant_ns - MARGE_ESPERA_ACTIVA_NS) / 1e9)
+                    continue
+                espera_activa = restant_ns > self.finestra_tick_ns
+                if espera_activa and GPIO.rellotge_virtual_actiu:
+                    time.sleep((restant_ns - self.finestra_tick_ns) / 1e9)
+                    continue
+
+            if espera_activa:
+                # Espera activa del darrer tram fora del lock, per no bloquejar qui encua moviments
+                while time.perf_counter_ns() < deadline_ns - self.finestra_tick_ns:
+                    pass
+                continue
+
+            with self._condicio:
+                if not self._en_marxa:
+                    break
+                # Tots els events que vencen dins la finestra de tick s'escriuen en una sola crida
+                ara_ns = time.perf_counter_ns()
+                limit_ns = ara_ns + self.finestra_tick_ns
+                pins = []
+                valors = []
+                acabats = []
+                escrits = set()
+                ajornats = []
+                while self._events and self._events[0][0] <= limit_ns:
+                    event = heapq.heappop(self._events)
+                    deadline_ns, _, nom = event
+                    if nom in escrits:
+                        # Un motor només pot fer un pas per escriptura (si no, es perdria el patró anterior):
+                        # si va endarrerit, el següent pas passa al proper tick
+                        ajornats.append(event)
+                        continue
+                    escrits.add(nom)
+                    moviment, inici_ns, index = self._actius[nom]
+                    motor = moviment.motor
+                    pins.extend(motor.pins_in)
+                    if index < moviment.passos and motor.senyal_cancelacio is not None and motor.senyal_cancelacio.activa:
+                        # Interromput: s'atura en aquest tick (com a molt un període de pas després de la cancel·lació)
+                        moviment.interromput = True
+                        index = moviment.passos
+                    if index < moviment.passos:
+                        valors.extend(motor._avancar_pas(moviment.direccio))
+                        moviment.passos_fets += 1
+                        moviment.estadistiques.registrar_pas(ara_ns - deadline_ns)
+                        self._actius[nom] = (moviment, inici_ns, index + 1)
+                        self._programar_seguent_event(nom)
+                    else:
+                        # Final del moviment: desenergitzar les bobines
+                        valors.extend([GPIO.LOW] * motor.num_pins_control)
+                        del self._actius[nom]
+                        moviment.estadistiques.tancar(ara_ns - inici_ns)
+                        acabats.append(moviment)
+                for event in ajornats:
+                    heapq.heappush(self._events, event)
+
+            if pins:
+                try:
+                    GPIO.output(pins, valors)
+                except Exception as e:
+                    print(f"ERROR: GeneradorPassos '{self.nom}' no ha pogut escriure els pins {pins}: {e}")
+            if acabats:
+                with self._condicio:
+                    for moviment in acabats:
+                        if moviment.interromput:
+                            print(f"GeneradorPassos '{self.nom}': Moviment de '{moviment.motor.nom}' INTERROMPUT "
+                                  f"({moviment.motor.senyal_cancelacio.motiu}) a {moviment.motor.posicio_actual_passos} passos. {moviment.estadistiques}")
+                        else:
+                            print(f"GeneradorPassos '{self.nom}': Moviment de '{moviment.motor.nom}' completat. {moviment.estadistiques}")
+                        moviment.motor._registrar_posicio()
+                        moviment.completat.set()
+                        if not self._cues[moviment.motor.nom]:
+                            self._posicio_prevista.pop(moviment.motor.nom, None)
+                    self._condicio.notify_all()
@@ -1,10 +1,7 @@
 import threading
 
-# Intentem importar RPi.GPIO de manera segura
-#try:
-import RPi.GPIO as GPIO
-#except ImportError:
-#    GPIO = None # Si no està disponible, posem GPIO a None per evitar errors
+# Backend GPIO compartit per tots els drivers (RPi.GPIO real o GPIO virtual, vegeu BackendGPIO)
+from .controladors.BackendGPIO import GPIO
 
 class GestorInstancies:
     _instancia = None
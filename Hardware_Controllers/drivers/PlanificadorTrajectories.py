@@ -0,0 +1,184 @@
+import math
+from typing import Dict, Optional
+
+class PerfilMoviment:
+    """
+    Perfil de velocitat d'un sol eix per a un moviment punt a punt.
+
+    El perfil pot ser:
+        * 'constant': sense rampa (velocitat constant durant tot el moviment).
+        * 'trapezoidal': acceleració constant, creuer i desacceleració constant.
+        * 'scurve': rampes sinusoïdals (acceleració suau, sense salts). L'acceleració de pic
+                    és la mateixa que la de la trapezoidal; la mitjana n'és 2/π.
+
+    Les unitats són les de l'eix (graus de l'articulació, graus/s, graus/s²).
+    """
+
+    TIPUS_VALIDS = ('constant', 'trapezoidal', 'scurve')
+
+    def __init__(self, distancia: float, velocitat: float, acceleracio: Optional[float], tipus: str = 'trapezoidal'):
+        """
+        Args:
+            distancia (float): Distància a recórrer (valor absolut, graus).
+            velocitat (float): Velocitat de creuer del perfil (graus/s).
+            acceleracio (float | None): Acceleració de pic (graus/s²). None o 0 vol dir perfil constant.
+            tipus (str): 'trapezoidal' o 'scurve'. S'ignora si no hi ha acceleració.
+        """
+        if tipus not in self.TIPUS_VALIDS:
+            raise ValueError(f"Tipus de perfil desconegut: '{tipus}'. Valors vàlids: {self.TIPUS_VALIDS}.")
+        if distancia < 0:
+            raise ValueError("La distància d'un perfil ha de ser no negativa.")
+
+        self.distancia = distancia
+        self.velocitat = velocitat
+        self.acceleracio = acceleracio if acceleracio else None
+        self.tipus = tipus if self.acceleracio else 'constant'
+
+        if self.distancia == 0 or self.velocitat <= 0:
+            self.temps_rampa = 0.0
+            self.durada = 0.0
+        elif self.tipus == 'constant':
+            self.temps_rampa = 0.0
+            self.durada = self.distancia / self.velocitat
+        else:
+            acc_mitjana = acceleracio_mitjana(self.acceleracio, self.tipus)
+            self.temps_rampa = self.velocitat / acc_mitjana
+            distancia_rampes = self.velocitat * self.temps_rampa # Les dues rampes juntes
+            self.durada = 2 * self.temps_rampa + (self.distancia - distancia_rampes) / self.velocitat
+
+    def velocitat_mitjana(self) -> float:
+        """Retorna la velocitat mitjana del perfil (distància / durada)."""
+        if self.durada <= 0:
+            return 0.0
+        return self.distancia / self.durada
+
+    def velocitat_a(self, t: float) -> float:
+        """
+        Retorna la velocitat instantània del perfil a l'instant `t` (segons des de l'inici).
+        """
+        if t < 0 or t > self.durada:
+            return 0.0
+        if self.tipus == 'constant':
+            return self.velocitat
+        t_rampa = min(t, self.durada - t)
+        if t_rampa >= self.temps_rampa:
+            return self.velocitat
+        fraccio = t_rampa / self.temps_rampa
+        if self.tipus == 'scurve':
+            return self.velocitat * (1 - math.cos(math.pi * fraccio)) / 2
+        return self.velocitat * fraccio
+
+    def __repr__(self):
+        return (f"PerfilMoviment(tipus={self.tipus}, distancia={self.distancia:.2f}, "
+                f"velocitat={self.velocitat:.2f}, acceleracio={self.acceleracio}, durada={self.durada:.3f}s)")
+
+
+class PlaMoviment:
+    """
+    Resultat de la planificació d'un moviment coordinat: un perfil per eix i la durada comuna.
+    """
+
+    def __init__(self, perfils: Dict[int, PerfilMoviment], durada: float):
+        self.perfils = perfils
+        self.durada = durada
+
+    def __repr__(self):
+        return f"PlaMoviment(durada={self.durada:.3f}s, eixos={sorted(self.perfils.keys())})"
+
+
+def acceleracio_mitjana(acceleracio: float, tipus: str) -> float:
+    """
+    Retorna l'acceleració mitjana d'una rampa. En una rampa sinusoïdal ('scurve'),
+    v(t) = V·(1 - cos(πt/T))/2, el pic és πV/(2T) i la mitjana V/T: 2/π de l'acceleració de pic.
+    """
+    return acceleracio * 2 / math.pi if tipus == 'scurve' else acceleracio
+
+
+def temps_minim(distancia: float, velocitat_max: float, acceleracio_max: Optional[float], tipus: str = 'trapezoidal') -> float:
+    """
+    Calcula el temps mínim per recórrer `distancia` respectant els límits de velocitat i acceleració.
+
+    Returns:
+        float: Temps mínim en segons (0 si la distància és 0).
+    """
+    if distancia <= 0:
+        return 0.0
+    if velocitat_max <= 0:
+        raise ValueError("La velocitat màxima ha de ser positiva.")
+    if not acceleracio_max:
+        return distancia / velocitat_max
+
+    acc = acceleracio_mitjana(acceleracio_max, tipus)
+    if distancia <= velocitat_max ** 2 / acc:
+        # Perfil triangular: no s'arriba a la velocitat màxima
+        return 2 * math.sqrt(distancia / acc)
+    return distancia / velocitat_max + velocitat_max / acc
+
+
+def velocitat_per_durada(distancia: float, durada: float, acceleracio: Optional[float], tipus: str = 'trapezoidal') -> float:
+    """
+    Calcula la velocitat de creuer perquè un perfil amb l'acceleració donada
+    recorri `distancia` exactament en `durada` segons.
+
+    Args:
+        durada (float): Ha de ser >= temps_minim(...) per a aquest eix.
+    """
+    if distancia <= 0 or durada <= 0:
+        return 0.0
+    if not acceleracio:
+        return distancia / durada
+
+    acc = acceleracio_mitjana(acceleracio, tipus)
+    # d = v*T - v²/a  ->  v = (a*T - sqrt(a²T² - 4ad)) / 2
+    discriminant = (acc * durada) ** 2 - 4 * acc * distancia
+    if discriminant < 0:
+        # Només passa per errors d'arrodoniment quan la durada és exactament el mínim (perfil triangular)
+        discriminant = 0.0
+    return (acc * durada - math.sqrt(discriminant)) / 2
+
+
+class PlanificadorTrajectories:
+    """
+    Planificador de trajectòries coordinades per a diversos eixos.
+
+    Calcula, a partir dels límits de velocitat i acceleració de cada eix, el temps mínim
+    factible perquè TOTS els eixos arribin alhora, i el perfil de cada eix (trapezoidal o
+    'scurve') que recorre la seva distància exactament en aquest temps.
+    """
+
+    def __init__(self, tipus_perfil: str = 'trapezoidal'):
+        if tipus_perfil not in ('trapezoidal', 'scurve'):
+            raise ValueError("`tipus_perfil` ha de ser 'trapezoidal' o 'scurve'.")
+        self.tipus_perfil = tipus_perfil
+
+    def planificar(self,
+                   distancies: Dict[int, float],
+                   velocitats_max: Dict[int, float],
+                   acceleracions_max: Dict[int, Optional[float]] = None,
+                   durada_minima: float = 0.0) -> PlaMoviment:
+        """
+        Planifica un moviment sincronitzat.
+
+        Args:
+            distancies (Dict[int, float]): Distància (valor absolut) a recórrer per cada eix.
+            velocitats_max (Dict[int, float]): Velocitat màxima de cada eix.
+            acceleracions_max (Dict[int, float | None]): Acceleració màxima de cada eix (None = sense rampa).
+            durada_minima (float): Cota inferior de la durada (p.ex. per a eixos amb temps fix, com un servo).
+
+        Returns:
+            PlaMoviment: Perfils per eix i durada comuna del moviment.
+        """
+        acceleracions_max = acceleracions_max or {}
+
+        durada = max(durada_minima, 0.0)
+        for eix, distancia in distancies.items():
+            durada = max(durada, temps_minim(abs(distancia), velocitats_max[eix], acceleracions_max.get(eix), self.tipus_perfil))
+
+        perfils = {}
+        for eix, distancia in distancies.items():
+            distancia = abs(distancia)
+            acceleracio = acceleracions_max.get(eix)
+            velocitat = velocitat_per_durada(distancia, durada, acceleracio, self.tipus_perfil)
+            perfils[eix] = PerfilMoviment(distancia, velocitat, acceleracio, self.tipus_perfil)
+
+        return PlaMoviment(perfils, durada)
@@ -1,9 +1,110 @@
 from typing import Tuple, Dict, Any, List
 import time
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError, TimeoutError as FuturesTimeoutError
+from concurrent.futures import wait as esperar_futurs
 from .controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
 from .controladors.Servomotor import Servomotor
 from .controladors.Electroiman import Electroiman
+from .controladors.SenyalCancelacio import SenyalCancelacio
+from .PlanificadorTrajectories import PlanificadorTrajectories, PlaMoviment
+from .GeneradorPassos import GeneradorPassos, MovimentEncuat
+from .ExecutorMoviments import ExecutorMoviments, OrdreEix
+from .CuaMoviments import CuaMoviments
+from .AutoAjustEixos import AutoAjustEixos, VerificadorPosicio, ResultatAjust
+
+class FuturMoviment(Future):
+    """
+    Future d'un moviment asíncron del ScaraController (vegeu `mou_a_posicio_eixos_async`).
+
+    El resultat és el mateix booleà que retorna el moviment síncron. A més de l'API de
+    `concurrent.futures.Future` (`result`, `done`, `cancel`, `add_done_callback`...), permet
+    consultar el progrés real de cada eix mentre el braç es mou.
+
+    `cancel()` d'un moviment encuat el descarta (queda cancel·lat). El d'un moviment en curs
+    l'interromp amb el senyal de cancel·lació del controlador: els eixos s'aturen on són (com a
+    molt un període de pas després), el resultat del futur és False i `interromput` és True.
+    """
+
+    def __init__(self, controlador: "ScaraController", target_angles: Dict[int, float]):
+        super().__init__()
+        self._controlador = controlador
+        self.target_angles = dict(target_angles)
+        self.durada_planificada = None
+        self._posicions_inicials = None # Posició inicial de cada eix en graus del motor
+        self._inici = None
+        self.interromput = False
+
+    def _iniciar(self, durada_planificada: float = None):
+        """Marca l'inici real del moviment (el crida el controlador quan el moviment comença)."""
+        self._posicions_inicials = {axis_id: self._controlador._posicio_motor(axis_id) for axis_id in self.target_angles}
+        self.durada_planificada = durada_planificada
+        self._inici = time.perf_counter()
+
+    def cancel(self) -> bool:
+        """Cancel·la el moviment si és encuat o l'interromp si està en curs (vegeu la classe)."""
+        if super().cancel():
+            return True
+        if self.running():
+            return self._controlador._interrompre_moviment(self)
+        return False
+
+    def esperar(self, timeout: float = None) -> bool:
+        """
+        Bloqueja fins que el moviment acaba.
+
+        Returns:
+            bool: Resultat del moviment. False si s'ha cancel·lat o si s'esgota el `timeout`.
+        """
+        try:
+            return self.result(timeout)
+        except (CancelledError, FuturesTimeoutError):
+            return False
+
+    def progres_eixos(self) -> Dict[int, float]:
+        """
+        Retorna la fracció (0-1) del recorregut feta per cada eix, a partir de la posició real
+        dels motors pas a pas. El servomotor no informa de la seva posició: passa de 0 a 1 en acabar.
+        """
+        if self.done() and not self.cancelled() and not self.interromput:
+            return {axis_id: 1.0 for axis_id in self.target_angles}
+        if self._posicions_inicials is None:
+            return {axis_id: 0.0 for axis_id in self.target_angles}
+
+        progres = {}
+        for axis_id, target_angle in self.target_angles.items():
+            if not isinstance(self._controlador.motors[axis_id], MotorPasAPas):
+                progres[axis_id] = 0.0
+                continue
+            inicial = self._posicions_inicials[axis_id]
+            distancia = self._controlador._angle_a_motor(axis_id, target_angle) - inicial
+            if abs(distancia) < 1e-9:
+                progres[axis_id] = 1.0
+            else:
+                feta = (self._controlador._posicio_motor(axis_id) - inicial) / distancia
+                progres[axis_id] = min(max(feta, 0.0), 1.0)
+        return progres
+
+    def progres(self) -> float:
+        """Fracció (0-1) feta del moviment: la de l'eix pas a pas més endarrerit."""
+        if self.done() and not self.cancelled() and not self.interromput:
+            return 1.0
+        progres_eixos = [progres for axis_id, progres in self.progres_eixos().items()
+                         if isinstance(self._controlador.motors[axis_id], MotorPasAPas)]
+        return min(progres_eixos) if progres_eixos else 0.0
+
+    def temps_restant(self) -> float:
+        """Temps (s) que falta segons la durada planificada. None si encara no ha començat o no hi ha pla."""
+        if self.done():
+            return 0.0
+        if self._inici is None or self.durada_planificada is None:
+            return None
+        return max(0.0, self.durada_planificada - (time.perf_counter() - self._inici))
+
+    def __repr__(self):
+        estat = "cancel·lat" if self.cancelled() else "interromput" if self.interromput else "acabat" if self.done() else "en curs" if self.running() else "pendent"
+        return f"FuturMoviment(objectiu={self.target_angles}, estat={estat}, progres={self.progres():.2f})"
+
 
 class ScaraController:
     """
@@ -18,13 +119,28 @@ class ScaraController:
     EIX_Z = 2
     EIX_CANELL = 3
 
+    # Velocitat mínima (graus/s) acceptada per al canell; per sota, la config és del format antic (delays)
+    VELOCITAT_MINIMA_CANELL = 1.0
+
+    # Marge d'estabilització (segons) per fase, que s'espera DESPRÉS que el moviment o l'acció
+    # ja ha acabat (els moviments retornen quan els motors han arribat, no cal un temps fix).
+    MARGES_ESTABILITZACIO_PER_DEFECTE = {
+        "desplacament": 0.1, # Després d'un desplaçament del braç (vibració residual)
+        "baixada": 0.1, # Després de baixar l'eix Z fins a l'objecte
+        "electroiman": 0.3, # Perquè el camp de l'electroimant agafi o deixi anar l'objecte
+        "pujada": 0.0 # Després de pujar l'eix Z
+    }
+
     def __init__(self,
                  motor_base: MotorPasAPas,
                  motor_articulacio_secundaria: MotorPasAPas,
                  motor_eix_z: MotorPasAPas,
                  servomotor_canell: Servomotor,
                  electroiman: Electroiman,
-                 config: Dict[str, Dict[str, Any]]
+                 config: Dict[str, Dict[str, Any]],
+                 tipus_perfil: str = 'trapezoidal',
+                 generador_passos: GeneradorPassos = None,
+                 marges_estabilitzacio: Dict[str, float] = None
                 ):
         """
         Inicialitza el controlador SCARA amb les instàncies dels seus components
@@ -43,7 +159,8 @@ class ScaraController:
                                     "limits": (-90.0, 90.0), # Graus de l'articulació (després de tots els reductors)
                                     "speeds": [120.0, 60.0, 30.0], # Graus/segon (de la més ràpida a la més lenta)
                                     "offset": 0.0, # Posició 0 lògica després de calibratge de l'articulació
-                                    "reduction_ratio": 1.0 # Relació entre graus de l'articulació / graus del motor
+                                    "reduction_ratio": 1.0, # Relació entre graus de l'articulació / graus del motor
+                                    "acceleration": 240.0 # (Opcional) Acceleració màxima en graus/s² per a la planificació
                                 },
                                 "articulacio_secundaria": {
                                     "limits": (0.0, 180.0),
@@ -59,11 +176,17 @@ class ScaraController:
                                 },
                                 "canell": {
                                     "limits": (0.0, 180.0),
-                                    "speeds": [0.3, 0.5, 0.8], # Delay en segons (el més ràpid és el delay més petit)
+                                    "speeds": [600.0, 300.0, 120.0], # Graus/segon del servomotor (limitats per la seva velocitat mesurada)
                                     "offset": 90.0,
                                     "reduction_ratio": 1.0
                                 }
                             }
+            tipus_perfil (str): Tipus de perfil per als moviments coordinats ('trapezoidal' o 'scurve').
+            generador_passos (GeneradorPassos): (Opcional) Generador multiplexat que mou tots els motors
+                                                pas a pas des d'un sol fil. Si és None, cada eix es mou
+                                                amb el seu propi fil i `moure_n_passos`.
+            marges_estabilitzacio (Dict[str, float]): (Opcional) Marges d'estabilització per fase (segons) que
+                                                      substitueixen els de `MARGES_ESTABILITZACIO_PER_DEFECTE`.
         """
         self.motors = {
             self.EIX_BASE: motor_base,
@@ -73,6 +196,30 @@ class ScaraController:
         }
         self.electroiman = electroiman
         self.config = config
+        self.planificador = PlanificadorTrajectories(tipus_perfil)
+        self.generador_passos = generador_passos
+        self.marges_estabilitzacio = dict(self.MARGES_ESTABILITZACIO_PER_DEFECTE)
+        for fase, marge in (marges_estabilitzacio or {}).items():
+            if fase not in self.marges_estabilitzacio:
+                raise ValueError(f"Fase d'estabilització desconeguda: '{fase}'. Fases vàlides: {list(self.marges_estabilitzacio)}.")
+            if marge < 0:
+                raise ValueError(f"El marge d'estabilització de la fase '{fase}' ha de ser no negatiu.")
+            self.marges_estabilitzacio[fase] = marge
+
+        # Els moviments asíncrons s'executen en ordre en un fil dedicat. El lock evita que un
+        # moviment síncron s'executi alhora que un d'asíncron.
+        self._executor_moviments = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scara_moviments")
+        self._lock_moviment = threading.RLock()
+        self._futurs_pendents = set()
+        self._futur_en_curs = None
+
+        # Senyal compartit per tots els motors: el consulten a cada pas per poder interrompre un
+        # moviment en curs (aturada d'emergència o `FuturMoviment.cancel()`).
+        self.senyal_cancelacio = SenyalCancelacio()
+        self._aturada_en_curs = False
+        for motor in self.motors.values():
+            if motor is not None:
+                motor.senyal_cancelacio = self.senyal_cancelacio
 
         # Inicialització de la posició actual de cada articulació
         self._current_angles = [
@@ -84,6 +231,18 @@ class ScaraController:
         
         self._validate_initial_config()
 
+        # Els motors que han restaurat la posició del diari (sense calibrar) marquen l'angle real de l'articulació
+        for axis_id in (self.EIX_BASE, self.EIX_ARTICULACIO_SECUNDARIA, self.EIX_Z):
+            if getattr(self.motors[axis_id], "posicio_restaurada", False):
+                self._sincronitzar_angle_eix(axis_id)
+
+        # Un treballador permanent per eix executa les ordres dels moviments coordinats
+        self.executor_eixos = ExecutorMoviments({axis_id: self._get_axis_name(axis_id) for axis_id in self.motors},
+                                                nom="scara_eixos")
+        self.executor_eixos.iniciar()
+        # Cua de punts de pas amb fusió de segments (vegeu CuaMoviments)
+        self.cua_moviments = CuaMoviments(self)
+
         print("ScaraController inicialitzat amb la configuració proporcionada.")
         self._print_current_angles()
         print("Preparat per rebre ordres.")
@@ -98,7 +257,11 @@ class ScaraController:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
         S'executa quan es surt del bloc 'with', fins i tot si hi ha una exc>        """
-        pass
+        # Cancel·la els moviments asíncrons pendents i espera el que està en curs.
+        for futur in list(self._futurs_pendents):
+            futur.cancel()
+        self._executor_moviments.shutdown(wait=True)
+        self.executor_eixos.aturar()
 
     def _validate_initial_config(self):
         """Comprova que la configuració inicial conté tots els paràmetres necessaris."""
@@ -113,6 +276,15 @@ class ScaraController:
                 raise ValueError(f"Les velocitats per a '{axis_name}' han de ser una llista no buida.")
             if not self.config[axis_name]["reduction_ratio"] > 0:
                 raise ValueError(f"La relació de reducció per a '{axis_name}' ha de ser positiva.")
+            if "acceleration" in self.config[axis_name] and not self.config[axis_name]["acceleration"] > 0:
+                raise ValueError(f"L'acceleració per a '{axis_name}' ha de ser positiva.")
+        # Abans les velocitats del canell eren delays en segons (p.ex. [0.05, 0.1, 0.2]); ara són graus/s.
+        # Un valor tan petit és gairebé segur un delay antic i faria que un gir de 90° dures minuts.
+        velocitats_lentes = [v for v in self.config["canell"]["speeds"] if v < self.VELOCITAT_MINIMA_CANELL]
+        if velocitats_lentes:
+            raise ValueError(f"Les velocitats del canell {velocitats_lentes} són inferiors a {self.VELOCITAT_MINIMA_CANELL} °/s: "
+                             f"semblen delays en segons del format antic. Converteix-les a graus/segon "
+                             f"(p.ex. [500.0, 300.0, 120.0], com a info/robot_config.json).")
 
 
     def _get_axis_name(self, axis_id: int) -> str:
@@ -150,12 +322,12 @@ class ScaraController:
 
     def _get_speed_value(self, axis_id: int, speed_index: int) -> float:
         """
-        Obté el valor de velocitat (graus/s o delay) per a un índex de velocitat donat.
+        Obté el valor de velocitat (graus/s) per a un índex de velocitat donat.
         Args:
             axis_id (int): ID de l'eix.
             speed_index (int): Índex de la velocitat (0 per la més ràpida, -1 per la més lenta, etc.).
         Returns:
-            float: Valor de velocitat/delay.
+            float: Valor de velocitat.
         Raises:
             IndexError: Si l'índex de velocitat no és vàlid.
         """
@@ -166,6 +338,31 @@ class ScaraController:
         except IndexError:
             raise IndexError(f"Índex de velocitat {speed_index} fora de rang per a l'eix '{axis_name}'. Velocitats disponibles: {len(speeds)}.")
 
+    def _angle_a_motor(self, axis_id: int, angle: float) -> float:
+        """Converteix un angle de l'articulació a graus del motor (aplicant la reducció)."""
+        return angle * self.config[self._get_axis_name(axis_id)]["reduction_ratio"]
+
+    def _posicio_motor(self, axis_id: int) -> float:
+        """Posició actual d'un eix en graus del motor (real pels motors pas a pas, l'última ordenada pel servomotor)."""
+        motor = self.motors[axis_id]
+        if isinstance(motor, MotorPasAPas):
+            return motor.obtenir_posicio_graus()
+        return self._angle_a_motor(axis_id, self._current_angles[axis_id])
+
+    def _sincronitzar_angle_eix(self, axis_id: int):
+        """
+        Actualitza l'angle intern d'un eix amb la posició real del seu motor (passos comptats pel
+        motor pas a pas, últim angle ordenat pel servomotor). S'utilitza després d'una interrupció.
+        """
+        motor = self.motors[axis_id]
+        if isinstance(motor, MotorPasAPas):
+            angle_motor = motor.obtenir_posicio_graus()
+        else:
+            angle_motor = motor.obtenir_angle()
+            if angle_motor is None:
+                return
+        self._current_angles[axis_id] = angle_motor / self.config[self._get_axis_name(axis_id)]["reduction_ratio"]
+
     # --- Mètodes de Moviment ---
 
     def moure_sol_eix(self, axis_id: int, target_angle: float, velocitat_index: int = -2) -> bool:
@@ -180,6 +377,11 @@ class ScaraController:
         Returns:
             bool: True si el moviment s'ha iniciat amb èxit, False en cas contrari.
         """
+        self.cua_moviments.esperar()
+        with self._lock_moviment:
+            return self._moure_sol_eix(axis_id, target_angle, velocitat_index)
+
+    def _moure_sol_eix(self, axis_id: int, target_angle: float, velocitat_index: int = -2, futur: FuturMoviment = None) -> bool:
         axis_name = self._get_axis_name(axis_id)
         print(f"Iniciant moviment de l'eix '{axis_name}' (ID {axis_id}) a {target_angle:.2f}°...")
 
@@ -195,25 +397,117 @@ class ScaraController:
             print(f"ERROR: {e}. Moviment de l'eix '{axis_name}' cancel·lat.")
             return False
 
+        if futur is not None:
+            futur._iniciar()
+        return self._executar_moviment_eix(axis_id, target_angle, speed_value)
+
+    def _executar_moviment_eix(self, axis_id: int, target_angle: float, speed_value: float,
+                               acceleracio: float = None, perfil_rampa: str = None) -> bool:
+        """
+        Executa el moviment d'un eix ja validat amb un valor de velocitat concret.
+
+        Args:
+            axis_id (int): ID de l'eix.
+            target_angle (float): Angle objectiu de l'articulació en graus.
+            speed_value (float): Graus/segon del motor.
+            acceleracio (float): Acceleració de la rampa en graus/s² del motor (només pas a pas).
+                                 None per utilitzar la rampa per defecte del motor.
+            perfil_rampa (str): Forma de la rampa ('trapezoidal' o 'scurve'). None per la del motor.
+
+        Returns:
+            bool: True si el moviment s'ha completat, False en cas contrari.
+        """
+        axis_name = self._get_axis_name(axis_id)
+        if self.senyal_cancelacio.activa:
+            print(f"Moviment de l'eix '{axis_name}' descartat ({self.senyal_cancelacio.motiu}).")
+            return False
+
         # Apply reduction ratio to convert articulation angle to motor angle
         reduction_ratio = self.config[axis_name]["reduction_ratio"]
         target_angle_for_motor = target_angle * reduction_ratio
 
         # 3. Moure el motor
         motor = self.motors[axis_id]
+        completat = True
         if isinstance(motor, MotorPasAPas):
-            motor.moure_a_graus(target_angle_for_motor, speed_value)
+            if speed_value <= 0:
+                # Eix sense desplaçament dins d'un moviment coordinat: no cal moure'l
+                print(f"Eix '{axis_name}' ja a la posició objectiu de {target_angle:.2f}°.")
+            elif self.generador_passos is not None:
+                moviments = self.generador_passos.encuar_posicions([(motor, target_angle_for_motor, speed_value, acceleracio, perfil_rampa)])
+                if not moviments:
+                    print(f"ERROR: No s'ha pogut encuar el moviment de l'eix '{axis_name}'.")
+                    return False
+                moviments[motor.nom].esperar()
+                completat = not moviments[motor.nom].interromput
+            else:
+                completat = motor.moure_a_graus(target_angle_for_motor, speed_value, acceleracio, perfil_rampa)
         elif isinstance(motor, Servomotor):
-            motor.move_to_angle(target_angle_for_motor, speed_value)
+            completat = motor.move_to_angle(target_angle_for_motor, velocitat_graus_per_segon=speed_value)
         else:
             print(f"ERROR: Tipus de motor desconegut per a l'eix '{axis_name}'.")
             return False
+
+        if not completat:
+            # Interromput o fallat: l'angle intern passa a ser el real on s'ha aturat el motor
+            self._sincronitzar_angle_eix(axis_id)
+            print(f"Moviment de l'eix '{axis_name}' no completat. Posició real: {self._current_angles[axis_id]:.2f}°.")
+            return False
         
         # 4. Actualitzar la posició angular interna del controlador DESPRÉS del moviment
         self._current_angles[axis_id] = target_angle
         print(f"Moviment de l'eix '{axis_name}' completat a {target_angle:.2f}°.")
         return True
 
+    def planificar_moviment(self,
+                            target_angles: Dict[int, float],
+                            velocitat_index: int = -2,
+                            angles_inicials: Dict[int, float] = None) -> PlaMoviment:
+        """
+        Planifica un moviment coordinat perquè tots els eixos arribin alhora en el temps
+        mínim factible, segons les velocitats (`speeds[velocitat_index]`) i acceleracions
+        (`acceleration`, opcional) de la configuració de cada eix. Si un eix no té
+        `acceleration`, s'utilitza la rampa per defecte del seu motor (si en té).
+
+        El servomotor del canell no té control de velocitat en bucle tancat: el temps que
+        el seu model (`Servomotor.temps_moviment`) preveu per al gir s'utilitza com a
+        durada mínima del moviment.
+
+        Args:
+            target_angles (Dict[int, float]): Angle objectiu de l'articulació per a cada ID d'eix.
+            velocitat_index (int): Índex de la velocitat a utilitzar.
+            angles_inicials (Dict[int, float]): (Opcional) Angle de partida de cada eix. Per defecte, la posició actual.
+
+        Returns:
+            PlaMoviment: Perfils per eix i durada planificada (segons).
+
+        Raises:
+            IndexError: Si l'índex de velocitat no és vàlid per a algun eix.
+        """
+        distancies = {}
+        velocitats_max = {}
+        acceleracions_max = {}
+        durada_minima = 0.0
+
+        for axis_id, target_angle in target_angles.items():
+            axis_name = self._get_axis_name(axis_id)
+            speed_value = self._get_speed_value(axis_id, velocitat_index)
+            angle_inicial = self._current_angles[axis_id] if angles_inicials is None else angles_inicials[axis_id]
+            if isinstance(self.motors[axis_id], Servomotor):
+                temps_servo = self.motors[axis_id].temps_moviment(self._angle_a_motor(axis_id, target_angle), speed_value,
+                                                                  self._angle_a_motor(axis_id, angle_inicial))
+                durada_minima = max(durada_minima, temps_servo)
+                continue
+            distancies[axis_id] = abs(target_angle - angle_inicial)
+            velocitats_max[axis_id] = speed_value
+            acceleracio = self.config[axis_name].get("acceleration")
+            if acceleracio is None and self.motors[axis_id].acceleracio_graus_per_segon2:
+                # L'acceleració del motor és en graus del motor: la passem a graus de l'articulació
+                acceleracio = self.motors[axis_id].acceleracio_graus_per_segon2 / self.config[axis_name]["reduction_ratio"]
+            acceleracions_max[axis_id] = acceleracio
+
+        return self.planificador.planificar(distancies, velocitats_max, acceleracions_max, durada_minima)
+
 
     def mou_a_posicio_eixos(self,
                             graus_base: float,
@@ -223,7 +517,9 @@ class ScaraController:
                             velocitat_index: int = -2): # Default changed to -2 (antepenultimate)
         """
         Mou tots els eixos del robot a les posicions angulars especificades de l'articulació
-        utilitzant fils (threads) per a un moviment concurrent.
+        amb un fil treballador permanent per eix (vegeu `ExecutorMoviments`) per a un moviment concurrent.
+        El moviment es planifica abans d'iniciar-lo perquè tots els eixos arribin alhora
+        (vegeu `planificar_moviment`).
 
         Args:
             graus_base (float): Angle objectiu per a la base (Articulació 0).
@@ -241,7 +537,11 @@ class ScaraController:
             self.EIX_Z: graus_eix_z,
             self.EIX_CANELL: graus_canell
         }
+        self.cua_moviments.esperar()
+        with self._lock_moviment:
+            return self._mou_a_posicio_eixos(target_angles, velocitat_index)
 
+    def _mou_a_posicio_eixos(self, target_angles: Dict[int, float], velocitat_index: int = -2, futur: FuturMoviment = None) -> bool:
         print("\nIniciant moviment concurrent a nova posició d'eixos:")
 
         # 1. Validar tots els angles de les articulacions abans de moure qualsevol eix
@@ -250,31 +550,46 @@ class ScaraController:
                 print("ERROR: Un o més angles estan fora de límits de l'articulació. Moviment concurrent cancel·lat.")
                 return False
 
-        # Create a list to hold our threads
-        threads = []
-        # A list to store the results of each thread (True/False for success)
-        # Initialize with True, so any failure sets it to False
-        results = [True] * len(self.motors) 
-
-        # 2. Launch a thread for each axis movement using moure_sol_eix
-        for i, (axis_id, target_angle) in enumerate(target_angles.items()):
-            # Define a target function that will be executed by each thread
-            def move_single_axis_thread_wrapper(axis_id_inner, target_angle_inner, velocitat_index_inner, result_list, index):
-                success = self.moure_sol_eix(axis_id_inner, target_angle_inner, velocitat_index_inner)
-                result_list[index] = success
-
-            thread = threading.Thread(
-                target=move_single_axis_thread_wrapper,
-                args=(axis_id, target_angle, velocitat_index, results, i)
-            )
-            threads.append(thread)
-            thread.start() # Start the thread
-
-        # 3. Wait for all threads to complete
-        for thread in threads:
-            thread.join() # This blocks until the thread finishes
-
-        # 4. Check if all movements were successful
+        # 2. Planificar el moviment perquè tots els eixos arribin alhora
+        try:
+            pla = self.planificar_moviment(target_angles, velocitat_index)
+        except IndexError as e:
+            print(f"ERROR: {e}. Moviment concurrent cancel·lat.")
+            return False
+        print(f"Durada planificada del moviment: {pla.durada:.3f} s.")
+        if futur is not None:
+            futur._iniciar(pla.durada)
+
+        parametres_eixos = self._parametres_eixos(pla, target_angles, velocitat_index)
+
+        # 3. Amb el GeneradorPassos, els motors pas a pas s'encuen junts (comencen en el mateix tick)
+        #    i només els eixos restants (servomotor) passen pel seu treballador d'eix.
+        moviments_generador = {}
+        if self.generador_passos is not None:
+            moviments_generador = self._encuar_eixos_generador(target_angles, parametres_eixos)
+            if moviments_generador is None:
+                print("ERROR: No s'han pogut encuar els moviments dels motors pas a pas. Moviment concurrent cancel·lat.")
+                return False
+
+        # Una ordre per eix a la cua del seu treballador, amb una barrera de finalització comuna
+        barrera = self.executor_eixos.encuar({
+            axis_id: (self._executar_moviment_eix, (axis_id, target_angle) + tuple(parametres_eixos[axis_id]))
+            for axis_id, target_angle in target_angles.items()
+            if axis_id not in moviments_generador
+        })
+
+        # 4. Esperar que acabin tots els eixos
+        barrera.esperar()
+        results = list(barrera.resultats.values())
+        for axis_id, moviment in moviments_generador.items():
+            moviment.esperar()
+            if moviment.interromput:
+                self._sincronitzar_angle_eix(axis_id)
+                results.append(False)
+            else:
+                self._current_angles[axis_id] = target_angles[axis_id]
+
+        # 5. Check if all movements were successful
         if all(results):
             print("Tots els moviments concurrents s'han completat amb èxit.")
             self._print_current_angles()
@@ -284,6 +599,156 @@ class ScaraController:
             self._print_current_angles()
             return False
 
+    def _parametres_eixos(self, pla: PlaMoviment, target_angles: Dict[int, float], velocitat_index: int) -> Dict[int, tuple]:
+        """
+        Paràmetres que ha d'utilitzar cada eix: (velocitat, acceleració, perfil) en unitats del motor.
+        Pels motors pas a pas, la velocitat de creuer i l'acceleració del perfil planificat fan
+        que l'eix acabi just a la durada comuna. El servomotor utilitza la velocitat configurada.
+        """
+        parametres_eixos = {}
+        for axis_id in target_angles:
+            if axis_id in pla.perfils:
+                perfil = pla.perfils[axis_id]
+                reduction_ratio = self.config[self._get_axis_name(axis_id)]["reduction_ratio"]
+                acceleracio_motor = perfil.acceleracio * reduction_ratio if perfil.acceleracio else 0
+                parametres_eixos[axis_id] = (perfil.velocitat * reduction_ratio, acceleracio_motor, self.planificador.tipus_perfil)
+            else:
+                parametres_eixos[axis_id] = (self._get_speed_value(axis_id, velocitat_index), None, None)
+        return parametres_eixos
+
+    def ordres_eixos_pendents(self) -> Dict[int, List[OrdreEix]]:
+        """Retorna les ordres en curs i encuades de cada treballador d'eix (per inspecció)."""
+        return self.executor_eixos.ordres_pendents()
+
+    # --- Moviments asíncrons ---
+
+    def _encuar_moviment_async(self, futur: FuturMoviment, funcio_moviment, *args) -> FuturMoviment:
+        """Encua un moviment al fil de moviments i en retorna el futur."""
+        def executar():
+            if not futur.set_running_or_notify_cancel():
+                self._futurs_pendents.discard(futur)
+                return
+            try:
+                self.cua_moviments.esperar()
+                with self._lock_moviment:
+                    self._futur_en_curs = futur
+                    try:
+                        # Un moviment interromput mentre esperava el seu torn ja no es fa
+                        resultat = False if futur.interromput else funcio_moviment(*args, futur=futur)
+                    finally:
+                        self._futur_en_curs = None
+                        if futur.interromput and not self._aturada_en_curs:
+                            # La cancel·lació només afectava aquest moviment: es rearma el senyal
+                            self.senyal_cancelacio.reiniciar()
+                futur.set_result(resultat and not futur.interromput)
+            except Exception as e:
+                print(f"ERROR: El moviment asíncron ha fallat: {e}")
+                futur.set_exception(e)
+            finally:
+                self._futurs_pendents.discard(futur)
+
+        self._futurs_pendents.add(futur)
+        try:
+            self._executor_moviments.submit(executar)
+        except RuntimeError as e:
+            # L'executor ja s'ha aturat (s'ha sortit del context del controlador)
+            self._futurs_pendents.discard(futur)
+            futur.set_running_or_notify_cancel()
+            futur.set_exception(e)
+        return futur
+
+    def mou_a_posicio_eixos_async(self,
+                                  graus_base: float,
+                                  graus_articulacio_secundaria: float,
+                                  graus_eix_z: float,
+                                  graus_canell: float,
+                                  velocitat_index: int = -2) -> FuturMoviment:
+        """
+        Versió no bloquejant de `mou_a_posicio_eixos`: encua el moviment i retorna de seguida.
+        Els moviments asíncrons s'executen en l'ordre en què s'encuen, d'un en un.
+
+        Returns:
+            FuturMoviment: Futur amb el resultat (bool) i consultes de progrés.
+        """
+        target_angles = {
+            self.EIX_BASE: graus_base,
+            self.EIX_ARTICULACIO_SECUNDARIA: graus_articulacio_secundaria,
+            self.EIX_Z: graus_eix_z,
+            self.EIX_CANELL: graus_canell
+        }
+        futur = FuturMoviment(self, target_angles)
+        return self._encuar_moviment_async(futur, self._mou_a_posicio_eixos, target_angles, velocitat_index)
+
+    def moure_sol_eix_async(self, axis_id: int, target_angle: float, velocitat_index: int = -2) -> FuturMoviment:
+        """
+        Versió no bloquejant de `moure_sol_eix`.
+
+        Returns:
+            FuturMoviment: Futur amb el resultat (bool) i consultes de progrés.
+        """
+        futur = FuturMoviment(self, {axis_id: target_angle})
+        return self._encuar_moviment_async(futur, self._moure_sol_eix, axis_id, target_angle, velocitat_index)
+
+    def _interrompre_moviment(self, futur: FuturMoviment) -> bool:
+        """
+        Interromp un moviment asíncron ja iniciat (el crida `FuturMoviment.cancel`). Si encara
+        espera el seu torn, es marca perquè no es faci; si s'està fent, s'activa el senyal de cancel·lació.
+        """
+        if futur.done():
+            return False
+        futur.interromput = True
+        if self._futur_en_curs is futur and not self.senyal_cancelacio.activa:
+            self.senyal_cancelacio.cancelar("cancel·lació del moviment")
+        print(f"Interrompent el moviment asíncron: {futur.target_angles}")
+        return True
+
+    def moviments_pendents(self) -> List[FuturMoviment]:
+        """Retorna els moviments asíncrons encara no acabats (el que està en curs i els encuats)."""
+        return [futur for futur in list(self._futurs_pendents) if not futur.done()]
+
+    def esperar_moviments(self, timeout: float = None) -> bool:
+        """
+        Bloqueja fins que acaben tots els moviments asíncrons encuats.
+
+        Returns:
+            bool: False si s'esgota el `timeout` o algun moviment ha fallat.
+        """
+        futurs = list(self._futurs_pendents)
+        _, pendents = esperar_futurs(futurs, timeout)
+        if pendents:
+            return False
+        return all(futur.esperar(0) for futur in futurs if not futur.cancelled())
+
+    def _encuar_eixos_generador(self, target_angles: Dict[int, float], parametres_eixos: Dict[int, tuple]) -> Dict[int, MovimentEncuat]:
+        """
+        Encua al GeneradorPassos, com un sol grup, els moviments de tots els eixos amb motor pas a pas.
+
+        Returns:
+            Dict[int, MovimentEncuat]: Moviment encuat per ID d'eix, o None si no s'han pogut encuar.
+        """
+        ordres = []
+        eixos = {}
+        for axis_id, target_angle in target_angles.items():
+            motor = self.motors[axis_id]
+            if not isinstance(motor, MotorPasAPas):
+                continue
+            speed_value, acceleracio, perfil_rampa = parametres_eixos[axis_id]
+            reduction_ratio = self.config[self._get_axis_name(axis_id)]["reduction_ratio"]
+            # Un eix sense desplaçament es mou 0 passos, però la velocitat ha de ser vàlida
+            ordres.append((motor, target_angle * reduction_ratio, speed_value if speed_value > 0 else 1.0, acceleracio, perfil_rampa))
+            eixos[motor.nom] = axis_id
+
+        moviments = self.generador_passos.encuar_posicions(ordres)
+        if len(moviments) != len(ordres):
+            return None
+        return {eixos[nom]: moviment for nom, moviment in moviments.items()}
+
+    def esperar_estabilitzacio(self, fase: str):
+        """Espera el marge d'estabilització configurat per a una fase (vegeu `MARGES_ESTABILITZACIO_PER_DEFECTE`)."""
+        marge = self.marges_estabilitzacio[fase]
+        if marge > 0:
+            time.sleep(marge)
+
     # --- Mètodes d'Operació de l'Electroimant ---
     def activar_pinça(self):
         """Activa l'electroimant per agafar un objecte."""
@@ -302,12 +767,34 @@ class ScaraController:
             print("No s'ha pogut desactivar la pinça.")
 
     # --- Mètodes de Seguretat / Manteniment ---
-    def aturada_emergencia(self):
+    def aturada_emergencia(self, timeout: float = 1.0):
         """
         Atura tots els motors immediatament i desactiva l'electroimant.
         Aquesta és una aturada suau a nivell de programari.
+
+        Activa el senyal de cancel·lació: els bucles de passos en curs (en qualsevol fil) s'aturen
+        com a molt un període de pas després, els moviments encuats es descarten i els angles
+        interns queden a la posició exacta on s'ha aturat cada motor. Un cop tot és aturat, el
+        senyal es rearma perquè el robot pugui rebre noves ordres.
+
+        Args:
+            timeout (float): Temps màxim (s) d'espera perquè s'aturin els moviments en curs.
         """
         print("\n*** ATURADA D'EMERGÈNCIA ACTIVADA! ***")
+        self._aturada_en_curs = True
+        self.senyal_cancelacio.cancelar("aturada d'emergència")
+        for futur in list(self._futurs_pendents):
+            futur.cancel()
+        self.executor_eixos.esperar_tots(timeout)
+        if self.generador_passos is not None:
+            self.generador_passos.esperar_tots(timeout)
+        self.cua_moviments.esperar(timeout) # Descarta la planificació dels trams enviats
+        self.cua_moviments.buidar()
+        self.senyal_cancelacio.reiniciar()
+        self._aturada_en_curs = False
+        print("Moviments en curs interromputs. Posició on s'han aturat:")
+        self._print_current_angles()
+
         for axis_id, motor in self.motors.items():
             if isinstance(motor, MotorPasAPas):
                 motor.release_motor()
@@ -342,8 +829,8 @@ class ScaraController:
             offset_canell = self.config["canell"]["offset"]
             # Per al calibratge, utilitzem una velocitat per defecte segura (p.ex., la més lenta)
             default_speed_index = -1 
-            delay_canell = self.config["canell"]["speeds"][default_speed_index]
-            servo_canell.move_to_angle(offset_canell, delay=delay_canell)
+            velocitat_canell = self.config["canell"]["speeds"][default_speed_index]
+            servo_canell.move_to_angle(offset_canell, velocitat_graus_per_segon=velocitat_canell)
             self._current_angles[self.EIX_CANELL] = offset_canell
         else:
             print(f"ADVERTÈNCIA: L'eix {self.EIX_CANELL} no és un Servomotor.")
@@ -351,6 +838,34 @@ class ScaraController:
         print("Calibratge del robot SCARA completat. Posicions inicials de l'articulació establertes.")
         self._print_current_angles()
 
+    def autoajustar_eixos(self,
+                          verificador: VerificadorPosicio,
+                          eixos: List[int] = None,
+                          factor_seguretat: float = 0.8,
+                          ruta_config: str = None,
+                          **parametres) -> Dict[int, ResultatAjust]:
+        """
+        Troba la velocitat i l'acceleració màximes fiables dels eixos pas a pas amb moviments de
+        prova i n'escriu els límits (amb un factor de seguretat) a la configuració (vegeu AutoAjustEixos).
+
+        Args:
+            verificador (VerificadorPosicio): Comprova la posició real de l'eix després de cada prova
+                                              (model simulat, càmera o confirmació de l'operador).
+            eixos (List[int]): (Opcional) IDs dels eixos a ajustar. Per defecte, tots els pas a pas.
+            factor_seguretat (float): Fracció dels límits trobats que s'escriu a la configuració.
+            ruta_config (str): (Opcional) Fitxer JSON de configuració on desar els límits ajustats.
+            **parametres: Altres paràmetres de l'AutoAjustEixos (`velocitats`, `acceleracions`, `repeticions`...).
+
+        Returns:
+            Dict[int, ResultatAjust]: Resultat de l'ajust de cada eix.
+        """
+        autoajust = AutoAjustEixos(self, verificador, factor_seguretat=factor_seguretat, **parametres)
+        resultats = autoajust.ajustar(eixos)
+        if ruta_config is not None:
+            autoajust.desar_config(ruta_config)
+        self._print_current_angles()
+        return resultats
+
     # --- Funcions per a tasques complexes (Gestió d'objectes) ---
 
     def gestionar_objecte(self,
@@ -394,7 +909,7 @@ class ScaraController:
         ):
             print(f"ERROR: No s'ha pogut arribar a la posició de seguretat. Cancel·lant {accio_str}.")
             return False
-        time.sleep(1) # Espera per estabilitzar
+        self.esperar_estabilitzacio("desplacament")
 
         # 2. Baixar a la posició exacta de l'objecte/destí (només moviment de l'eix Z)
         print(f"Baixant per {accio_str} l'objecte (Eix Z amb velocitat lenta)...")
@@ -405,14 +920,14 @@ class ScaraController:
         ):
             print(f"ERROR: No s'ha pogut baixar a l'objecte/destí. Cancel·lant {accio_str}.")
             return False
-        time.sleep(0.5) # Espera per estabilitzar
+        self.esperar_estabilitzacio("baixada")
 
         # 3. Activar/Desactivar l'electroimant
         if agafar_objecte:
             self.activar_pinça()
         else:
             self.desactivar_pinça()
-        time.sleep(1) # Donar temps a l'electroimant per actuar
+        self.esperar_estabilitzacio("electroiman") # Donar temps a l'electroimant per actuar
 
         # 4. Pujar de nou a l'altura de seguretat (només moviment de l'eix Z)
         print(f"Pujant de nou a altura de seguretat (Z de l'articulació: {altura_seguretat_z}) amb velocitat lenta...")
@@ -423,6 +938,7 @@ class ScaraController:
         ):
             print(f"ERROR: No s'ha pogut pujar amb/després de l'objecte. L'objecte pot no estar segur. Cancel·lant {accio_str}.")
             return False
+        self.esperar_estabilitzacio("pujada")
         
         # Opcional: Si el moviment de pujada és crític, podem voler moure els altres eixos
         # en el mateix temps, però per a la petició actual només Z es mou.
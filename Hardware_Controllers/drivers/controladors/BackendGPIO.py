@@ -0,0 +1,355 @@
+import os
+import threading
+import time
+from collections import deque
+
+# Variables d'entorn que seleccionen el backend (tenen prioritat sobre la configuració JSON)
+VARIABLE_ENTORN_BACKEND = "ROBOT_GPIO_BACKEND" # 'rpi' o 'virtual'
+VARIABLE_ENTORN_RELLOTGE = "ROBOT_GPIO_RELLOTGE_VIRTUAL" # '1' per activar el rellotge virtual
+
+BACKENDS_VALIDS = ('rpi', 'virtual')
+
+class RellotgeVirtual:
+    """
+    Rellotge simulat que fa que `time.sleep` sigui instantani.
+
+    Un cop activat, substitueix `time.sleep`, `time.perf_counter(_ns)` i `time.monotonic(_ns)`:
+    dormir només avança el temps virtual. Cada lectura del rellotge l'avança `increment_lectura_ns`,
+    de manera que les esperes actives (bucles que llegeixen el rellotge) també acaben.
+
+    Cada fil té el seu propi temps virtual (comença al temps més avançat de tots els fils el
+    primer cop que llegeix el rellotge), de manera que els fils que dormen en paral·lel (un per
+    eix, el servomotor, el GeneradorPassos...) no s'avancen el temps els uns als altres.
+    La sincronització entre fils (join, Event, Condition) no iguala els seus temps.
+    """
+
+    FUNCIONS_SUBSTITUIDES = ('sleep', 'perf_counter', 'perf_counter_ns', 'monotonic', 'monotonic_ns')
+
+    def __init__(self, increment_lectura_ns: int = 1000):
+        """
+        Args:
+            increment_lectura_ns (int): Temps (ns) que avança el rellotge a cada lectura.
+        """
+        self.increment_lectura_ns = increment_lectura_ns
+        self._maxim_ns = 0 # Temps més avançat de tots els fils
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._originals = None
+
+    def _avancar(self, increment_ns: int) -> int:
+        ara_ns = getattr(self._local, 'ara_ns', None)
+        with self._lock:
+            if ara_ns is None:
+                ara_ns = self._maxim_ns
+            ara_ns += increment_ns
+            if ara_ns > self._maxim_ns:
+                self._maxim_ns = ara_ns
+        self._local.ara_ns = ara_ns
+        return ara_ns
+
+    def perf_counter_ns(self) -> int:
+        return self._avancar(self.increment_lectura_ns)
+
+    def perf_counter(self) -> float:
+        return self.perf_counter_ns() / 1e9
+
+    def sleep(self, segons: float):
+        if segons < 0:
+            raise ValueError("sleep length must be non-negative")
+        self._avancar(int(segons * 1e9))
+
+    def temps_maxim(self) -> float:
+        """Temps virtual (s) del fil més avançat: la durada simulada total."""
+        return self._maxim_ns / 1e9
+
+    # El rellotge monòton és el mateix que el de perf_counter
+    monotonic_ns = perf_counter_ns
+    monotonic = perf_counter
+
+    @property
+    def actiu(self) -> bool:
+        return self._originals is not None
+
+    def activar(self):
+        """Substitueix les funcions del mòdul `time` per les del rellotge virtual."""
+        if self.actiu:
+            return
+        self._originals = {nom: getattr(time, nom) for nom in self.FUNCIONS_SUBSTITUIDES}
+        for nom in self.FUNCIONS_SUBSTITUIDES:
+            setattr(time, nom, getattr(self, nom))
+        print("RellotgeVirtual: Activat (time.sleep és instantani).")
+
+    def desactivar(self):
+        """Restaura les funcions originals del mòdul `time`."""
+        if not self.actiu:
+            return
+        for nom, funcio in self._originals.items():
+            setattr(time, nom, funcio)
+        self._originals = None
+        print("RellotgeVirtual: Desactivat.")
+
+
+class PWMVirtual:
+    """
+    Model d'un canal PWM de programari (mateixa interfície que `RPi.GPIO.PWM`).
+    Cada canvi de cicle de treball o de freqüència queda registrat a `GPIOVirtual.historial_pwm`.
+    """
+
+    def __init__(self, gpio: "GPIOVirtual", pin: int, frequencia: float):
+        if frequencia <= 0:
+            raise ValueError("frequency must be greater than 0.0")
+        self._gpio = gpio
+        self.pin = pin
+        self.frequencia = frequencia
+        self.cicle_treball = 0.0
+        self.actiu = False
+
+    def start(self, cicle_treball: float):
+        self.actiu = True
+        self.ChangeDutyCycle(cicle_treball)
+
+    def ChangeDutyCycle(self, cicle_treball: float):
+        if not 0.0 <= cicle_treball <= 100.0:
+            raise ValueError("dutycycle must have a value from 0.0 to 100.0")
+        self.cicle_treball = cicle_treball
+        self._gpio._registrar_pwm(self)
+
+    def ChangeFrequency(self, frequencia: float):
+        if frequencia <= 0:
+            raise ValueError("frequency must be greater than 0.0")
+        self.frequencia = frequencia
+        self._gpio._registrar_pwm(self)
+
+    def stop(self):
+        self.actiu = False
+        self.cicle_treball = 0.0
+        self._gpio._registrar_pwm(self)
+
+
+class GPIOVirtual:
+    """
+    Substitut de `RPi.GPIO` per executar i provar els drivers sense Raspberry Pi.
+
+    Guarda l'estat de cada pin i registra cada transició amb la seva marca de temps
+    (`time.perf_counter_ns()`, virtual si el RellotgeVirtual està actiu). Els observadors
+    (p.ex. un model de motor) reben els canvis de cada crida a `output` de cop.
+    """
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+
+    def __init__(self, registre_maxim: int = 1_000_000):
+        """
+        Args:
+            registre_maxim (int): Nombre màxim de transicions guardades (les més antigues es descarten).
+        """
+        self._lock = threading.RLock()
+        self.mode = None
+        self.direccions = {} # pin -> OUT/IN
+        self.estat = {} # pin -> LOW/HIGH
+        self.transicions = deque(maxlen=registre_maxim) # (temps_ns, pin, valor)
+        self.historial_pwm = deque(maxlen=registre_maxim) # (temps_ns, pin, frequencia, cicle_treball)
+        self.pwms = {} # pin -> PWMVirtual
+        self._observadors = []
+
+    # --- API compatible amb RPi.GPIO ---
+
+    def setwarnings(self, activar: bool):
+        pass
+
+    def setmode(self, mode: int):
+        if mode not in (self.BCM, self.BOARD):
+            raise ValueError("An invalid mode was passed to setmode()")
+        if self.mode is not None and self.mode != mode:
+            raise ValueError("A different mode has already been set!")
+        self.mode = mode
+
+    def getmode(self) -> int:
+        return self.mode
+
+    def setup(self, canals, direccio: int, pull_up_down: int = PUD_OFF, initial: int = None):
+        if self.mode is None:
+            raise RuntimeError("Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)")
+        with self._lock:
+            for pin in self._com_a_llista(canals):
+                self.direccions[pin] = direccio
+                if direccio == self.OUT:
+                    self._escriure({pin: initial if initial is not None else self.estat.get(pin, self.LOW)})
+
+    def output(self, canals, valors):
+        canals = self._com_a_llista(canals)
+        valors = self._com_a_llista(valors) if isinstance(valors, (list, tuple)) else [valors] * len(canals)
+        if len(canals) != len(valors):
+            raise RuntimeError("Number of channels != number of values")
+        with self._lock:
+            for pin in canals:
+                if self.direccions.get(pin) != self.OUT:
+                    raise RuntimeError("The GPIO channel has not been set up as an OUTPUT")
+            self._escriure(dict(zip(canals, valors)))
+
+    def input(self, pin: int) -> int:
+        if pin not in self.direccions:
+            raise RuntimeError("You must setup() the GPIO channel first")
+        return self.estat.get(pin, self.LOW)
+
+    def PWM(self, pin: int, frequencia: float) -> PWMVirtual:
+        if self.direccions.get(pin) != self.OUT:
+            raise RuntimeError("You must setup() the GPIO channel as an output first")
+        pwm = PWMVirtual(self, pin, frequencia)
+        self.pwms[pin] = pwm
+        return pwm
+
+    def cleanup(self, canals=None):
+        with self._lock:
+            pins = list(self.direccions) if canals is None else self._com_a_llista(canals)
+            for pin in pins:
+                if pin in self.pwms:
+                    self.pwms.pop(pin).stop()
+                if self.direccions.pop(pin, None) == self.OUT:
+                    self._escriure({pin: self.LOW})
+            if canals is None:
+                self.mode = None
+
+    # --- Consultes i observadors ---
+
+    def afegir_observador(self, callback):
+        """Registra `callback(temps_ns, canvis)`, cridat amb el diccionari pin -> valor dels pins que han canviat."""
+        with self._lock:
+            self._observadors.append(callback)
+
+    def treure_observador(self, callback):
+        with self._lock:
+            if callback in self._observadors:
+                self._observadors.remove(callback)
+
+    def transicions_pin(self, pin: int) -> list:
+        """Retorna les transicions (temps_ns, valor) registrades per a un pin."""
+        with self._lock:
+            return [(temps_ns, valor) for temps_ns, p, valor in self.transicions if p == pin]
+
+    def cicle_treball(self, pin: int) -> float:
+        """Retorna el cicle de treball (%) actual del PWM d'un pin (0 si no n'hi ha cap d'actiu)."""
+        pwm = self.pwms.get(pin)
+        return pwm.cicle_treball if pwm and pwm.actiu else 0.0
+
+    def reiniciar_registre(self):
+        """Buida els registres de transicions i de PWM."""
+        with self._lock:
+            self.transicions.clear()
+            self.historial_pwm.clear()
+
+    # --- Intern ---
+
+    @staticmethod
+    def _com_a_llista(valor) -> list:
+        return list(valor) if isinstance(valor, (list, tuple)) else [valor]
+
+    def _escriure(self, valors: dict):
+        temps_ns = time.perf_counter_ns()
+        canvis = {}
+        for pin, valor in valors.items():
+            valor = self.HIGH if valor else self.LOW
+            if self.estat.get(pin) != valor:
+                self.estat[pin] = valor
+                self.transicions.append((temps_ns, pin, valor))
+                canvis[pin] = valor
+        if canvis:
+            for callback in self._observadors:
+                callback(temps_ns, canvis)
+
+    def _registrar_pwm(self, pwm: PWMVirtual):
+        with self._lock:
+            self.historial_pwm.append((time.perf_counter_ns(), pwm.pin, pwm.frequencia, pwm.cicle_treball))
+
+
+class BackendGPIO:
+    """
+    Punt d'accés únic a la llibreria GPIO per a tots els drivers.
+
+    Els drivers fan `from .BackendGPIO import GPIO` i l'utilitzen igual que `RPi.GPIO`.
+    El backend real es tria el primer cop que s'utilitza, o explícitament amb `seleccionar`:
+        * Variable d'entorn ROBOT_GPIO_BACKEND ('rpi' o 'virtual'), si existeix.
+        * Si no, el valor passat a `seleccionar` (p.ex. 'gpio_settings.backend' del JSON).
+        * Per defecte, 'rpi'. Si RPi.GPIO no es pot importar, es fa servir el virtual amb un avís.
+
+    El rellotge virtual (ROBOT_GPIO_RELLOTGE_VIRTUAL=1 o `rellotge_virtual=True`) només
+    s'activa amb el backend virtual, mai amb el maquinari real.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self.nom_backend = None
+        self.rellotge = None
+
+    def seleccionar(self, nom_backend: str = None, rellotge_virtual: bool = False):
+        """
+        Selecciona el backend GPIO.
+
+        Args:
+            nom_backend (str): 'rpi' o 'virtual'. La variable d'entorn té prioritat.
+            rellotge_virtual (bool): Activa el RellotgeVirtual (només amb el backend virtual).
+
+        Returns:
+            El mòdul/objecte GPIO seleccionat.
+        """
+        nom_backend = os.environ.get(VARIABLE_ENTORN_BACKEND) or nom_backend or 'rpi'
+        if nom_backend not in BACKENDS_VALIDS:
+            raise ValueError(f"Backend GPIO desconegut: '{nom_backend}'. Valors vàlids: {BACKENDS_VALIDS}.")
+        if VARIABLE_ENTORN_RELLOTGE in os.environ:
+            rellotge_virtual = os.environ[VARIABLE_ENTORN_RELLOTGE] == '1'
+
+        if self._backend is not None:
+            if nom_backend != self.nom_backend:
+                print(f"Avís: El backend GPIO ja és '{self.nom_backend}'. Ignorant la selecció de '{nom_backend}'.")
+            return self._backend
+
+        if nom_backend == 'rpi':
+            try:
+                import RPi.GPIO as gpio_rpi
+                self._backend = gpio_rpi
+            except ImportError:
+                print("Avís: RPi.GPIO no disponible. Utilitzant el backend GPIO virtual.")
+                nom_backend = 'virtual'
+        if nom_backend == 'virtual':
+            self._backend = GPIOVirtual()
+        self.nom_backend = nom_backend
+        # Les funcions i constants del backend es copien a la instància perquè les crides
+        # freqüents (GPIO.output a cada pas) no passin per __getattr__
+        for nom in set(dir(self._backend)) | set(dir(type(self._backend))):
+            atribut = getattr(self._backend, nom)
+            if not nom.startswith('_') and (callable(atribut) or nom.isupper()):
+                setattr(self, nom, atribut)
+        print(f"BackendGPIO: Utilitzant el backend '{self.nom_backend}'.")
+
+        if rellotge_virtual:
+            if self.nom_backend == 'virtual':
+                self.rellotge = RellotgeVirtual()
+                self.rellotge.activar()
+            else:
+                print("Avís: El rellotge virtual només es pot activar amb el backend GPIO virtual.")
+        return self._backend
+
+    @property
+    def es_virtual(self) -> bool:
+        return self.nom_backend == 'virtual'
+
+    @property
+    def rellotge_virtual_actiu(self) -> bool:
+        """True si el RellotgeVirtual està actiu (les esperes actives es poden substituir per `time.sleep`)."""
+        return self.rellotge is not None and self.rellotge.actiu
+
+    def __getattr__(self, nom):
+        # Només s'arriba aquí per als atributs de la llibreria GPIO (output, setup, BCM, ...)
+        if self._backend is None:
+            self.seleccionar()
+        return getattr(self._backend, nom)
+
+
+GPIO = BackendGPIO()
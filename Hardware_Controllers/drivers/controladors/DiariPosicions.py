@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import time
+from typing import Dict
+
+class DiariPosicions:
+    """
+    Diari (journal) de posicions dels motors, resistent a caigudes, per poder reiniciar
+    el robot sense tornar a calibrar.
+
+    És un fitxer de només afegir (una línia JSON per registre):
+        * `{"tipus": "obertura"}`: Una sessió ha obert el diari.
+        * `{"tipus": "posicio", "motor": nom, "passos": n}`: Posició absoluta d'un motor al final d'un moviment.
+        * `{"tipus": "tancament"}`: La sessió s'ha tancat amb tots els motors aturats.
+
+    Cada registre s'escriu de seguida al fitxer, però el `fsync` (l'escriptura física al disc) es
+    fa per lots: cada `lot_fsync` registres o quan han passat `interval_fsync_s` segons des de l'últim.
+    El tancament sempre es sincronitza.
+
+    En obrir el diari, l'última sessió es considera neta només si acaba amb un tancament vàlid.
+    Si el programa o l'alimentació cauen (o hi havia un moviment en curs en tancar), no hi ha
+    tancament i les posicions no són fiables: `es_net` és False i cal calibrar.
+
+    En cada obertura el fitxer es compacta (només l'última posició de cada motor, si la sessió
+    anterior era neta) amb una substitució atòmica, així el diari no creix indefinidament.
+    """
+
+    def __init__(self, ruta_fitxer: str, lot_fsync: int = 16, interval_fsync_s: float = 0.5):
+        """
+        Args:
+            ruta_fitxer (str): Ruta del fitxer del diari. Es crea si no existeix.
+            lot_fsync (int): Nombre màxim de registres pendents de sincronitzar al disc.
+            interval_fsync_s (float): Temps màxim (s) entre sincronitzacions mentre s'hi escriu.
+        """
+        if lot_fsync < 1:
+            raise ValueError("`lot_fsync` ha de ser com a mínim 1.")
+        if interval_fsync_s < 0:
+            raise ValueError("`interval_fsync_s` ha de ser no negatiu.")
+        self.ruta_fitxer = ruta_fitxer
+        self.lot_fsync = lot_fsync
+        self.interval_fsync_s = interval_fsync_s
+
+        self.posicions = {} # nom del motor -> últim nombre absolut de passos registrat
+        self.es_net = False # True si la sessió anterior es va tancar correctament
+        self._moviments_en_curs = set() # Motors amb un moviment començat i encara no registrat
+        self._fitxer = None
+        self._pendents = 0
+        self._ultim_fsync = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.obrir()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tancar()
+
+    # --- Obertura i tancament ---
+
+    def obrir(self):
+        """Llegeix el diari existent, el compacta i comença una nova sessió."""
+        with self._lock:
+            if self._fitxer is not None:
+                return
+            self.posicions, self.es_net = self._llegir()
+            estat = "net" if self.es_net else "NO net (cal calibrar)"
+            print(f"DiariPosicions: '{self.ruta_fitxer}' llegit, tancament anterior {estat}. Posicions: {self.posicions}")
+
+            directori = os.path.dirname(os.path.abspath(self.ruta_fitxer))
+            os.makedirs(directori, exist_ok=True)
+            temporal = self.ruta_fitxer + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                # Les posicions d'una sessió no neta no es conserven: els motors s'hauran de calibrar
+                for motor, passos in (self.posicions.items() if self.es_net else ()):
+                    f.write(self._linia({"tipus": "posicio", "motor": motor, "passos": passos}))
+                f.write(self._linia({"tipus": "obertura", "hora": time.time()}))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.ruta_fitxer)
+            self._sincronitzar_directori(directori)
+
+            self._fitxer = open(self.ruta_fitxer, "a", encoding="utf-8")
+            self._pendents = 0
+            self._ultim_fsync = time.monotonic()
+
+    def tancar(self):
+        """
+        Tanca la sessió. Només hi escriu el registre de tancament (sessió neta) si cap motor
+        té un moviment en curs; si no, la propera arrencada haurà de calibrar.
+        """
+        with self._lock:
+            if self._fitxer is None:
+                return
+            if self._moviments_en_curs:
+                print(f"DiariPosicions: Tancant amb moviments en curs ({sorted(self._moviments_en_curs)}). El diari queda NO net.")
+            else:
+                self._fitxer.write(self._linia({"tipus": "tancament", "hora": time.time()}))
+            self._sincronitzar()
+            self._fitxer.close()
+            self._fitxer = None
+            print(f"DiariPosicions: '{self.ruta_fitxer}' tancat.")
+
+    # --- Registres ---
+
+    def inici_moviment(self, motor: str):
+        """Marca que un motor ha començat a moure's: fins que no se'n registri la posició, el diari no és net."""
+        with self._lock:
+            self._moviments_en_curs.add(motor)
+
+    def registrar_posicio(self, motor: str, passos: int):
+        """Afegeix la posició absoluta (passos) d'un motor al final d'un moviment."""
+        with self._lock:
+            self._moviments_en_curs.discard(motor)
+            self.posicions[motor] = passos
+            if self._fitxer is None:
+                return
+            self._fitxer.write(self._linia({"tipus": "posicio", "motor": motor, "passos": passos}))
+            self._pendents += 1
+            if self._pendents >= self.lot_fsync or time.monotonic() - self._ultim_fsync >= self.interval_fsync_s:
+                self._sincronitzar()
+
+    def sincronitzar(self):
+        """Força l'escriptura al disc dels registres pendents."""
+        with self._lock:
+            if self._fitxer is not None:
+                self._sincronitzar()
+
+    def posicio(self, motor: str):
+        """
+        Retorna l'última posició (passos) registrada per a un motor, o None si no és fiable
+        (la sessió anterior no es va tancar bé) o no n'hi ha cap.
+        """
+        return self.posicions.get(motor) if self.es_net else None
+
+    # --- Auxiliars ---
+
+    def _sincronitzar(self):
+        self._fitxer.flush()
+        os.fsync(self._fitxer.fileno())
+        self._pendents = 0
+        self._ultim_fsync = time.monotonic()
+
+    @staticmethod
+    def _sincronitzar_directori(directori: str):
+        """Sincronitza el directori perquè el canvi de nom del fitxer compactat sobrevisqui a una caiguda."""
+        try:
+            descriptor = os.open(directori, os.O_RDONLY)
+        except OSError:
+            return # Sistemes sense suport per obrir directoris (Windows)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def _linia(registre: Dict) -> str:
+        return json.dumps(registre, separators=(",", ":")) + "\n"
+
+    def _llegir(self):
+        """Retorna (posicions, es_net) a partir del fitxer existent."""
+        posicions = {}
+        if not os.path.exists(self.ruta_fitxer):
+            return posicions, False
+        es_net = False
+        with open(self.ruta_fitxer, "r", encoding="utf-8") as f:
+            for linia in f:
+                try:
+                    registre = json.loads(linia)
+                    tipus = registre["tipus"]
+                except (ValueError, KeyError, TypeError):
+                    # Línia truncada per una caiguda a mig escriure: el diari no és fiable
+                    print(f"DiariPosicions: Registre invàlid ignorat: {linia.strip()[:80]!r}")
+                    es_net = False
+                    continue
+                if tipus == "posicio":
+                    posicions[registre["motor"]] = int(registre["passos"])
+                    es_net = False
+                elif tipus == "obertura":
+                    es_net = False
+                elif tipus == "tancament":
+                    es_net = True
+        return posicions, es_net
@@ -1,4 +1,4 @@
-import RPi.GPIO as GPIO
+from .BackendGPIO import GPIO
 
 class Electroiman:
 
@@ -0,0 +1,208 @@
+import math
+
+from .BackendGPIO import GPIOVirtual
+
+# Seqüència de mig pas del 28BYJ-48 (IN1..IN4). Els patrons de pas complet són les fases parells.
+SEQUENCIA_MIG_PAS = (
+    (1, 0, 0, 0), (1, 1, 0, 0), (0, 1, 0, 0), (0, 1, 1, 0),
+    (0, 0, 1, 0), (0, 0, 1, 1), (0, 0, 0, 1), (1, 0, 0, 1),
+)
+FASE_PER_PATRO = {patro: fase for fase, patro in enumerate(SEQUENCIA_MIG_PAS)}
+
+class EventPasPerdut:
+    """
+    Pas ordenat pels pins que el rotor no ha pogut seguir.
+    """
+
+    def __init__(self, temps_ns: int, motiu: str, velocitat_ordenada: float, velocitat_rotor: float, passos: int):
+        self.temps_ns = temps_ns
+        self.motiu = motiu # 'velocitat', 'acceleracio' o 'patro' (salt de fase ambigu)
+        self.velocitat_ordenada = velocitat_ordenada # mig-passos/s
+        self.velocitat_rotor = velocitat_rotor # mig-passos/s
+        self.passos = passos
+
+    def __repr__(self):
+        return (f"EventPasPerdut(t={self.temps_ns / 1e9:.4f}s, motiu={self.motiu}, passos={self.passos}, "
+                f"ordenada={self.velocitat_ordenada:.1f}, rotor={self.velocitat_rotor:.1f} mig-passos/s)")
+
+
+class ModelMotorPasAPas:
+    """
+    Model simulat d'un 28BYJ-48 amb driver ULN2003, alimentat pel GPIOVirtual.
+
+    Descodifica la seqüència de bobines que escriu `MotorPasAPas` i integra la posició i la
+    velocitat de l'eix amb una corba parell/velocitat lineal:
+        parell_disponible(v) = parell_maxim * (1 - v / velocitat_maxima)
+
+    Un pas ordenat es perd quan:
+        * la velocitat ordenada supera la velocitat a la qual el parell disponible ja no
+          venç la càrrega ('velocitat'), o
+        * el canvi de velocitat respecte del rotor supera el que el rotor pot absorbir: un salt
+          fins a la freqüència d'arrencada (escalada pel parell que queda lliure) més
+          l'acceleració que permet el parell net sobre la inèrcia ('acceleracio').
+    Després d'un pas perdut el rotor perd el sincronisme i es considera aturat.
+
+    Totes les magnituds són a l'eix de sortida i les posicions en mig-passos. Els valors per
+    defecte són estimacions per al 28BYJ-48 a 5V i s'han d'ajustar amb mesures reals.
+    """
+
+    def __init__(self, nom: str, pins_in: list, passos_per_volta: int = 4096,
+                 parell_maxim_nm: float = 0.034, velocitat_maxima_passos_s: float = 1000.0,
+                 velocitat_arrencada_passos_s: float = 600.0, inercia_kg_m2: float = 2.5e-4,
+                 parell_carrega_nm: float = 0.0, temps_repos_s: float = 0.05):
+        """
+        Args:
+            nom (str): Nom del motor modelat.
+            pins_in (list): Pins IN1..IN4 (han de coincidir amb els del MotorPasAPas).
+            passos_per_volta (int): Mig-passos per volta de l'eix de sortida.
+            parell_maxim_nm (float): Parell disponible a velocitat 0 (N·m).
+            velocitat_maxima_passos_s (float): Velocitat (mig-passos/s) a la qual el parell disponible és 0.
+            velocitat_arrencada_passos_s (float): Freqüència d'arrencada sense rampa (pull-in) en buit (mig-passos/s).
+            inercia_kg_m2 (float): Inèrcia vista des de l'eix de sortida (rotor reflectit + càrrega).
+            parell_carrega_nm (float): Parell resistent constant de la càrrega (N·m).
+            temps_repos_s (float): Un pas que arriba després d'aquest temps es considera un arrencada des de repòs.
+        """
+        if len(pins_in) != 4:
+            raise ValueError("`pins_in` ha de ser una llista de 4 pins.")
+        if parell_maxim_nm <= 0 or velocitat_maxima_passos_s <= 0 or inercia_kg_m2 <= 0:
+            raise ValueError("`parell_maxim_nm`, `velocitat_maxima_passos_s` i `inercia_kg_m2` han de ser positius.")
+        if not 0 <= parell_carrega_nm < parell_maxim_nm:
+            raise ValueError("`parell_carrega_nm` ha de ser no negatiu i menor que `parell_maxim_nm`.")
+
+        self.nom = nom
+        self.pins_in = list(pins_in)
+        self.passos_per_volta = passos_per_volta
+        self.parell_maxim_nm = parell_maxim_nm
+        self.velocitat_maxima_passos_s = velocitat_maxima_passos_s
+        self.velocitat_arrencada_passos_s = velocitat_arrencada_passos_s
+        self.inercia_kg_m2 = inercia_kg_m2
+        self.parell_carrega_nm = parell_carrega_nm
+        self.temps_repos_ns = int(temps_repos_s * 1e9)
+        self._passos_per_radian = passos_per_volta / (2 * math.pi)
+        self._gpio = None
+        self.reiniciar()
+
+    @classmethod
+    def des_de_motor(cls, motor, **parametres) -> "ModelMotorPasAPas":
+        """Crea el model amb els pins i la resolució d'un MotorPasAPas."""
+        passos_per_volta = motor.passos_per_volta * (1 if motor.mode_passos == 'half' else 2)
+        return cls(motor.nom, motor.pins_in, passos_per_volta, **parametres)
+
+    def reiniciar(self):
+        """Posa el model a zero (posició, velocitat i registre de passos perduts)."""
+        self._pins = {pin: 0 for pin in self.pins_in}
+        self._fase = 0 # Última fase energitzada (0..7). A la posició 0 el rotor està alineat amb la fase 0
+        self._temps_ultim_pas_ns = None
+        self.posicio_passos = 0 # Posició real del rotor
+        self.posicio_ordenada_passos = 0 # Posició que ordenen els pins
+        self.velocitat_rotor = 0.0 # mig-passos/s (amb signe)
+        self.energitzat = False
+        self.passos_perduts = 0
+        self.events_passos_perduts = []
+
+    # --- Connexió amb el GPIO virtual ---
+
+    def connectar(self, gpio: GPIOVirtual):
+        """Comença a observar les escriptures de pins del GPIO virtual."""
+        self.desconnectar()
+        self._gpio = gpio
+        gpio.afegir_observador(self._en_canvi_pins)
+
+    def desconnectar(self):
+        if self._gpio is not None:
+            self._gpio.treure_observador(self._en_canvi_pins)
+            self._gpio = None
+
+    def _en_canvi_pins(self, temps_ns: int, canvis: dict):
+        propis = False
+        for pin, valor in canvis.items():
+            if pin in self._pins:
+                self._pins[pin] = valor
+                propis = True
+        if not propis:
+            return
+
+        patro = tuple(self._pins[pin] for pin in self.pins_in)
+        if not any(patro):
+            self.energitzat = False # Bobines desenergitzades: el rotor queda on és
+            self.velocitat_rotor = 0.0
+            return
+        fase = FASE_PER_PATRO.get(patro)
+        if fase is None:
+            return # Patró intermedi o no vàlid: no mou el rotor
+        self.energitzat = True
+
+        salt = (fase - self._fase) % 8
+        self._fase = fase
+        if salt == 0:
+            return
+        if salt == 4:
+            # Mig cicle elèctric: el sentit és ambigu i el rotor no el pot seguir
+            self._registrar_pas_perdut(temps_ns, 'patro', 0.0, 4)
+            return
+        passos = salt if salt < 4 else salt - 8
+        self._pas_ordenat(temps_ns, passos)
+
+    # --- Dinàmica ---
+
+    def parell_disponible(self, velocitat_passos_s: float) -> float:
+        """Parell (N·m) disponible a una velocitat (mig-passos/s) segons la corba lineal."""
+        return max(0.0, self.parell_maxim_nm * (1 - abs(velocitat_passos_s) / self.velocitat_maxima_passos_s))
+
+    def velocitat_limit(self) -> float:
+        """Velocitat màxima (mig-passos/s) a la qual el motor encara venç la càrrega."""
+        return self.velocitat_maxima_passos_s * (1 - self.parell_carrega_nm / self.parell_maxim_nm)
+
+    def acceleracio_maxima(self, velocitat_passos_s: float, frenant: bool = False) -> float:
+        """Acceleració màxima (mig-passos/s²). En frenada, la càrrega ajuda el motor."""
+        parell = self.parell_disponible(velocitat_passos_s)
+        parell_net = parell + self.parell_carrega_nm if frenant else parell - self.parell_carrega_nm
+        return max(0.0, parell_net) / self.inercia_kg_m2 * self._passos_per_radian
+
+    def salt_velocitat_admissible(self, velocitat_passos_s: float) -> float:
+        """Salt de velocitat (mig-passos/s) que el rotor absorbeix sense rampa, segons el parell lliure."""
+        parell_lliure = self.parell_disponible(velocitat_passos_s) - self.parell_carrega_nm
+        return max(0.0, self.velocitat_arrencada_passos_s * parell_lliure / self.parell_maxim_nm)
+
+    def _pas_ordenat(self, temps_ns: int, passos: int):
+        self.posicio_ordenada_passos += passos
+        temps_anterior_ns = self._temps_ultim_pas_ns
+        self._temps_ultim_pas_ns = temps_ns
+
+        if temps_anterior_ns is None or temps_ns - temps_anterior_ns >= self.temps_repos_ns:
+            # Arrencada des de repòs: el primer pas sempre es pot seguir
+            self.velocitat_rotor = 0.0
+            self.posicio_passos += passos
+            return
+
+        dt = max(temps_ns - temps_anterior_ns, 1) / 1e9
+        velocitat_ordenada = passos / dt
+        frenant = abs(velocitat_ordenada) < abs(self.velocitat_rotor) or velocitat_ordenada * self.velocitat_rotor < 0
+        canvi_maxim = self.salt_velocitat_admissible(self.velocitat_rotor) + self.acceleracio_maxima(self.velocitat_rotor, frenant) * dt
+
+        if abs(velocitat_ordenada) > self.velocitat_limit():
+            self._registrar_pas_perdut(temps_ns, 'velocitat', velocitat_ordenada, abs(passos))
+        elif abs(velocitat_ordenada - self.velocitat_rotor) > canvi_maxim:
+            self._registrar_pas_perdut(temps_ns, 'acceleracio', velocitat_ordenada, abs(passos))
+        else:
+            self.velocitat_rotor = velocitat_ordenada
+            self.posicio_passos += passos
+
+    def _registrar_pas_perdut(self, temps_ns: int, motiu: str, velocitat_ordenada: float, passos: int):
+        self.passos_perduts += passos
+        self.events_passos_perduts.append(EventPasPerdut(temps_ns, motiu, velocitat_ordenada, self.velocitat_rotor, passos))
+        self.velocitat_rotor = 0.0 # El rotor perd el sincronisme
+
+    # --- Consultes ---
+
+    def obtenir_posicio_graus(self) -> float:
+        """Posició real de l'eix en graus."""
+        return self.posicio_passos * 360.0 / self.passos_per_volta
+
+    def error_posicio_passos(self) -> int:
+        """Diferència entre la posició ordenada i la real (mig-passos)."""
+        return self.posicio_ordenada_passos - self.posicio_passos
+
+    def __repr__(self):
+        return (f"ModelMotorPasAPas(nom={self.nom}, posicio={self.posicio_passos} "
+                f"(ordenada {self.posicio_ordenada_passos}), passos_perduts={self.passos_perduts})")
@@ -1,10 +1,83 @@
-import RPi.GPIO as GPIO
+from .BackendGPIO import GPIO
+from .DiariPosicions import DiariPosicions
+from .SenyalCancelacio import SenyalCancelacio
+from ..PlanificadorTrajectories import acceleracio_mitjana as acceleracio_mitjana_rampa
+import math
 import time
 
 # Assegura que GPIO.cleanup() es crida en sortir del programa,
 # però això ho gestionarà el context manager i/o __del__ de la classe.
 # atexit.register(GPIO.cleanup) # Podria ser problemàtic si s'usa amb diversos motors/dispositius GPIO
 
+# Per sota d'aquest marge (ns) no es confia en time.sleep() i s'espera activament fins al deadline
+MARGE_ESPERA_ACTIVA_NS = 1_000_000
+
+def esperar_fins_a(deadline_ns: int):
+    """
+    Espera fins a l'instant absolut `deadline_ns` (rellotge time.perf_counter_ns()).
+    Dorm fins a 1 ms abans del deadline i fa espera activa el darrer tram, on
+    time.sleep() no és prou precís.
+    """
+    restant_ns = deadline_ns - time.perf_counter_ns()
+    if GPIO.rellotge_virtual_actiu:
+        # Amb el rellotge virtual, time.sleep és exacte i instantani: no cal espera activa
+        if restant_ns > 0:
+            time.sleep(restant_ns / 1e9)
+        return
+    if restant_ns > MARGE_ESPERA_ACTIVA_NS:
+        time.sleep((restant_ns - MARGE_ESPERA_ACTIVA_NS) / 1e9)
+    while time.perf_counter_ns() < deadline_ns:
+        pass
+
+class EstadistiquesMoviment:
+    """
+    Estadístiques de temps d'un moviment: temps planificat davant del temps real aconseguit.
+
+    El retard d'un pas és la diferència entre l'instant real de l'escriptura als GPIO
+    i el seu deadline planificat. Serveixen per ajustar velocitats i acceleracions.
+    """
+
+    def __init__(self, passos: int, durada_planificada_s: float):
+        self.passos = passos
+        self.durada_planificada_s = durada_planificada_s
+        self.durada_real_s = None
+        self.passos_fets = 0
+        self.retard_maxim_s = 0.0
+        self._retard_total_ns = 0
+
+    def registrar_pas(self, retard_ns: int):
+        """Registra el retard (ns) d'un pas respecte al seu deadline."""
+        self.passos_fets += 1
+        retard_ns = max(retard_ns, 0)
+        self._retard_total_ns += retard_ns
+        if retard_ns / 1e9 > self.retard_maxim_s:
+            self.retard_maxim_s = retard_ns / 1e9
+
+    def tancar(self, durada_real_ns: int):
+        """Tanca les estadístiques amb la durada real del moviment."""
+        self.durada_real_s = durada_real_ns / 1e9
+
+    @property
+    def retard_mitja_s(self) -> float:
+        return self._retard_total_ns / 1e9 / self.passos_fets if self.passos_fets else 0.0
+
+    @property
+    def velocitat_planificada(self) -> float:
+        """Velocitat mitjana planificada (passos/s)."""
+        return self.passos / self.durada_planificada_s if self.durada_planificada_s > 0 else 0.0
+
+    @property
+    def velocitat_real(self) -> float:
+        """Velocitat mitjana aconseguida (passos/s)."""
+        return self.passos_fets / self.durada_real_s if self.durada_real_s else 0.0
+
+    def __repr__(self):
+        durada_real = f"{self.durada_real_s:.3f}s" if self.durada_real_s is not None else "en curs"
+        return (f"EstadistiquesMoviment(passos={self.passos_fets}/{self.passos}, "
+                f"durada={durada_real} (planificada {self.durada_planificada_s:.3f}s), "
+                f"velocitat={self.velocitat_real:.1f}/{self.velocitat_planificada:.1f} passos/s, "
+                f"retard màxim={self.retard_maxim_s * 1e3:.3f}ms, retard mitjà={self.retard_mitja_s * 1e3:.3f}ms)")
+
 class MotorPasAPas:
     """
     Classe per controlar un motor pas a pas (Stepper Motor), especialment dissenyada
@@ -15,7 +88,12 @@ class MotorPasAPas:
     DIRECCIO_ENDAVANT = True
     DIRECCIO_ENRERE = False
 
-    def __init__(self, nom: str, pins_in: list, passos_per_volta_motor: int = 32, reduccio_engranatge: float = 64.0, mode_passos: str = 'half'):
+    # Perfils de rampa suportats per a la generació de passos
+    PERFILS_RAMPA = ('trapezoidal', 'scurve')
+
+    def __init__(self, nom: str, pins_in: list, passos_per_volta_motor: int = 32, reduccio_engranatge: float = 64.0, mode_passos: str = 'half',
+                 acceleracio_graus_per_segon2: float = None, perfil_rampa: str = 'trapezoidal',
+                 diari_posicions: DiariPosicions = None, senyal_cancelacio: SenyalCancelacio = None):
         """
         Inicialitza una nova instància de MotorPasAPas.
 
@@ -28,6 +106,13 @@ class MotorPasAPas:
                                          Per al 28BYJ-48, sol ser aproximadament 63.68395, però 64.0 és comú per simplicitat.
             mode_passos (str): Mode de funcionament dels passos ('full' o 'half').
                                El 28BYJ-48 normalment es fa servir en 'half' per més precisió i suavitat.
+            acceleracio_graus_per_segon2 (float): Acceleració per defecte de les rampes (graus/s²).
+                                                  None o 0 per moure's a velocitat constant (sense rampa).
+            perfil_rampa (str): Forma de les rampes ('trapezoidal' o 'scurve').
+            diari_posicions (DiariPosicions): (Opcional) Diari on es registra la posició absoluta al final de
+                                              cada moviment, per poder-la restaurar en reiniciar sense calibrar.
+            senyal_cancelacio (SenyalCancelacio): (Opcional) Senyal compartit que es consulta a cada pas per
+                                                  interrompre el moviment (p. ex. l'aturada d'emergència).
         """
         self._is_setup = False # Nou: Estat per saber si els pins estan configurats
         if not all(isinstance(pin, int) for pin in pins_in) or len(pins_in) != 4:
@@ -36,12 +121,18 @@ class MotorPasAPas:
             raise ValueError("`mode_passos` ha de ser 'full' o 'half'.")
         if passos_per_volta_motor <= 0 or reduccio_engranatge <= 0:
             raise ValueError("`passos_per_volta_motor` i `reduccio_engranatge` han de ser valors positius.")
+        if acceleracio_graus_per_segon2 is not None and acceleracio_graus_per_segon2 < 0:
+            raise ValueError("`acceleracio_graus_per_segon2` ha de ser un valor no negatiu.")
+        if perfil_rampa not in self.PERFILS_RAMPA:
+            raise ValueError(f"`perfil_rampa` ha de ser un de {self.PERFILS_RAMPA}.")
 
         self.nom = nom
         self.pins_in = pins_in
         self.passos_per_volta_motor = passos_per_volta_motor
         self.reduccio_engranatge = reduccio_engranatge
         self.mode_passos = mode_passos
+        self.acceleracio_graus_per_segon2 = acceleracio_graus_per_segon2
+        self.perfil_rampa = perfil_rampa
         
         #self._is_setup = False # Nou: Estat per saber si els pins estan configurats
         self.num_pins_control = len(self.pins_in)
@@ -57,11 +148,21 @@ class MotorPasAPas:
             self.passos_per_volta = round(self.passos_per_volta_motor * self.reduccio_engranatge)
             self.min_angle_per_step = 360.0 / self.passos_per_volta
 
+        # Taules de patrons de pins construïdes una sola vegada (una entrada per pas de la seqüència)
+        self._taules_passos = {mode: self._construir_taula_passos(mode) for mode in ('full', 'half')}
+        self._taula_passos = self._taules_passos[self.mode_passos]
+
         self.posicio_actual_passos = 0 # La variable que emmagatzema la posició actual absoluta del motor en "mig-passos efectius"
+        self.estadistiques_ultim_moviment = None # EstadistiquesMoviment de l'últim moviment fet amb moure_n_passos
+        self.diari_posicions = diari_posicions
+        self.posicio_restaurada = False # True si la posició s'ha restaurat del diari en lloc de calibrar
+        self.senyal_cancelacio = senyal_cancelacio
         
         print(f"Motor '{self.nom}' inicialitzat internament.")
         print(f"  Pins de control: {self.pins_in}")
         print(f"  Mode de passos: {self.mode_passos}")
+        if self.acceleracio_graus_per_segon2:
+            print(f"  Rampa: {self.perfil_rampa} a {self.acceleracio_graus_per_segon2} graus/s²")
         print(f"  Passos per volta completa (eix de sortida): {self.passos_per_volta}")
         print(f"  Posició actual inicial: {self.posicio_actual_passos} passos.")
 
@@ -114,8 +215,7 @@ class MotorPasAPas:
         Posa tots els pins del motor a LOW per desenergitzar les bobines.
         """
         if self._is_setup:
-            for pin in self.pins_in:
-                GPIO.output(pin, GPIO.LOW)
+            GPIO.output(self.pins_in, [GPIO.LOW] * self.num_pins_control)
             print(f"Motor '{self.nom}': Bobines desenergitzades.")
         else:
             print(f"Motor '{self.nom}': Pins no configurats, no es pot desenergitzar.")
@@ -149,40 +249,63 @@ class MotorPasAPas:
         else:
             print(f"Motor '{self.nom}': Pins no configurats, no es pot netejar.")
 
-    def _set_pin_states(self, pins_to_set: list):
+    def _set_pin_states(self, pins_to_set: tuple):
         """
-        Configura l'estat dels pins GPIO segons el patró donat.
+        Configura l'estat dels pins GPIO segons el patró donat, amb una sola escriptura per als 4 pins.
         """
         if not self._is_setup:
             print(f"ERROR: El motor '{self.nom}' no està configurat. No es poden establir els estats dels pins.")
             return
 
-        for i in range(self.num_pins_control):
-            try:
-                GPIO.output(self.pins_in[i], pins_to_set[i])
-            except Exception as e:
-                print(f"ERROR al configurar el pin {self.pins_in[i]}: {e}")
+        try:
+            GPIO.output(self.pins_in, pins_to_set)
+        except Exception as e:
+            print(f"ERROR al configurar els pins {self.pins_in}: {e}")
 
-    def _get_step_pattern(self, step_index: int) -> list:
+    def _avancar_pas(self, direccio: bool) -> tuple:
         """
-        Genera el patró de pins per a un índex de pas donat, envoltant la seqüència.
-        Aquesta funció implementa la lògica de generació dinàmica.
+        Actualitza la posició interna en un pas i retorna el patró de pins corresponent,
+        sense escriure'l als GPIO. Permet que un generador extern agrupi les escriptures
+        de diversos motors en una sola crida.
         """
-        normalized_step_index = step_index % self.num_pasos_seq
-        
-        output = [0] * self.num_pins_control
+        if direccio == self.DIRECCIO_ENDAVANT:
+            self.posicio_actual_passos += 1
+        else: # DIRECCIO_ENRERE
+            self.posicio_actual_passos -= 1
+        return self._get_step_pattern(self.posicio_actual_passos)
 
-        if self.mode_passos == 'full':
-            output[normalized_step_index] = 1
-        elif self.mode_passos == 'half':
-            if normalized_step_index % 2 == 0:
-                output[normalized_step_index // 2] = 1
-            else:
-                pos1 = normalized_step_index // 2
-                pos2 = (pos1 + 1) % self.num_pins_control
-                output[pos1] = 1
-                output[pos2] = 1
-        return output
+    def _construir_taula_passos(self, mode_passos: str) -> tuple:
+        """
+        Construeix la seqüència completa de patrons de pins per al mode de passos donat.
+
+        Returns:
+            tuple: Una tupla de patrons (tuples de 0/1, un valor per pin), indexada per pas.
+        """
+        taula = []
+        if mode_passos == 'full':
+            for index in range(self.num_pins_control):
+                output = [0] * self.num_pins_control
+                output[index] = 1
+                taula.append(tuple(output))
+        elif mode_passos == 'half':
+            for index in range(self.num_pins_control * 2):
+                output = [0] * self.num_pins_control
+                if index % 2 == 0:
+                    output[index // 2] = 1
+                else:
+                    pos1 = index // 2
+                    pos2 = (pos1 + 1) % self.num_pins_control
+                    output[pos1] = 1
+                    output[pos2] = 1
+                taula.append(tuple(output))
+        return tuple(taula)
+
+    def _get_step_pattern(self, step_index: int) -> tuple:
+        """
+        Retorna el patró de pins per a un índex de pas donat, envoltant la seqüència.
+        El patró ve de la taula precalculada a `__init__`.
+        """
+        return self._taula_passos[step_index % self.num_pasos_seq]
 
     def _calculate_delay_from_speed(self, velocitat_graus_per_segon: float) -> float:
         """
@@ -209,6 +332,71 @@ class MotorPasAPas:
         delay = 1.0 / velocitat_passos_per_segon
         return delay
 
+    def _calcular_programa_delays(self, passos: int, velocitat_graus_per_segon: float,
+                                  acceleracio_graus_per_segon2: float = None, perfil_rampa: str = 'trapezoidal') -> list:
+        """
+        Calcula per endavant el delay (segons) que segueix a cada pas d'un moviment.
+
+        Sense acceleració, tots els delays són iguals (velocitat constant). Amb acceleració,
+        el moviment té una rampa d'acceleració, un tram de creuer i una rampa de
+        desacceleració simètrica. Si no hi ha prou passos per arribar a la velocitat
+        de creuer, el perfil és triangular.
+
+        Args:
+            passos (int): Nombre de passos del moviment.
+            velocitat_graus_per_segon (float): Velocitat de creuer (graus/s).
+            acceleracio_graus_per_segon2 (float): Acceleració de pic (graus/s²). None o 0 per no fer rampa.
+            perfil_rampa (str): 'trapezoidal' (acceleració constant) o 'scurve' (rampa sinusoïdal).
+
+        Returns:
+            list: Llista de `passos` delays en segons.
+        """
+        delay_creuer = self._calculate_delay_from_speed(velocitat_graus_per_segon)
+        if passos <= 0:
+            return []
+        if not acceleracio_graus_per_segon2:
+            return [delay_creuer] * passos
+        if perfil_rampa not in self.PERFILS_RAMPA:
+            raise ValueError(f"`perfil_rampa` ha de ser un de {self.PERFILS_RAMPA}.")
+
+        passos_per_grau = self.passos_per_volta / 360.0
+        velocitat = 1.0 / delay_creuer # passos/s
+        acceleracio = acceleracio_graus_per_segon2 * passos_per_grau # passos/s²
+        # Mateixa acceleració mitjana que el planificador (2/π del pic a la rampa sinusoïdal)
+        acceleracio_mitjana = acceleracio_mitjana_rampa(acceleracio, perfil_rampa)
+
+        passos_rampa = velocitat ** 2 / (2 * acceleracio_mitjana)
+        if 2 * passos_rampa > passos:
+            # Perfil triangular: la velocitat de pic és la que s'assoleix a mig recorregut
+            passos_rampa = passos / 2
+            velocitat = math.sqrt(2 * acceleracio_mitjana * passos_rampa)
+        temps_rampa = velocitat / acceleracio_mitjana
+
+        def posicio_rampa(t: float) -> float:
+            # Passos recorreguts durant la rampa d'acceleració a l'instant t
+            if perfil_rampa == 'scurve':
+                return velocitat / 2 * (t - temps_rampa / math.pi * math.sin(math.pi * t / temps_rampa))
+            return acceleracio_mitjana * t * t / 2
+
+        instants = [0.0]
+        for k in range(1, int(passos_rampa) + 1):
+            if perfil_rampa == 'scurve':
+                # Invertim la posició per bisecció (la funció és monòtona a la rampa)
+                t_min, t_max = instants[-1], temps_rampa
+                for _ in range(40):
+                    t_mig = (t_min + t_max) / 2
+                    if posicio_rampa(t_mig) < k:
+                        t_min = t_mig
+                    else:
+                        t_max = t_mig
+                instants.append(t_max)
+            else:
+                instants.append(math.sqrt(2 * k / acceleracio_mitjana))
+
+        delays_rampa = [instants[i] - instants[i - 1] for i in range(1, len(instants))]
+        passos_creuer = passos - 2 * len(delays_rampa)
+        return delays_rampa + [1.0 / velocitat] * passos_creuer + delays_rampa[::-1]
+
     def release_motor(self):
         """
         Mètode públic per desenergitzar manualment el motor (posar tots els pins a LOW).
@@ -216,43 +404,81 @@ class MotorPasAPas:
         print(f"Motor '{self.nom}': Desenergitzant bobines del motor manualment...")
         self._desenergitzar_pins()
 
-    def moure_n_passos(self, passos: int, direccio: bool, velocitat_graus_per_segon: float = 60.0):
+    def moure_n_passos(self, passos: int, direccio: bool, velocitat_graus_per_segon: float = 60.0,
+                       acceleracio_graus_per_segon2: float = None, perfil_rampa: str = None):
         """
         Mou el motor un nombre determinat de passos.
 
         Args:
             passos (int): Nombre de passos a moure (valor absolut).
             direccio (bool): True per direcció endavant (horari), False per enrere (anti-horari).
-            velocitat_graus_per_segon (float): Velocitat desitjada en graus per segon.
+            velocitat_graus_per_segon (float): Velocitat desitjada (de creuer) en graus per segon.
+            acceleracio_graus_per_segon2 (float): Acceleració de les rampes en graus/s².
+                                                  None per utilitzar la del motor, 0 per no fer rampa.
+            perfil_rampa (str): 'trapezoidal' o 'scurve'. None per utilitzar el del motor.
+
+        Returns:
+            bool: True si el moviment s'ha completat, False si el `senyal_cancelacio` l'ha interromput
+                  (la posició queda al pas exacte on s'ha aturat).
         """
         if not self._is_setup:
             print(f"ERROR: El motor '{self.nom}' no està configurat. No es pot moure.")
-            return
+            return False
 
         if not isinstance(passos, int) or passos < 0:
             raise ValueError("`passos` ha de ser un enter no negatiu.")
         
-        delay = self._calculate_delay_from_speed(velocitat_graus_per_segon)
-
-        print(f"Motor '{self.nom}': Movent {passos} passos cap a {'endavant' if direccio else 'enrere'} a {velocitat_graus_per_segon} graus/segon (delay: {delay:.4f}s/pas)...")
+        if acceleracio_graus_per_segon2 is None:
+            acceleracio_graus_per_segon2 = self.acceleracio_graus_per_segon2
+        if perfil_rampa is None:
+            perfil_rampa = self.perfil_rampa
 
-        for _ in range(passos):
-            if direccio == self.DIRECCIO_ENDAVANT:
-                self.posicio_actual_passos += 1
-            else: # DIRECCIO_ENRERE
-                self.posicio_actual_passos -= 1
-            
-            step_pattern = self._get_step_pattern(self.posicio_actual_passos)
+        delay = self._calculate_delay_from_speed(velocitat_graus_per_segon)
+        # Programa de delays calculat abans de començar per no afegir càlculs dins del bucle de passos
+        delays = self._calcular_programa_delays(passos, velocitat_graus_per_segon, acceleracio_graus_per_segon2, perfil_rampa)
+
+        rampa_str = f", rampa {perfil_rampa} a {acceleracio_graus_per_segon2} graus/s²" if acceleracio_graus_per_segon2 else ""
+        print(f"Motor '{self.nom}': Movent {passos} passos cap a {'endavant' if direccio else 'enrere'} a {velocitat_graus_per_segon} graus/segon (delay: {delay:.4f}s/pas{rampa_str}, durada: {sum(delays):.3f}s)...")
+
+        # Cada pas té un deadline absolut (des de l'inici del moviment), de manera que el temps
+        # de càlcul i d'escriptura dels pins no s'acumula pas a pas.
+        # El senyal de cancel·lació es consulta abans de cada pas: una aturada triga com a molt un període de pas.
+        senyal = self.senyal_cancelacio
+        interromput = False
+        estadistiques = EstadistiquesMoviment(passos, sum(delays))
+        self._registrar_inici_moviment()
+        inici_ns = time.perf_counter_ns()
+        instant_pas = 0.0
+        for delay_pas in delays:
+            deadline_ns = inici_ns + int(instant_pas * 1e9)
+            esperar_fins_a(deadline_ns)
+            if senyal is not None and senyal.activa:
+                interromput = True
+                break
+            step_pattern = self._avancar_pas(direccio)
             self._set_pin_states(step_pattern)
-            time.sleep(delay)
+            estadistiques.registrar_pas(time.perf_counter_ns() - deadline_ns)
+            instant_pas += delay_pas
+        if not interromput:
+            esperar_fins_a(inici_ns + int(instant_pas * 1e9))
+        estadistiques.tancar(time.perf_counter_ns() - inici_ns)
+        self.estadistiques_ultim_moviment = estadistiques
         
         # Desenergitzar les bobines al final del moviment per estalviar energia i evitar sobreescalfament.
         self._desenergitzar_pins() 
+        self._registrar_posicio()
 
+        if interromput:
+            print(f"Motor '{self.nom}': Moviment INTERROMPUT ({senyal.motiu}) després de {estadistiques.passos_fets}/{passos} passos. "
+                  f"Posició actual: {self.posicio_actual_passos} passos ({self.obtenir_posicio_graus():.2f} graus).")
+            return False
         print(f"Motor '{self.nom}': Moviment de {passos} passos completat. Posició actual: {self.posicio_actual_passos} passos.")
+        print(f"Motor '{self.nom}': {estadistiques}")
+        return True
 
 
-    def moure_n_graus(self, graus: float, direccio: bool, velocitat_graus_per_segon: float = 60.0):
+    def moure_n_graus(self, graus: float, direccio: bool, velocitat_graus_per_segon: float = 60.0,
+                      acceleracio_graus_per_segon2: float = None, perfil_rampa: str = None):
         """
         Mou el motor un nombre determinat de graus.
 
@@ -260,10 +486,15 @@ class MotorPasAPas:
             graus (float): Quantitat de graus a moure.
             direccio (bool): True per direcció endavant (horari), False per enrere (anti-horari).
             velocitat_graus_per_segon (float): Velocitat desitjada en graus per segon. 
+            acceleracio_graus_per_segon2 (float): Acceleració de les rampes (vegeu `moure_n_passos`).
+            perfil_rampa (str): Forma de les rampes (vegeu `moure_n_passos`).
+
+        Returns:
+            bool: True si el moviment s'ha completat, False si no s'ha pogut fer o s'ha interromput.
         """
         if not self._is_setup:
             print(f"ERROR: El motor '{self.nom}' no està configurat. No es pot moure.")
-            return
+            return False
 
         if not isinstance(graus, (int, float)) or graus < 0:
             raise ValueError("`graus` ha de ser un valor numèric no negatiu.")
@@ -273,19 +504,25 @@ class MotorPasAPas:
             passos_a_moure = 1
 
         print(f"Motor '{self.nom}': Calculats {passos_a_moure} passos per {graus:.2f} graus.")
-        self.moure_n_passos(passos_a_moure, direccio, velocitat_graus_per_segon)
+        return self.moure_n_passos(passos_a_moure, direccio, velocitat_graus_per_segon, acceleracio_graus_per_segon2, perfil_rampa)
 
-    def moure_a_graus(self, graus_objectiu: float, velocitat_graus_per_segon: float = 60.0):
+    def moure_a_graus(self, graus_objectiu: float, velocitat_graus_per_segon: float = 60.0,
+                      acceleracio_graus_per_segon2: float = None, perfil_rampa: str = None):
         """
         Mou el motor a una posició angular absoluta (0-359.99 graus).
 
         Args:
             graus_objectiu (float): Posició angular objectiu en graus.
             velocitat_graus_per_segon (float): Velocitat desitjada en graus per segon.
+            acceleracio_graus_per_segon2 (float): Acceleració de les rampes (vegeu `moure_n_passos`).
+            perfil_rampa (str): Forma de les rampes (vegeu `moure_n_passos`).
+
+        Returns:
+            bool: True si el motor és a la posició objectiu, False si no s'ha pogut moure o s'ha interromput.
         """
         if not self._is_setup:
             print(f"ERROR: El motor '{self.nom}' no està configurat. No es pot moure.")
-            return
+            return False
 
         if not isinstance(graus_objectiu, (int, float)):
             raise ValueError("`graus_objectiu` ha de ser un valor numèric.")
@@ -297,7 +534,7 @@ class MotorPasAPas:
         # Ho gestionem a moure_n_graus.
         if abs(graus_a_moure) < (self.min_angle_per_step/2): # Si la diferència és menor que mig pas
             print(f"Motor '{self.nom}': Ja a la posició objectiu de {graus_objectiu:.2f} graus (diferència insignificant).")
-            return
+            return True
 
         # Decideix la direcció més curta
         direccio = self.DIRECCIO_ENDAVANT
@@ -307,7 +544,7 @@ class MotorPasAPas:
             graus_a_moure = abs(graus_a_moure)
         
         print(f"Motor '{self.nom}': De {posicio_antiga_graus:.2f} graus a {graus_objectiu:.2f} graus. Movent {graus_a_moure:.2f} graus.")
-        self.moure_n_graus(graus_a_moure, direccio, velocitat_graus_per_segon)
+        return self.moure_n_graus(graus_a_moure, direccio, velocitat_graus_per_segon, acceleracio_graus_per_segon2, perfil_rampa)
         
     def calibrar(self, grausAMoure: float = 0.0, direccio_calibratge: bool = DIRECCIO_ENRERE, velocitat_graus_per_segon: float = 60.0):
         """
@@ -334,9 +571,38 @@ class MotorPasAPas:
         print(f"Simulant calibratge: movent {grausAMoure} passos i establint la posició a 0.")
         self.moure_n_graus(grausAMoure, direccio_calibratge, velocitat_graus_per_segon)
         self.posicio_actual_passos = 0 # Un cop "trobat" el final de carrera, la posició és 0
+        self.posicio_restaurada = False
+        self._registrar_posicio()
 
         print(f"Motor '{self.nom}': Calibrat. Posició actual establerta a {self.posicio_actual_passos} passos.")
 
+    def restaurar_posicio(self) -> bool:
+        """
+        Restaura la posició absoluta des del diari de posicions, si la sessió anterior es va
+        tancar correctament. Permet saltar-se el calibratge en reiniciar.
+
+        Returns:
+            bool: True si s'ha restaurat la posició; False si cal calibrar (sense diari, diari no net o sense registre del motor).
+        """
+        if self.diari_posicions is None:
+            return False
+        passos = self.diari_posicions.posicio(self.nom)
+        if passos is None:
+            print(f"Motor '{self.nom}': No hi ha cap posició fiable al diari. Cal calibrar.")
+            return False
+        self.posicio_actual_passos = passos
+        self.posicio_restaurada = True
+        print(f"Motor '{self.nom}': Posició restaurada del diari: {self.posicio_actual_passos} passos ({self.obtenir_posicio_graus():.2f} graus).")
+        return True
+
+    def _registrar_inici_moviment(self):
+        if self.diari_posicions is not None:
+            self.diari_posicions.inici_moviment(self.nom)
+
+    def _registrar_posicio(self):
+        if self.diari_posicions is not None:
+            self.diari_posicions.registrar_posicio(self.nom, self.posicio_actual_passos)
+
     def obtenir_posicio_graus(self) -> float:
         """
         Retorna la posició actual del motor en graus.
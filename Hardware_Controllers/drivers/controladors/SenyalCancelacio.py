@@ -0,0 +1,49 @@
+import threading
+import time
+from .BackendGPIO import GPIO
+
+class SenyalCancelacio:
+    """
+    Senyal de cancel·lació compartit entre els motors d'un robot.
+
+    Els bucles de moviment (`MotorPasAPas.moure_n_passos`, el `GeneradorPassos` i
+    `Servomotor.move_to_angle`) el consulten a cada pas: quan s'activa (`cancelar`), el
+    moviment s'atura com a molt un període de pas després i la posició que queda registrada
+    és l'exacta on s'ha aturat. El senyal queda actiu fins que es crida `reiniciar()`.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.motiu = None # Descripció de qui ha demanat la cancel·lació
+
+    @property
+    def activa(self) -> bool:
+        return self._event.is_set()
+
+    def cancelar(self, motiu: str = "cancel·lació"):
+        """Activa el senyal: tots els moviments que el comparteixen s'aturen."""
+        self.motiu = motiu
+        self._event.set()
+
+    def reiniciar(self):
+        """Desactiva el senyal perquè es puguin tornar a fer moviments."""
+        self.motiu = None
+        self._event.clear()
+
+    def esperar(self, segons: float) -> bool:
+        """
+        Dorm `segons` o fins que s'activa el senyal, el que passi abans.
+
+        Returns:
+            bool: True si s'ha esperat tot el temps, False si el senyal s'ha activat.
+        """
+        if segons <= 0:
+            return not self.activa
+        if GPIO.rellotge_virtual_actiu:
+            # El rellotge virtual no avança amb Event.wait: es dorm el temps simulat
+            time.sleep(segons)
+            return not self.activa
+        return not self._event.wait(segons)
+
+    def __repr__(self):
+        return f"SenyalCancelacio(activa={self.activa}, motiu={self.motiu!r})"
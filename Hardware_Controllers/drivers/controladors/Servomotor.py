@@ -1,4 +1,6 @@
-import RPi.GPIO as GPIO
+from .BackendGPIO import GPIO
+from .SenyalCancelacio import SenyalCancelacio
+import math
 import time
 
 class Servomotor:
@@ -36,10 +38,18 @@ class Servomotor:
             (e.g., un braç robòtic), només vols que es mogui entre 45° i 135° per evitar col·lisions.
             Això s'usa per mapejar els angles desitjats a un rang de moviment segur i útil.
 
+    4.  Model de temps del moviment (opcional):
+        * `velocitat_graus_per_segon`, `temps_estabilitzacio_s`: Velocitat del servo amb la seva
+            càrrega i temps que triga a quedar quiet en arribar, mesurats un cop per a cada servo.
+            Amb aquests valors, `move_to_angle` espera només el temps que necessita el moviment
+            (|Δangle| / velocitat + estabilització) en lloc d'un `delay` fix.
+
     La classe utilitza el protocol de gestió de context (`with ... as ...`) per assegurar
     una neteja segura dels pins GPIO un cop finalitzat el seu ús.
     """
 
+    DELAY_PER_DEFECTE = 0.5 # Espera (s) sense model de temps ni delay explícit
+
     def __init__(self, nom_servomotor: str, pin_gpio: int,
                  pwm_frequency: int = 50,
                  # Paràmetres de calibració del cicle de treball per a aquest servomotor específic
@@ -53,7 +63,10 @@ class Servomotor:
                  angle_validation_min: float = 0.0, angle_validation_max: float = 180.0,
                  # Límits ABSOLUTS de validació del cicle de treball (per si el sistema PWM és no convencional)
                  # Són les "barreres de seguretat" de la carretera del senyal PWM.
-                 duty_cycle_validation_min: float = 0.0, duty_cycle_validation_max: float = 100.0):
+                 duty_cycle_validation_min: float = 0.0, duty_cycle_validation_max: float = 100.0,
+                 # Model de temps del moviment (mesurat un cop per a aquest servo)
+                 velocitat_graus_per_segon: float = None, temps_estabilitzacio_s: float = 0.0,
+                 interpolar: bool = False, senyal_cancelacio: SenyalCancelacio = None):
         """
         Inicialitza la classe Servomotor amb tots els seus paràmetres configurables.
 
@@ -80,6 +93,13 @@ class Servomotor:
                                                (Per defecte 0.0%, un DC no pot ser negatiu).
             duty_cycle_validation_max (float): El límit superior ABSOLUT per al duty cycle (per a validació general).
                                                (Per defecte 100.0%, un DC no pot superar el 100%).
+
+            velocitat_graus_per_segon (float): (Opcional) Velocitat màxima del servo (graus/s) amb la seva càrrega.
+                                               None per mantenir l'espera fixa (`delay`) del comportament anterior.
+            temps_estabilitzacio_s (float): Temps (s) que triga el servo a quedar quiet un cop arriba a l'angle.
+            interpolar (bool): Si és True, els moviments amb una velocitat demanada s'interpolen per passos
+                               (un pas per període del PWM) per moure's de manera suau a aquesta velocitat.
+            senyal_cancelacio (SenyalCancelacio): (Opcional) Senyal compartit que interromp el moviment i l'espera.
         """
         self.nom = nom_servomotor
         self._pin_gpio = pin_gpio
@@ -96,6 +116,12 @@ class Servomotor:
         self._duty_cycle_validation_min = duty_cycle_validation_min
         self._duty_cycle_validation_max = duty_cycle_validation_max
 
+        self._velocitat_graus_per_segon = velocitat_graus_per_segon
+        self._temps_estabilitzacio_s = temps_estabilitzacio_s
+        self._interpolar = interpolar
+        self._angle_actual = None # Últim angle ordenat (None: desconegut fins al primer moviment)
+        self.senyal_cancelacio = senyal_cancelacio
+
         self._pwm = None
         self._initialized = False
 
@@ -107,6 +133,9 @@ class Servomotor:
         print(f"[{self.nom}]: Angle Operacional: [{self._angle_min_operational}°, {self._angle_max_operational}°].")
         print(f"[{self.nom}]: Límits de Validació d'Angle: [{self._angle_validation_min}°, {self._angle_validation_max}°].")
         print(f"[{self.nom}]: Límits de Validació de DC: [{self._duty_cycle_validation_min}%, {self._duty_cycle_validation_max}%].")
+        if self._velocitat_graus_per_segon:
+            print(f"[{self.nom}]: Model de temps: {self._velocitat_graus_per_segon}°/s, estabilització {self._temps_estabilitzacio_s}s"
+                  f"{', amb interpolació' if self._interpolar else ''}.")
         print(f"[{self.nom}]: **Recorda utilitzar 'with Servomotor(...) as servo:' per a una operació segura.**")
 
     def __enter__(self):
@@ -195,6 +224,12 @@ class Servomotor:
                 f"[{self._duty_cycle_validation_min}%, {self._duty_cycle_validation_max}%]. "
                 "duty_cycle_min ha de ser menor que duty_cycle_max i tots dos dins dels límits de validació."
             )
+
+        # 5. Validar el model de temps
+        if self._velocitat_graus_per_segon is not None and not self._velocitat_graus_per_segon > 0:
+            raise ValueError("La velocitat del servomotor ha de ser un valor positiu.")
+        if self._temps_estabilitzacio_s < 0:
+            raise ValueError("El temps d'estabilització del servomotor ha de ser no negatiu.")
     
     def get_current_configuration(self) -> dict:
         """
@@ -212,7 +247,10 @@ class Servomotor:
             "angle_validation_min": self._angle_validation_min,
             "angle_validation_max": self._angle_validation_max,
             "duty_cycle_validation_min": self._duty_cycle_validation_min,
-            "duty_cycle_validation_max": self._duty_cycle_validation_max
+            "duty_cycle_validation_max": self._duty_cycle_validation_max,
+            "velocitat_graus_per_segon": self._velocitat_graus_per_segon,
+            "temps_estabilitzacio_s": self._temps_estabilitzacio_s,
+            "interpolar": self._interpolar
         }
 
     # --- Secció: Funcionalitats de Moviment ---
@@ -301,25 +339,141 @@ class Servomotor:
         # ... (Part 3: Validació final del Duty Cycle - Sense canvis, això és correcte) ...
         return max(self._duty_cycle_validation_min, min(self._duty_cycle_validation_max, duty_cycle))
 
-    def move_to_angle(self, angle: float, delay: float = 0.5):
+    def _clamp_angle(self, angle: float) -> float:
+        return max(self._angle_min_operational, min(self._angle_max_operational, angle))
+
+    def _velocitat_efectiva(self, velocitat_graus_per_segon: float = None) -> float:
+        """La menor entre la velocitat del servo i la demanada (None si no n'hi ha cap)."""
+        velocitats = [v for v in (self._velocitat_graus_per_segon, velocitat_graus_per_segon) if v]
+        return min(velocitats) if velocitats else None
+
+    def temps_moviment(self, angle: float, velocitat_graus_per_segon: float = None, angle_inicial: float = None) -> float:
+        """
+        Calcula el temps mínim perquè el servo arribi a un angle i quedi estable, segons el model
+        de temps: |Δangle| / velocitat + temps d'estabilització. Si encara no se sap on és el servo
+        (primer moviment), es considera el recorregut operatiu complet.
+
+        Args:
+            angle (float): Angle objectiu en graus.
+            velocitat_graus_per_segon (float): (Opcional) Velocitat demanada. Mai supera la del servo.
+            angle_inicial (float): (Opcional) Angle de partida. Per defecte, l'últim angle ordenat.
+
+        Returns:
+            float: Temps en segons. Sense cap velocitat (ni del servo ni demanada), `DELAY_PER_DEFECTE`.
+        """
+        velocitat = self._velocitat_efectiva(velocitat_graus_per_segon)
+        if velocitat is None:
+            return self.DELAY_PER_DEFECTE
+        angle_inicial = self._angle_actual if angle_inicial is None else self._clamp_angle(angle_inicial)
+        if angle_inicial is None:
+            recorregut = self._angle_max_operational - self._angle_min_operational
+        else:
+            recorregut = abs(self._clamp_angle(angle) - angle_inicial)
+        return recorregut / velocitat + self._temps_estabilitzacio_s
+
+    def obtenir_angle(self) -> float:
+        """Retorna l'últim angle ordenat (None si encara no s'ha mogut)."""
+        return self._angle_actual
+
+    def move_to_angle(self, angle: float, delay: float = None, velocitat_graus_per_segon: float = None, interpolar: bool = None) -> bool:
         """
         Mou el servomotor a un angle específic en graus.
         L'angle s'interpretarà dins del rang lògic/operacional configurat.
 
+        L'espera després del moviment es decideix així:
+            * Amb `delay`, s'espera exactament aquest temps (comportament anterior).
+            * Sense `delay`, s'espera el temps del model (`temps_moviment`), de manera que una
+              correcció petita del canell només triga uns mil·lisegons.
+            * Sense `delay` ni cap velocitat (ni del servo ni demanada), `DELAY_PER_DEFECTE`.
+
+        Si el `senyal_cancelacio` s'activa durant el moviment, s'atura: amb interpolació, a l'últim
+        angle ordenat; sense, a l'angle on el model de velocitat estima que ha arribat el servo.
+
         Args:
             angle (float): L'angle desitjat en graus.
-            delay (float): Temps d'espera en segons després del moviment per estabilitzar el servo.
+            delay (float): (Opcional) Temps d'espera fix en segons després del moviment per estabilitzar el servo.
+            velocitat_graus_per_segon (float): (Opcional) Velocitat del moviment (graus/s). Amb interpolació, el
+                                               servo la segueix; sense, només allarga l'espera calculada.
+            interpolar (bool): (Opcional) Interpola el moviment per passos. None per utilitzar el valor de la instància.
+
+        Returns:
+            bool: True si el moviment s'ha completat, False si no s'ha pogut fer o s'ha interromput
+                  (`obtenir_angle()` retorna on s'ha aturat).
         """
         if not self._initialized or self._pwm is None:
             print(f"[{self.nom} ERROR]: Servomotor no inicialitzat. Assegura't d'usar el bloc 'with' per iniciar-lo.")
-            return
+            return False
+        if self.senyal_cancelacio is not None and self.senyal_cancelacio.activa:
+            print(f"[{self.nom}]: Moviment a {angle}° cancel·lat ({self.senyal_cancelacio.motiu}).")
+            return False
 
+        interpolar = self._interpolar if interpolar is None else interpolar
+        angle_objectiu = self._clamp_angle(angle)
         duty_cycle = self._map_angle_to_duty_cycle(angle)
         
         print(f"[{self.nom}]: Movent a angle {angle}° (Duty Cycle calculat: {duty_cycle:.2f}%).")
         try:
-            self._pwm.ChangeDutyCycle(duty_cycle)
-            time.sleep(delay)
+            velocitat = self._velocitat_efectiva(velocitat_graus_per_segon)
+            angle_inicial = self._angle_actual
+            if interpolar and velocitat and angle_inicial is not None:
+                if not self._moure_interpolat(angle_objectiu, velocitat):
+                    print(f"[{self.nom}]: Moviment INTERROMPUT ({self.senyal_cancelacio.motiu}) a {self._angle_actual:.2f}°.")
+                    return False
+                espera = self._temps_estabilitzacio_s if delay is None else delay
+                inici = None
+            else:
+                espera = self.temps_moviment(angle_objectiu, velocitat_graus_per_segon) if delay is None else delay
+                self._pwm.ChangeDutyCycle(duty_cycle)
+                inici = time.perf_counter()
+            self._angle_actual = angle_objectiu
+            if not self._esperar(espera):
+                if inici is not None:
+                    self._aturar_a_angle_estimat(angle_inicial, angle_objectiu, time.perf_counter() - inici)
+                print(f"[{self.nom}]: Moviment INTERROMPUT ({self.senyal_cancelacio.motiu}) a {self._angle_actual:.2f}°.")
+                return False
+            return True
         except Exception as e:
             print(f"[{self.nom} ERROR]: Error en moure el servomotor a l'angle {angle}°: {e}")
+            return False
 
+    def _esperar(self, segons: float) -> bool:
+        """Dorm `segons`. Retorna False si el senyal de cancel·lació s'activa abans."""
+        if self.senyal_cancelacio is not None:
+            return self.senyal_cancelacio.esperar(segons)
+        if segons > 0:
+            time.sleep(segons)
+        return True
+
+    def _aturar_a_angle_estimat(self, angle_inicial: float, angle_objectiu: float, temps_transcorregut: float):
+        """
+        Ordena al servo l'angle on el model de velocitat estima que és després de `temps_transcorregut`,
+        perquè s'aturi allà. Sense velocitat del servo o angle inicial conegut, no es pot estimar i
+        l'angle registrat continua sent l'objectiu.
+        """
+        if self._velocitat_graus_per_segon is None or angle_inicial is None:
+            return
+        recorregut = min(self._velocitat_graus_per_segon * temps_transcorregut, abs(angle_objectiu - angle_inicial))
+        angle_estimat = angle_inicial + math.copysign(recorregut, angle_objectiu - angle_inicial)
+        self._pwm.ChangeDutyCycle(self._map_angle_to_duty_cycle(angle_estimat))
+        self._angle_actual = angle_estimat
+
+    def _moure_interpolat(self, angle_objectiu: float, velocitat: float) -> bool:
+        """
+        Recorre el moviment en passos d'un període del PWM (no té sentit canviar el cicle de treball
+        més sovint), amb instants absoluts perquè els retards d'un pas no s'acumulin.
+
+        Returns:
+            bool: False si el senyal de cancel·lació ha interromput el moviment (queda a l'últim angle ordenat).
+        """
+        angle_inicial = self._angle_actual
+        periode = 1.0 / self._pwm_frequency
+        durada = abs(angle_objectiu - angle_inicial) / velocitat
+        passos = max(1, math.ceil(durada / periode))
+        inici = time.perf_counter()
+        for pas in range(1, passos + 1):
+            angle = angle_inicial + (angle_objectiu - angle_inicial) * pas / passos
+            self._pwm.ChangeDutyCycle(self._map_angle_to_duty_cycle(angle))
+            self._angle_actual = angle
+            if not self._esperar(inici + durada * pas / passos - time.perf_counter()):
+                return False
+        return True
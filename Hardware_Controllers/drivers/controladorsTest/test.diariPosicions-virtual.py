@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prova del DiariPosicions amb MotorPasAPas sobre el GPIO virtual.
+
+Simula tres arrencades seguides sobre un diari temporal:
+    1. Diari nou: el motor es calibra, es mou i la sessió es tanca bé.
+    2. Arrencada en calent: la posició es restaura sense calibrar; la sessió "cau" a mig moviment.
+    3. Després de la caiguda: el diari no és net i el motor torna a calibrar.
+
+Execució (des de Hardware_Controllers):
+    python drivers/controladorsTest/test.diariPosicions-virtual.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from drivers.controladors.BackendGPIO import GPIO
+GPIO.seleccionar('virtual', rellotge_virtual=True)
+
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+from drivers.controladors.DiariPosicions import DiariPosicions
+
+def arrencar(ruta: str, graus_objectiu: float, caiguda: bool = False) -> str:
+    with redirect_stdout(io.StringIO()):
+        diari = DiariPosicions(ruta)
+        diari.obrir()
+        motor = MotorPasAPas("motor_prova", [17, 18, 27, 22], diari_posicions=diari)
+        motor.setup_gpio()
+        restaurada = motor.restaurar_posicio()
+        if not restaurada:
+            motor.calibrar()
+        posicio_inicial = motor.obtenir_posicio_graus()
+        if caiguda:
+            diari.inici_moviment(motor.nom) # El moviment no arriba a registrar la posició final
+        else:
+            motor.moure_a_graus(graus_objectiu, 120.0)
+        diari.tancar()
+        motor.cleanup_gpio()
+    return (f"{'restaurada' if restaurada else 'calibrat'} a {posicio_inicial:.2f}°, "
+            f"final {motor.obtenir_posicio_graus():.2f}°{' (caiguda)' if caiguda else ''}")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directori:
+        ruta = os.path.join(directori, "diari_posicions.jsonl")
+        print(f"1. Diari nou:           {arrencar(ruta, 90.0)}")
+        print(f"2. Arrencada en calent: {arrencar(ruta, 45.0, caiguda=True)}")
+        print(f"3. Després de caure:    {arrencar(ruta, 30.0)}")
+        with open(ruta, "r", encoding="utf-8") as f:
+            print("\nContingut final del diari:")
+            print(f.read())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark de la generació de passos de MotorPasAPas sobre un GPIO simulat.
+
+Compara els passos per segon de:
+    * 'abans': patró generat dinàmicament a cada pas i 4 crides GPIO.output (una per pin),
+      cadascuna amb el seu try/except (implementació original).
+    * 'despres': taula de patrons precalculada a __init__ i una sola crida GPIO.output(pins, valors).
+
+No cal cap Raspberry Pi: el mòdul RPi.GPIO es substitueix per un GPIO simulat que només
+compta les crides. Els delays entre passos no es fan, només es mesura el cost per pas.
+
+Execució (des de Hardware_Controllers):
+    python drivers/controladorsTest/test.motorPasAPas-benchmark.py
+"""
+
+import os
+import sys
+import time
+import types
+
+# --- GPIO simulat (ha d'estar a sys.modules abans d'importar el motor) ---
+class GPIOSimulat(types.ModuleType):
+    BCM = 11
+    OUT = 0
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self):
+        super().__init__("RPi.GPIO")
+        self.crides_output = 0
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, mode, initial=0):
+        pass
+
+    def output(self, pins, valors):
+        self.crides_output += 1
+
+    def cleanup(self, pins=None):
+        pass
+
+gpio_simulat = GPIOSimulat()
+rpi = types.ModuleType("RPi")
+rpi.GPIO = gpio_simulat
+sys.modules["RPi"] = rpi
+sys.modules["RPi.GPIO"] = gpio_simulat
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+
+
+class MotorPasAPasOriginal(MotorPasAPas):
+    """Reprodueix la generació de passos original per comparar-la."""
+
+    def _get_step_pattern(self, step_index: int) -> list:
+        normalized_step_index = step_index % self.num_pasos_seq
+        output = [0] * self.num_pins_control
+        if self.mode_passos == 'full':
+            output[normalized_step_index] = 1
+        elif self.mode_passos == 'half':
+            if normalized_step_index % 2 == 0:
+                output[normalized_step_index // 2] = 1
+            else:
+                pos1 = normalized_step_index // 2
+                pos2 = (pos1 + 1) % self.num_pins_control
+                output[pos1] = 1
+                output[pos2] = 1
+        return output
+
+    def _set_pin_states(self, pins_to_set: list):
+        if not self._is_setup:
+            return
+        for i in range(self.num_pins_control):
+            try:
+                gpio_simulat.output(self.pins_in[i], pins_to_set[i])
+            except Exception as e:
+                print(f"ERROR al configurar el pin {self.pins_in[i]}: {e}")
+
+
+def mesurar(motor: MotorPasAPas, passos: int) -> tuple:
+    """Retorna (passos per segon, crides GPIO.output per pas)."""
+    gpio_simulat.crides_output = 0
+    inici = time.perf_counter()
+    for _ in range(passos):
+        motor._set_pin_states(motor._avancar_pas(MotorPasAPas.DIRECCIO_ENDAVANT))
+    durada = time.perf_counter() - inici
+    return passos / durada, gpio_simulat.crides_output / passos
+
+
+if __name__ == "__main__":
+    PASSOS = 200_000
+    for mode in ('half', 'full'):
+        motor_abans = MotorPasAPasOriginal("abans", [17, 18, 27, 22], mode_passos=mode)
+        motor_despres = MotorPasAPas("despres", [17, 18, 27, 22], mode_passos=mode)
+        motor_abans.setup_gpio()
+        motor_despres.setup_gpio()
+
+        # Comprovació: les dues implementacions generen la mateixa seqüència
+        for index in range(16):
+            assert tuple(motor_abans._get_step_pattern(index)) == motor_despres._get_step_pattern(index)
+
+        velocitat_abans, crides_abans = mesurar(motor_abans, PASSOS)
+        velocitat_despres, crides_despres = mesurar(motor_despres, PASSOS)
+
+        print(f"\n--- Mode '{mode}' ({PASSOS} passos) ---")
+        print(f"  Abans:   {velocitat_abans:12.0f} passos/s ({crides_abans:.0f} crides GPIO.output per pas)")
+        print(f"  Després: {velocitat_despres:12.0f} passos/s ({crides_despres:.0f} crides GPIO.output per pas)")
+        print(f"  Millora: x{velocitat_despres / velocitat_abans:.2f}")
+
+        motor_abans._is_setup = False
+        motor_despres._is_setup = False
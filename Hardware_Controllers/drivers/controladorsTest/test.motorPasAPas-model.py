@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Escombrat de velocitats i acceleracions de MotorPasAPas contra el model simulat del 28BYJ-48.
+
+Per a cada combinació, mou el motor (GPIO virtual + rellotge virtual) i compta els passos
+que el ModelMotorPasAPas no ha pogut seguir. Serveix per trobar els límits de `speeds` i
+de les rampes de robot_config.json sense arriscar-se a perdre passos al maquinari.
+
+Execució (des de Hardware_Controllers):
+    python drivers/controladorsTest/test.motorPasAPas-model.py [graus_moviment]
+"""
+
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from drivers.controladors.BackendGPIO import GPIO
+GPIO.seleccionar('virtual', rellotge_virtual=True)
+
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+from drivers.controladors.ModelMotorPasAPas import ModelMotorPasAPas
+
+VELOCITATS = [30.0, 45.0, 60.0, 75.0, 85.0, 95.0, 120.0] # graus/s
+ACCELERACIONS = [0, 180.0, 360.0, 720.0, 1440.0, 2880.0, 5760.0] # graus/s² (0 = sense rampa)
+
+def provar(velocitat: float, acceleracio: float, graus: float, mode_passos: str) -> ModelMotorPasAPas:
+    with redirect_stdout(io.StringIO()):
+        motor = MotorPasAPas("motor_prova", [17, 18, 27, 22], mode_passos=mode_passos)
+        motor.setup_gpio()
+        model = ModelMotorPasAPas.des_de_motor(motor)
+        model.connectar(GPIO._backend)
+        motor.moure_n_graus(graus, MotorPasAPas.DIRECCIO_ENDAVANT, velocitat, acceleracio)
+        motor.moure_n_graus(graus, MotorPasAPas.DIRECCIO_ENRERE, velocitat, acceleracio)
+        model.desconnectar()
+        motor.cleanup_gpio()
+    return model
+
+
+if __name__ == "__main__":
+    graus = float(sys.argv[1]) if len(sys.argv) > 1 else 180.0
+    GPIO.setmode(GPIO.BCM)
+
+    for mode_passos in ('half', 'full'):
+        print(f"\n--- Mode '{mode_passos}': passos perduts en anar i tornar {graus}° ---")
+        print("vel\\acc " + "".join(f"{acceleracio:>8.0f}" for acceleracio in ACCELERACIONS))
+        for velocitat in VELOCITATS:
+            fila = []
+            for acceleracio in ACCELERACIONS:
+                model = provar(velocitat, acceleracio, graus, mode_passos)
+                fila.append(f"{model.passos_perduts:>8d}")
+            print(f"{velocitat:>7.0f} " + "".join(fila))
@@ -2,7 +2,7 @@ import os
 import sys
 import json
 import time
-import RPi.GPIO as GPIO # Necessari per a la configuració GPIO del GestorInstancies
+from .controladors.BackendGPIO import GPIO # Backend GPIO (real o virtual) compartit amb el GestorInstancies
 
 # Importa el GestorInstancies
 from .GestorInstancies import GestorInstancies
@@ -17,7 +17,9 @@ from .FileManager import FileManager
 from .controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
 from .controladors.Servomotor import Servomotor
 from .controladors.Electroiman import Electroiman
+from .controladors.DiariPosicions import DiariPosicions
 from .ScaraController import ScaraController
+from .GeneradorPassos import GeneradorPassos
 
 def find_project_root(current_path):
     """
@@ -49,6 +51,8 @@ def init_robot_components(gestor_instancies: GestorInstancies, config_data: dict
     # --- Configuració del mode GPIO globalment a través del GestorInstancies ---
     print("\n--- Configuració del mode GPIO globalment ---")
     gpio_settings = config_data.get("gpio_settings", {})
+    # Backend GPIO: 'rpi' (maquinari) o 'virtual' (proves sense Raspberry Pi). La variable d'entorn ROBOT_GPIO_BACKEND té prioritat.
+    GPIO.seleccionar(gpio_settings.get("backend", "rpi"), gpio_settings.get("rellotge_virtual", False))
     if gpio_settings and "mode" in gpio_settings:
         gpio_mode_str = gpio_settings.get("mode")
         gestor_instancies.configurar_gpio_mode(gpio_mode_str)
@@ -122,6 +126,33 @@ def init_robot_components(gestor_instancies: GestorInstancies, config_data: dict
         else:
             print("ERROR: No s'ha pogut inicialitzar l'altaveu.")
 
+    # --- Diari de posicions ---
+    # Es crea abans dels motors perquè el GestorInstancies el tanqui després d'aturar-los.
+    print("\n--- Creant el diari de posicions dels motors ---")
+    diari_config = config_data.get("diari_posicions", {})
+    ins_diari_posicions = None
+    if not diari_config:
+        print("Avís: La configuració del diari de posicions no s'ha trobat al JSON. Els motors es calibraran sempre.")
+    else:
+        ruta_diari = diari_config.get("ruta", "info/diari_posicions.jsonl")
+        if not os.path.isabs(ruta_diari):
+            try:
+                ruta_diari = os.path.join(find_project_root(os.path.dirname(os.path.abspath(__file__))), ruta_diari)
+            except FileNotFoundError:
+                print("Avís: No s'ha trobat l'arrel del projecte per al diari de posicions. Utilitzant la ruta relativa.")
+        ins_diari_posicions = gestor_instancies.crear_i_entrar_instancia(
+            diari_config.get("nom", "diari_posicions"),
+            DiariPosicions,
+            ruta_fitxer=ruta_diari,
+            lot_fsync=diari_config.get("lot_fsync", 16),
+            interval_fsync_s=diari_config.get("interval_fsync_s", 0.5)
+        )
+        if ins_diari_posicions:
+            components_inicialitzats["diari_posicions"] = ins_diari_posicions
+            print("Instància del diari de posicions creada.")
+        else:
+            print("ERROR: No s'ha pogut obrir el diari de posicions. Els motors es calibraran.")
+
     # --- Motors Pas a Pas ---
     print("\n--- Creant i configurant les instàncies dels Motors Pas a Pas ---")
     motors_pas_a_pas_config = config_data.get("motors_pas_a_pas", [])
@@ -139,21 +170,27 @@ def init_robot_components(gestor_instancies: GestorInstancies, config_data: dict
                 pins_in=motor_config.get("pins_in"),
                 passos_per_volta_motor=motor_config.get("passos_per_volta_motor"),
                 reduccio_engranatge=motor_config.get("reduccio_engranatge"),
-                mode_passos=motor_config.get("mode_passos")
+                mode_passos=motor_config.get("mode_passos"),
+                acceleracio_graus_per_segon2=motor_config.get("acceleracio_graus_per_segon2"),
+                perfil_rampa=motor_config.get("perfil_rampa", "trapezoidal"),
+                diari_posicions=ins_diari_posicions
             )
             if ins_motor_pas_a_pas:
                 try:
                     ins_motor_pas_a_pas.setup_gpio()
-                    ins_motor_pas_a_pas.calibrar()
+                    # Arrencada en calent: si el diari és net, es restaura la posició i no cal calibrar
+                    if not ins_motor_pas_a_pas.restaurar_posicio():
+                        ins_motor_pas_a_pas.calibrar()
                     components_inicialitzats[motor_id] = ins_motor_pas_a_pas
                     print(f"Instància de MotorPasAPas '{motor_id}' creada i configurada.")
 
-                    # Assignar a les variables específiques per a ScaraController
-                    if motor_id == "motor_base":
+                    # Assignar a les variables específiques per a ScaraController (segons l'"id" del JSON)
+                    rol_motor = motor_config.get("id")
+                    if rol_motor == "motor_base":
                         motor_base = ins_motor_pas_a_pas
-                    elif motor_id == "motor_articulacio_secundaria":
+                    elif rol_motor == "motor_articulacio_secundaria":
                         motor_articulacio_secundaria = ins_motor_pas_a_pas
-                    elif motor_id == "motor_eix_z":
+                    elif rol_motor == "motor_eix_z":
                         motor_eix_z = ins_motor_pas_a_pas
 
                 except Exception as e:
@@ -183,7 +220,10 @@ def init_robot_components(gestor_instancies: GestorInstancies, config_data: dict
             angle_validation_min=servomotor_config.get("angle_validation_min"),
             angle_validation_max=servomotor_config.get("angle_validation_max"),
             duty_cycle_validation_min=servomotor_config.get("duty_cycle_validation_min"),
-            duty_cycle_validation_max=servomotor_config.get("duty_cycle_validation_max")
+            duty_cycle_validation_max=servomotor_config.get("duty_cycle_validation_max"),
+            velocitat_graus_per_segon=servomotor_config.get("velocitat_graus_per_segon"),
+            temps_estabilitzacio_s=servomotor_config.get("temps_estabilitzacio_s", 0.0),
+            interpolar=servomotor_config.get("interpolar", False)
         )
         if ins_servomotor:
             components_inicialitzats["servomotor"] = ins_servomotor
@@ -270,6 +310,20 @@ def init_robot_components(gestor_instancies: GestorInstancies, config_data: dict
             print("ERROR: Un o més components essencials per a ScaraController no estan inicialitzats o no s'han trobat.")
             print(f"Estat: Base={bool(motor_base)}, ArticulacióSecundària={bool(motor_articulacio_secundaria)}, EixZ={bool(motor_eix_z)}, Servomotor={bool(ins_servomotor)}, Electroimant={bool(ins_electroiman)}")
         else:
+            ins_generador_passos = None
+            if scara_controller_config.get("generador_passos", False):
+                ins_generador_passos = gestor_instancies.crear_i_entrar_instancia(
+                    "generador_passos",
+                    GeneradorPassos,
+                    motors=[motor_base, motor_articulacio_secundaria, motor_eix_z],
+                    finestra_tick_s=scara_controller_config.get("finestra_tick_s", 0.0002)
+                )
+                if ins_generador_passos:
+                    components_inicialitzats["generador_passos"] = ins_generador_passos
+                    print("Instància de GeneradorPassos creada i en marxa.")
+                else:
+                    print("Avís: No s'ha pogut inicialitzar el GeneradorPassos. Es faran servir fils per eix.")
+
             ins_scara_controller = gestor_instancies.crear_i_entrar_instancia(
                 scara_controller_config.get("nom"),
                 ScaraController,
@@ -278,7 +332,10 @@ def init_robot_components(gestor_instancies: GestorInstancies, config_data: dict
                 motor_eix_z=motor_eix_z,
                 servomotor_canell=ins_servomotor,
                 electroiman=ins_electroiman,
-                config=scara_controller_config.get("config")
+                config=scara_controller_config.get("config"),
+                tipus_perfil=scara_controller_config.get("tipus_perfil", "trapezoidal"),
+                generador_passos=ins_generador_passos,
+                marges_estabilitzacio=scara_controller_config.get("marges_estabilitzacio")
             )
             if ins_scara_controller:
                 components_inicialitzats["scara_controller"] = ins_scara_controller
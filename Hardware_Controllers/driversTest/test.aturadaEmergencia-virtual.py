@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prova de l'aturada d'emergència del ScaraController amb el backend GPIO virtual.
+
+Llança un moviment lent en un altre fil, n'encua un altre d'asíncron i activa
+`aturada_emergencia()` a mig moviment. Mostra quant triguen els motors a aturar-se (hauria
+de ser com a molt un període de pas) i comprova que els angles interns del controlador
+coincideixen amb la posició real on s'han aturat els motors. Es fa amb el GeneradorPassos
+i amb un treballador per eix.
+
+El rellotge és el real (el rellotge virtual no sincronitza els fils dels eixos).
+
+Execució (des de Hardware_Controllers):
+    python driversTest/test.aturadaEmergencia-virtual.py
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from drivers.controladors.BackendGPIO import GPIO
+GPIO.seleccionar('virtual')
+
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+from drivers.controladors.Servomotor import Servomotor
+from drivers.controladors.Electroiman import Electroiman
+from drivers.GeneradorPassos import GeneradorPassos
+from drivers.ScaraController import ScaraController
+
+OBJECTIU_LENT = (80.0, 80.0, 40.0, 90.0)
+OBJECTIU_ENCUAT = (10.0, 10.0, 10.0, 90.0)
+TEMPS_ABANS_ATURADA_S = 0.4
+
+def provar(config_data: dict, amb_generador: bool):
+    with redirect_stdout(io.StringIO()):
+        motors = []
+        for motor_config in config_data["motors_pas_a_pas"]:
+            motor = MotorPasAPas(motor_config["nom"], motor_config["pins_in"],
+                                 motor_config.get("passos_per_volta_motor", 32), motor_config.get("reduccio_engranatge", 64.0),
+                                 motor_config.get("mode_passos", "half"), motor_config.get("acceleracio_graus_per_segon2"),
+                                 motor_config.get("perfil_rampa", "trapezoidal"))
+            motor.setup_gpio()
+            motors.append(motor)
+        servo_config = config_data["servomotor"]
+        servomotor = Servomotor(servo_config["nom"], servo_config["pin_gpio"],
+                                velocitat_graus_per_segon=servo_config.get("velocitat_graus_per_segon"))
+        servomotor.__enter__()
+        electroiman = Electroiman(config_data["electroiman"]["pin_control"])
+        electroiman.setup()
+        generador = GeneradorPassos(motors) if amb_generador else None
+        if generador:
+            generador.iniciar()
+        scara = ScaraController(*motors, servomotor, electroiman, config_data["scara_controller"]["config"],
+                                generador_passos=generador)
+
+        resultat = {}
+        fil = threading.Thread(target=lambda: resultat.setdefault("lent", scara.mou_a_posicio_eixos(*OBJECTIU_LENT, velocitat_index=-1)))
+        fil.start()
+        futur = scara.mou_a_posicio_eixos_async(*OBJECTIU_ENCUAT)
+        time.sleep(TEMPS_ABANS_ATURADA_S)
+
+        # Passos que encara fan els motors després d'activar l'aturada (com a molt un per motor)
+        posicions_abans = [motor.obtenir_posicio_passos() for motor in motors]
+        inici = time.perf_counter()
+        scara.aturada_emergencia()
+        fil.join()
+        durada_aturada = time.perf_counter() - inici
+
+        angles = list(scara._current_angles)
+        posicions = [motor.obtenir_posicio_graus() for motor in motors]
+        futur.esperar()
+
+        scara.__exit__(None, None, None)
+        if generador:
+            generador.aturar()
+        servomotor.__exit__(None, None, None)
+        electroiman.cleanup()
+        for motor in motors:
+            motor.cleanup_gpio()
+
+    passos_despres = [motor.obtenir_posicio_passos() - abans for motor, abans in zip(motors, posicions_abans)]
+    print(f"\n--- {'GeneradorPassos' if amb_generador else 'Un treballador per eix'} ---")
+    print(f"Moviment lent: {'completat' if resultat['lent'] else 'interromput'}; moviment encuat: {futur}")
+    print(f"Aturada completa (inclou centrar el canell): {durada_aturada * 1e3:.1f} ms; passos fets des de l'aturada: {passos_despres}")
+    print(f"Angles del controlador: {[round(angle, 2) for angle in angles[:3]]}")
+    print(f"Posició dels motors:    {[round(posicio, 2) for posicio in posicions]}")
+    coincideixen = all(abs(angle - posicio) < 1e-9 for angle, posicio in zip(angles, posicions))
+    print(f"Estat coherent: {'SÍ' if coincideixen else 'NO'}")
+
+if __name__ == "__main__":
+    with open(os.path.join(PROJECT_ROOT, "info", "robot_config.json"), 'r') as f:
+        config_data = json.load(f)
+    GPIO.setmode(GPIO.BCM)
+    provar(config_data, amb_generador=True)
+    provar(config_data, amb_generador=False)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prova de l'autoajust de velocitat i acceleració dels eixos del ScaraController.
+
+Els motors pas a pas es mouen sobre el GPIO virtual (amb el rellotge virtual) i un
+ModelMotorPasAPas per eix fa de robot real: el VerificadorModel comprova després de cada
+moviment de prova que el model no ha perdut passos. Cada eix té una càrrega diferent, així
+que els límits trobats han de ser diferents. Es mostra la configuració abans i després.
+
+Execució (des de Hardware_Controllers):
+    python driversTest/test.autoAjust-virtual.py
+"""
+
+import io
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from drivers.controladors.BackendGPIO import GPIO
+GPIO.seleccionar('virtual', rellotge_virtual=True)
+
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+from drivers.controladors.ModelMotorPasAPas import ModelMotorPasAPas
+from drivers.controladors.Servomotor import Servomotor
+from drivers.controladors.Electroiman import Electroiman
+from drivers.ScaraController import ScaraController
+from drivers.AutoAjustEixos import VerificadorModel
+
+PARELL_CARREGA_NM = [0.004, 0.008, 0.012] # Base, articulació secundària i eix Z
+
+if __name__ == "__main__":
+    with open(os.path.join(PROJECT_ROOT, "info", "robot_config.json"), 'r') as f:
+        config_data = json.load(f)
+    GPIO.setmode(GPIO.BCM)
+
+    config_eixos = config_data["scara_controller"]["config"]
+    print("Configuració inicial:")
+    for nom_eix in ("base", "articulacio_secundaria", "eix_z"):
+        print(f"  {nom_eix}: speeds={config_eixos[nom_eix]['speeds']}, acceleration={config_eixos[nom_eix].get('acceleration')}")
+
+    with redirect_stdout(io.StringIO()) as sortida:
+        motors = []
+        models = {}
+        for axis_id, motor_config in enumerate(config_data["motors_pas_a_pas"]):
+            motor = MotorPasAPas(motor_config["nom"], motor_config["pins_in"],
+                                 motor_config.get("passos_per_volta_motor", 32), motor_config.get("reduccio_engranatge", 64.0),
+                                 motor_config.get("mode_passos", "half"), motor_config.get("acceleracio_graus_per_segon2"),
+                                 motor_config.get("perfil_rampa", "trapezoidal"))
+            motor.setup_gpio()
+            motors.append(motor)
+            models[axis_id] = ModelMotorPasAPas.des_de_motor(motor, parell_carrega_nm=PARELL_CARREGA_NM[axis_id])
+            models[axis_id].connectar(GPIO._backend)
+        servomotor = Servomotor(config_data["servomotor"]["nom"], config_data["servomotor"]["pin_gpio"])
+        servomotor.__enter__()
+        electroiman = Electroiman(config_data["electroiman"]["pin_control"])
+        electroiman.setup()
+        scara = ScaraController(*motors, servomotor, electroiman, config_eixos)
+
+        resultats = scara.autoajustar_eixos(VerificadorModel(models), repeticions=1)
+
+        scara.__exit__(None, None, None)
+        servomotor.__exit__(None, None, None)
+        electroiman.cleanup()
+        for axis_id, motor in enumerate(motors):
+            models[axis_id].desconnectar()
+            motor.cleanup_gpio()
+
+    print("\nResultats:")
+    for resultat in resultats.values():
+        print(f"  {resultat}")
+    print("\nConfiguració ajustada:")
+    for nom_eix in ("base", "articulacio_secundaria", "eix_z"):
+        print(f"  {nom_eix}: speeds={config_eixos[nom_eix]['speeds']}, acceleration={config_eixos[nom_eix].get('acceleration')}")
+    print(f"\nAngles finals: {[round(angle, 2) for angle in scara._current_angles]}")
+    print(f"Passos perduts pel model durant l'ajust: {[models[axis_id].passos_perduts for axis_id in models]}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prova de la CuaMoviments del ScaraController amb el backend GPIO virtual.
+
+Executa la mateixa seqüència d'agafar una fitxa i portar-la a un altre punt dues vegades:
+amb moviments separats (`mou_a_posicio_eixos`, aturant-se a cada punt) i amb la cua (la
+pujada de l'eix Z es fusiona amb el gir de la base i els trams de la base en el mateix
+sentit s'uneixen). Mostra el temps de cada versió i la posició final dels motors.
+
+El rellotge és el real (el rellotge virtual no sincronitza els fils dels eixos).
+
+Execució (des de Hardware_Controllers):
+    python driversTest/test.cuaMoviments-virtual.py
+"""
+
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from drivers.controladors.BackendGPIO import GPIO
+GPIO.seleccionar('virtual')
+
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+from drivers.controladors.Servomotor import Servomotor
+from drivers.controladors.Electroiman import Electroiman
+from drivers.ScaraController import ScaraController
+
+# (base, articulació secundària, eix z, canell)
+ORIGEN = (0.0, 0.0, 0.0, 90.0)
+ALTURA_FITXA = 10.0
+PAS_INTERMEDI = (30.0, 20.0)
+DESTI = (45.0, 35.0)
+
+if __name__ == "__main__":
+    with open(os.path.join(PROJECT_ROOT, "info", "robot_config.json"), 'r') as f:
+        config_data = json.load(f)
+    GPIO.setmode(GPIO.BCM)
+
+    motors = []
+    for motor_config in config_data["motors_pas_a_pas"]:
+        motor = MotorPasAPas(motor_config["nom"], motor_config["pins_in"],
+                             motor_config.get("passos_per_volta_motor", 32), motor_config.get("reduccio_engranatge", 64.0),
+                             motor_config.get("mode_passos", "half"), motor_config.get("acceleracio_graus_per_segon2"),
+                             motor_config.get("perfil_rampa", "trapezoidal"))
+        motor.setup_gpio()
+        motors.append(motor)
+    servo_config = config_data["servomotor"]
+    servomotor = Servomotor(servo_config["nom"], servo_config["pin_gpio"])
+    servomotor.__enter__()
+    electroiman = Electroiman(config_data["electroiman"]["pin_control"])
+    electroiman.setup()
+
+    with ScaraController(*motors, servomotor, electroiman, config_data["scara_controller"]["config"],
+                         tipus_perfil=config_data["scara_controller"].get("tipus_perfil", "trapezoidal")) as scara:
+        base, articulacio, eix_z, canell = ORIGEN
+
+        # 1. Moviments separats
+        scara.mou_a_posicio_eixos(*ORIGEN, velocitat_index=0)
+        inici = time.perf_counter()
+        scara.mou_a_posicio_eixos(base, articulacio, ALTURA_FITXA, canell, velocitat_index=0)
+        scara.activar_pinça()
+        scara.mou_a_posicio_eixos(base, articulacio, eix_z, canell, velocitat_index=0)
+        scara.mou_a_posicio_eixos(*PAS_INTERMEDI, eix_z, canell, velocitat_index=0)
+        scara.mou_a_posicio_eixos(*DESTI, eix_z, canell, velocitat_index=0)
+        temps_separats = time.perf_counter() - inici
+
+        # 2. La mateixa seqüència amb la cua
+        scara.mou_a_posicio_eixos(*ORIGEN, velocitat_index=0)
+        cua = scara.cua_moviments
+        inici = time.perf_counter()
+        cua.afegir({scara.EIX_Z: ALTURA_FITXA}, velocitat_index=0, accio=electroiman.activar, nom="baixar")
+        cua.afegir({scara.EIX_Z: eix_z}, velocitat_index=0, fusio=0.5, nom="pujar")
+        cua.afegir(dict(zip((scara.EIX_BASE, scara.EIX_ARTICULACIO_SECUNDARIA), PAS_INTERMEDI)), velocitat_index=0, fusio=0.5, nom="pas")
+        cua.afegir(dict(zip((scara.EIX_BASE, scara.EIX_ARTICULACIO_SECUNDARIA), DESTI)), velocitat_index=0, nom="desti")
+        correcte = cua.executar()
+        temps_cua = time.perf_counter() - inici
+
+        print("\n--- Resum ---")
+        print(f"Moviments separats: {temps_separats:.3f}s")
+        print(f"CuaMoviments: {temps_cua:.3f}s ({'correcte' if correcte else 'amb errors'})")
+        print(f"Angles finals: {scara._current_angles}")
+        print(f"Posició dels motors: {[round(motor.obtenir_posicio_graus(), 2) for motor in motors]}")
+
+    servomotor.__exit__(None, None, None)
+    electroiman.cleanup()
+    for motor in motors:
+        motor.cleanup_gpio()
@@ -55,7 +55,7 @@ SCARA_CONFIG = {
     },
     "canell": {
         "limits": (0.0, 180.0),
-        "speeds": [0.05, 0.1, 0.2], # Delay en segons (el més ràpid és el delay més petit)
+        "speeds": [500.0, 300.0, 120.0], # Graus/segon del servomotor (de la més ràpida a la més lenta)
         "offset": 90.0, # Posició central del canell
         "reduction_ratio": 1.0
     }
@@ -33,7 +33,7 @@ if __name__ == "__main__":
         },
         "canell": {
             "limits": (0.0, 180.0), # Límits operacionals del servomotor
-            "speeds": [0.3, 0.5, 0.8], # Delays en segons per al servomotor (el més ràpid és el delay més petit). 0.8s seria el més lent (-1).
+            "speeds": [500.0, 300.0, 120.0], # Velocitats del servomotor en graus/segon. 120.0 seria la més lenta (-1).
             "offset": 90.0, # Posició inicial del canell (p.ex., al centre)
             "reduction_ratio": 1.0 # El servomotor generalment controla l'articulació directament.
         }
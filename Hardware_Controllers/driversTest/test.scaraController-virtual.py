@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prova de ScaraController sense Raspberry Pi: backend GPIO virtual i rellotge virtual.
+
+Executa una seqüència de moviments (amb el GeneradorPassos o amb un treballador per eix) i mostra
+el temps simulat, el temps real que ha trigat, les transicions de pins registrades, les
+estadístiques de temps de cada motor i els passos perduts segons el ModelMotorPasAPas.
+
+Execució (des de Hardware_Controllers):
+    python driversTest/test.scaraController-virtual.py [--fils] [--async]
+
+Amb --async s'encuen tots els moviments amb `mou_a_posicio_eixos_async` i es mostra el
+progrés mentre el fil principal queda lliure.
+"""
+
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from drivers.controladors.BackendGPIO import GPIO
+GPIO.seleccionar('virtual', rellotge_virtual=True)
+
+from drivers.controladors.MotorPasAPasNoNormalitzat import MotorPasAPas
+from drivers.controladors.ModelMotorPasAPas import ModelMotorPasAPas
+from drivers.controladors.Servomotor import Servomotor
+from drivers.controladors.Electroiman import Electroiman
+from drivers.GeneradorPassos import GeneradorPassos
+from drivers.ScaraController import ScaraController
+
+SEQUENCIA = [
+    # (base, articulació secundària, eix z, canell, índex de velocitat)
+    (30.0, 60.0, 10.0, 90.0, 0),
+    (-45.0, 20.0, 0.0, 0.0, 1),
+    (0.0, 0.0, 0.0, 90.0, 0),
+]
+
+if __name__ == "__main__":
+    amb_generador = "--fils" not in sys.argv
+    asincron = "--async" in sys.argv
+
+    with open(os.path.join(PROJECT_ROOT, "info", "robot_config.json"), 'r') as f:
+        config_data = json.load(f)
+    GPIO.setmode(GPIO.BCM)
+
+    motors = []
+    models = []
+    for motor_config in config_data["motors_pas_a_pas"]:
+        motor = MotorPasAPas(motor_config["nom"], motor_config["pins_in"],
+                             motor_config.get("passos_per_volta_motor", 32), motor_config.get("reduccio_engranatge", 64.0),
+                             motor_config.get("mode_passos", "half"), motor_config.get("acceleracio_graus_per_segon2"),
+                             motor_config.get("perfil_rampa", "trapezoidal"))
+        motor.setup_gpio()
+        motors.append(motor)
+        model = ModelMotorPasAPas.des_de_motor(motor)
+        model.connectar(GPIO._backend)
+        models.append(model)
+    servo_config = config_data["servomotor"]
+    servomotor = Servomotor(servo_config["nom"], servo_config["pin_gpio"])
+    servomotor.__enter__()
+    electroiman = Electroiman(config_data["electroiman"]["pin_control"])
+    electroiman.setup()
+
+    generador = GeneradorPassos(motors) if amb_generador else None
+    if generador:
+        generador.iniciar()
+    scara = ScaraController(*motors, servomotor, electroiman, config_data["scara_controller"]["config"],
+                            tipus_perfil=config_data["scara_controller"].get("tipus_perfil", "trapezoidal"),
+                            generador_passos=generador)
+
+    inici_virtual = GPIO.rellotge.temps_maxim()
+    inici_real = time.process_time()
+    if asincron:
+        futurs = [scara.mou_a_posicio_eixos_async(base, articulacio, eix_z, canell, velocitat_index=velocitat)
+                  for base, articulacio, eix_z, canell, velocitat in SEQUENCIA]
+        while not scara.esperar_moviments(timeout=0.25):
+            print(f"  Pendents: {len(scara.moviments_pendents())}, en curs: {[futur for futur in futurs if futur.running()]}")
+        print(f"  Resultats: {[futur.result() for futur in futurs]}")
+    else:
+        for base, articulacio, eix_z, canell, velocitat in SEQUENCIA:
+            scara.mou_a_posicio_eixos(base, articulacio, eix_z, canell, velocitat)
+            for motor in motors:
+                if motor.estadistiques_ultim_moviment:
+                    print(f"  {motor.nom}: {motor.estadistiques_ultim_moviment}")
+
+    print("\n--- Resum ---")
+    print(f"Mode: {'GeneradorPassos' if amb_generador else 'un treballador per eix'}")
+    print(f"Temps simulat: {GPIO.rellotge.temps_maxim() - inici_virtual:.3f}s (CPU real: {time.process_time() - inici_real:.3f}s)")
+    print(f"Transicions de pins registrades: {len(GPIO.transicions)}")
+    print(f"Cicle de treball final del servomotor: {GPIO.cicle_treball(servo_config['pin_gpio']):.2f}%")
+    print(f"Angles finals: {scara._current_angles}")
+    for model in models:
+        print(f"  {model}")
+        for event in model.events_passos_perduts[:3]:
+            print(f"    {event}")
+
+    if generador:
+        generador.aturar()
+    servomotor.__exit__(None, None, None)
+    electroiman.cleanup()
+    for motor in motors:
+        motor.cleanup_gpio()
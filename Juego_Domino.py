@@ -0,0 +1,250 @@
+import os
+import threading
+import cv2
+from Virtual_Controllers.Detectar_Domino import obtener_estado_completo
+from Virtual_Controllers.Domibot import pixel_to_world_linear
+from Virtual_Controllers.Controlador_coordenadas import bbox_center, calcular_coordenada_juego, calcular_rotacion, obtener_fichas_posibles_donde_jugar, ordenar_fichas_jugador_por_coordenadas, obtener_valores_comunes_y_coincidencia
+
+# Parámetros de la cámara y de las fichas de cada modo
+TAMAÑO_FICHA_SIMULACION = 2900
+TAMAÑO_FICHA_REAL = 32500
+OFFSET_JUGADOR_SIMULACION = 320
+OFFSET_JUGADOR_REAL = 822
+PARAMETROS_CAMARA_REAL = {'img_resolution': (3280, 2464), 'x_limits': (0.50, 0.10), 'y_limits': (0.30, -0.30)}
+
+# Con varias mesas en el mismo proceso, solo una pregunta ocupa la consola a la vez
+_lock_consola = threading.Lock()
+
+
+class JugadorConsola:
+    """
+    Jugador humano: en simulación responde por teclado y con el robot real por voz.
+    """
+
+    def __init__(self, simulacion, prefijo=""):
+        """
+        Args:
+            simulacion (bool): True para preguntar por teclado, False para escuchar comandos de voz.
+            prefijo (str): Texto que se antepone a cada pregunta (p.ej. el nombre de la mesa).
+        """
+        self.simulacion = simulacion
+        self.prefijo = prefijo
+
+    def nuevo_turno(self):
+        pass
+
+    def preguntar(self, clave, pregunta, opciones=None):
+        """
+        Args:
+            clave (str): Tipo de pregunta ('ficha', 'valor', 'direccion' o 'continuar').
+            pregunta (str): Texto de la pregunta.
+            opciones (list): Respuestas válidas (solo informativo para el jugador humano).
+
+        Returns:
+            str: Respuesta del jugador.
+        """
+        if self.simulacion or clave == 'continuar':
+            with _lock_consola:
+                return input(self.prefijo + pregunta)
+        # Reconocimiento de voz solo con el robot real (importado aquí para no requerir el micrófono en simulación)
+        from Virtual_Controllers.Reconocimiento_Voz import escuchar_y_detectar_comando_continuo
+        comando, texto = escuchar_y_detectar_comando_continuo(pregunta)
+        print(f"Comando detectado: {comando}, Texto completo: {texto}")
+        return comando
+
+
+class JugadorAutomatico:
+    """
+    Jugador sin intervención humana para partidas desatendidas: prueba las fichas en orden hasta
+    que una es válida, elige el primer valor y la primera dirección posibles y juega `turnos` turnos.
+    """
+
+    def __init__(self, turnos=10):
+        self.turnos = turnos
+        self.turnos_jugados = 0
+        self._intentos_ficha = 0
+
+    def nuevo_turno(self):
+        self._intentos_ficha = 0
+
+    def preguntar(self, clave, pregunta, opciones=None):
+        if clave == 'ficha':
+            # Cada vez que se vuelve a preguntar es porque la anterior no era válida
+            if opciones is None or self._intentos_ficha >= len(opciones):
+                return None
+            respuesta = opciones[self._intentos_ficha]
+            self._intentos_ficha += 1
+            return str(respuesta)
+        if clave == 'continuar':
+            self.turnos_jugados += 1
+            return '' if self.turnos_jugados < self.turnos else 'n'
+        return str(opciones[0]) if opciones else ''
+
+
+def analizar_tablero(directorio_trabajo, ruta_tablero, ruta_jugador, tamaño_ficha, simulacion, mostrar=True):
+    """
+    Ejecuta la visión (obtener_estado_completo) con `directorio_trabajo` como directorio actual,
+    porque Detectar_Domino guarda sus imágenes intermedias en rutas relativas (./Media_Stream/...).
+    Así cada mesa tiene sus propios ficheros intermedios. Con `mostrar=False` la visión no abre
+    ventanas ni espera teclas.
+    """
+    directorio_anterior = os.getcwd()
+    os.chdir(directorio_trabajo)
+    try:
+        return obtener_estado_completo(ruta_tablero, ruta_jugador, tamaño_ficha=tamaño_ficha, simulacion=simulacion, mostrar=mostrar)
+    finally:
+        os.chdir(directorio_anterior)
+
+
+def jugar_turno(robot, simulacion, jugador, directorio_trabajo=".", analizar=analizar_tablero):
+    """
+    Juega un turno: foto del tablero, detección de fichas, elección del jugador, coger la ficha
+    y dejarla en la posición elegida.
+
+    Args:
+        robot: Backend del robot (DominoRobotController, DominoRobotLocal o ScaraControllerIntermediary).
+        simulacion (bool): True si el backend es simulado (cámara, tamaños y coordenadas de la simulación).
+        jugador: Quien responde las preguntas (JugadorConsola o JugadorAutomatico).
+        directorio_trabajo (str): Directorio con la carpeta Media_Stream donde se guardan las imágenes del turno.
+        analizar (callable): Función de visión con la firma de `analizar_tablero`.
+
+    Returns:
+        bool: True si se ha jugado una ficha.
+    """
+    jugador.nuevo_turno()
+    directorio_medios = os.path.join(directorio_trabajo, "Media_Stream")
+    ruta_superior = os.path.join(directorio_medios, "parte_superior.png")
+    ruta_inferior = os.path.join(directorio_medios, "parte_inferior.png")
+
+    # Movemos a posición inicial
+    robot.move_posicion_inicial()
+
+    # Obtener foto
+    if simulacion:
+        image = robot.obtener_foto()
+    else:
+        image = cv2.imread("./Media_Example/Ejemplo-tablero-real.jpg")
+        #image = robot.obtener_foto()
+
+    # Separamos la imagen por la mitad (parte de arriba y de abajo) y lo guardamos en dos archivos
+    if image is not None:
+        # La imagen debe ser rgb
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        cv2.imwrite(os.path.join(directorio_medios, "imagen_tablero.png"), image)
+        height, width, _ = image.shape
+        # La parte de arriba debe ser dos tercios de la imagen
+        top_two_thirds = image[:2*height//3, :]
+        bottom_one_third = image[2*height//3:, :]
+        cv2.imwrite(ruta_superior, top_two_thirds)
+        cv2.imwrite(ruta_inferior, bottom_one_third)
+        print("Size parte superior:", top_two_thirds.shape)
+        print("Size parte inferior:", bottom_one_third.shape)
+
+    robot.move_posicion_recta()
+
+    tamaño_ficha = TAMAÑO_FICHA_SIMULACION if simulacion else TAMAÑO_FICHA_REAL
+
+    # Obtenemos coordenada
+    fichas_borde_data, fichas_jugador_data, posibles_fichas = analizar(directorio_trabajo, ruta_superior, ruta_inferior, tamaño_ficha, simulacion)
+
+    print("Posibles fichas en el tablero:", posibles_fichas)
+    fichas_jugador_data = ordenar_fichas_jugador_por_coordenadas(fichas_jugador_data)
+
+    print("Fichas del jugador ordenadas de izquierda a derecha:")
+    for i, ficha_data in enumerate(fichas_jugador_data):
+        print(f"Ficha {i}: Coordenadas: {ficha_data[0]}, Puntuación: {ficha_data[3]}")
+
+    while True:
+        respuesta = jugador.preguntar('ficha', "¿Qué ficha quieres jugar? (Introduce el número de la ficha): ",
+                                      list(range(len(fichas_jugador_data))))
+        if respuesta is None:
+            print("El jugador no tiene ninguna ficha que se pueda jugar. Pasa el turno.")
+            return False
+        numero_ficha = int(respuesta) if respuesta.isdigit() else None
+        if numero_ficha is None or numero_ficha >= len(fichas_jugador_data):
+            print("No se ha detectado un número de ficha válido. Inténtalo de nuevo.")
+            continue
+
+        # Validar que el número de ficha es válido
+        hay_coincidencia, puntuaciones_posibles = obtener_valores_comunes_y_coincidencia(fichas_jugador_data[numero_ficha][3], posibles_fichas)
+        if hay_coincidencia:
+            break
+        print(f"El jugador ha seleccionado una ficha incorrecta. Las puntuaciones posibles son: {posibles_fichas}")
+
+    print(f"El jugador ha decidido jugar la ficha con puntuación {numero_ficha}.")
+    center_x, center_y = bbox_center(fichas_jugador_data[numero_ficha][0])
+
+    ## Calcular coordenadas reales
+    offset = OFFSET_JUGADOR_SIMULACION if simulacion else OFFSET_JUGADOR_REAL
+    print(f"Ficha {numero_ficha} del jugador: Coordenadas del centro (u, v): ({center_x}, {center_y+offset})")
+    if simulacion:
+        real_x, real_y = pixel_to_world_linear(center_x, center_y+offset)
+    else:
+        real_x, real_y = pixel_to_world_linear(center_x, center_y+offset, **PARAMETROS_CAMARA_REAL)
+    print(f"Ficha {numero_ficha} del jugador: Coordenadas reales (x, y): ({real_x}, {real_y})")
+
+    robot.move_domino(px=real_x, py=real_y, roll=0, yaw=90)
+    robot.coger_ficha()
+
+    if len(puntuaciones_posibles) > 1:
+        while True:
+            print(f"El jugador ha seleccionado una ficha con múltiples puntuaciones posibles: {puntuaciones_posibles}.")
+            # Pedimos al jugador que confirme el valor de la ficha
+            decision_jugador = jugador.preguntar('valor', f"¿Cuál es el valor de la ficha que quieres jugar? (Posibles valores: {puntuaciones_posibles}): ",
+                                                 puntuaciones_posibles)
+            if decision_jugador.isdigit() and int(decision_jugador) in puntuaciones_posibles:
+                print(f"El jugador ha confirmado que la ficha tiene el valor {decision_jugador}.")
+                break
+            print(f"El jugador ha seleccionado un valor incorrecto. Las puntuaciones posibles son: {puntuaciones_posibles}")
+    else:
+        decision_jugador = puntuaciones_posibles[0]
+
+    # Mover a posición de juego
+    fichas_posibles = obtener_fichas_posibles_donde_jugar(fichas_borde_data, decision_jugador)
+    if not fichas_posibles:
+        print(f"No hay posiciones disponibles para jugar la ficha {decision_jugador}.")
+        robot.move_posicion_recta()
+        return False
+
+    print(f"Posibles posiciones para jugar la ficha {decision_jugador}: {fichas_posibles}")
+    robot.move_posicion_recta()
+
+    # Solicitar al jugador posición relativa a la ficha y orientación
+    if simulacion:
+        coordenada_calculada = calcular_coordenada_juego(fichas_posibles[0])
+    else:
+        coordenada_calculada = calcular_coordenada_juego(fichas_posibles[0], ANCHURA_FICHA=135, LONGITUD_FICHA=270)
+
+    # Elegir direccion si hay más de una
+    if len(coordenada_calculada) > 1:
+        print(f"Hay varias posiciones posibles para jugar la ficha {decision_jugador}.")
+        print(f"Posiciones posibles: {coordenada_calculada.keys()}")
+        direccion = jugador.preguntar('direccion', "¿En qué dirección quieres jugar la ficha? (izquierda, derecha, arriba, abajo): ",
+                                      list(coordenada_calculada.keys()))
+        if direccion in coordenada_calculada:
+            coordenada_calculada = coordenada_calculada[direccion]
+        else:
+            print(f"Dirección {direccion} no válida. Usando la primera posición disponible.")
+            coordenada_calculada = list(coordenada_calculada.values())[0]
+    else:
+        print(f"Solo hay una posición posible para jugar la ficha {coordenada_calculada.keys()}.")
+        direccion = list(coordenada_calculada.keys())[0]
+        coordenada_calculada = list(coordenada_calculada.values())[0]
+
+    # Calcular coordenadas reales
+    if simulacion:
+        real_x_posicion, real_y_posicion = pixel_to_world_linear(coordenada_calculada[0], coordenada_calculada[1])
+    else:
+        real_x_posicion, real_y_posicion = pixel_to_world_linear(coordenada_calculada[0], coordenada_calculada[1], **PARAMETROS_CAMARA_REAL)
+    print(f"Coordenadas calculadas para jugar la ficha: {coordenada_calculada[0], coordenada_calculada[1]}")
+    print(f"Coordenadas reales para jugar la ficha: ({real_x_posicion}, {real_y_posicion})")
+    rotacion = calcular_rotacion(fichas_jugador_data[numero_ficha][3], direccion, decision_jugador)
+    print(f"Rotacion: {rotacion}")
+
+    # Mover a la posición de juego y soltar ficha
+    robot.move_domino(px=real_x_posicion, py=real_y_posicion, roll=0, yaw=0, rotacion=rotacion)
+    robot.soltar_ficha()
+    print("Ficha soltada en la posición correcta.")
+
+    robot.move_posicion_recta()
+    return True
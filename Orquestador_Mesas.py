@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from Juego_Domino import JugadorAutomatico, JugadorConsola, analizar_tablero, jugar_turno
+
+
+class SesionMesa:
+    """
+    Partida de una mesa: un backend de robot, un jugador y un directorio de trabajo propios.
+    Se ejecuta en su propio hilo y acumula sus estadísticas de rendimiento.
+    """
+
+    def __init__(self, nombre, crear_robot, simulacion=True, jugador=None, directorio_trabajo=None, turnos_maximos=None):
+        """
+        Args:
+            nombre (str): Nombre de la mesa (aparece en las preguntas y en el informe).
+            crear_robot (callable): Función sin argumentos que devuelve el backend de la mesa, p.ej.
+                `lambda: DominoRobotController(port=20000)` o `ScaraControllerIntermediary`. Se llama
+                desde el hilo de la sesión.
+            simulacion (bool): True si el backend es simulado.
+            jugador: (Opcional) JugadorConsola o JugadorAutomatico. Por defecto, consola con el nombre de la mesa.
+            directorio_trabajo (str): (Opcional) Directorio de las imágenes de la mesa. Por defecto ./Mesas/<nombre>.
+            turnos_maximos (int): (Opcional) Número máximo de turnos; sin límite si es None.
+        """
+        self.nombre = nombre
+        self.crear_robot = crear_robot
+        self.simulacion = simulacion
+        self.jugador = jugador if jugador is not None else JugadorConsola(simulacion, prefijo=f"[{nombre}] ")
+        self.directorio_trabajo = os.path.abspath(directorio_trabajo or os.path.join("Mesas", nombre))
+        self.turnos_maximos = turnos_maximos
+        self.robot = None
+
+        self.turnos = 0
+        self.fichas_jugadas = 0
+        self.segundos = 0.0
+        self.segundos_vision = 0.0
+        self.segundos_simulados = None
+        self.error = None
+
+    def ejecutar(self, analizar=analizar_tablero):
+        """
+        Juega turnos hasta que el jugador termina, se llega a `turnos_maximos` o hay un error.
+
+        Args:
+            analizar (callable): Función de visión con la firma de `analizar_tablero`.
+        """
+        os.makedirs(os.path.join(self.directorio_trabajo, "Media_Stream"), exist_ok=True)
+
+        def analizar_medido(*args):
+            inicio = time.perf_counter()
+            try:
+                return analizar(*args)
+            finally:
+                self.segundos_vision += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        try:
+            self.robot = self.crear_robot()
+            if getattr(self.robot, "clientID", 0) == -1:
+                raise ConnectionError(f"No se pudo conectar al robot de la mesa {self.nombre}.")
+            tiempo_simulado_inicial = self._tiempo_simulado()
+
+            while self.turnos_maximos is None or self.turnos < self.turnos_maximos:
+                if jugar_turno(self.robot, self.simulacion, self.jugador, self.directorio_trabajo, analizar_medido):
+                    self.fichas_jugadas += 1
+                self.turnos += 1
+                self.segundos = time.perf_counter() - inicio
+                if self.jugador.preguntar('continuar', "Quieres jugar otra ficha? (Presiona Enter para continuar o escribe 'n' para terminar): ") == 'n':
+                    break
+
+            tiempo_simulado_final = self._tiempo_simulado()
+            if tiempo_simulado_inicial is not None and tiempo_simulado_final is not None:
+                self.segundos_simulados = tiempo_simulado_final - tiempo_simulado_inicial
+        except Exception as e:
+            self.error = e
+            print(f"[{self.nombre}] Error en la partida: {e}")
+        finally:
+            self.segundos = time.perf_counter() - inicio
+            if self.robot is not None:
+                self.robot.disconnect()
+
+    def _tiempo_simulado(self):
+        # Solo los backends simulados tienen reloj de simulación
+        if not hasattr(self.robot, "tiempo_simulacion"):
+            return None
+        return self.robot.tiempo_simulacion()
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Turnos, fichas jugadas, tiempos (s) y turnos por hora de la mesa.
+        """
+        return {
+            'mesa': self.nombre,
+            'turnos': self.turnos,
+            'fichas_jugadas': self.fichas_jugadas,
+            'segundos': self.segundos,
+            'segundos_vision': self.segundos_vision,
+            'segundos_simulados': self.segundos_simulados,
+            'turnos_por_hora': 3600.0 * self.turnos / self.segundos if self.segundos > 0 else 0.0,
+            'error': str(self.error) if self.error is not None else None,
+        }
+
+
+class OrquestadorMesas:
+    """
+    Ejecuta varias mesas a la vez desde un mismo proceso, un hilo por mesa.
+
+    Las mesas comparten:
+        * un grupo de procesos para la visión (Detectar_Domino es CPU y se ejecuta fuera del GIL;
+          cada trabajo se ejecuta en el directorio de su mesa, ver `analizar_tablero`),
+        * la caché de audios de Reconocimiento_Voz.hablar,
+        * el gestor de conexiones de CoppeliaSim (una conexión por host y puerto).
+    """
+
+    def __init__(self, procesos_vision=None):
+        """
+        Args:
+            procesos_vision (int): (Opcional) Procesos del grupo de visión. Por defecto, uno por mesa
+                                   (como máximo el número de CPUs).
+        """
+        self.procesos_vision = procesos_vision
+        self.sesiones = []
+
+    def añadir_mesa(self, nombre, crear_robot, simulacion=True, jugador=None, directorio_trabajo=None, turnos_maximos=None):
+        """
+        Añade una mesa (mismos argumentos que SesionMesa).
+
+        Returns:
+            SesionMesa: La sesión creada.
+        """
+        if any(sesion.nombre == nombre for sesion in self.sesiones):
+            raise ValueError(f"Ya existe una mesa llamada '{nombre}'.")
+        sesion = SesionMesa(nombre, crear_robot, simulacion, jugador, directorio_trabajo, turnos_maximos)
+        self.sesiones.append(sesion)
+        return sesion
+
+    def ejecutar(self, analizar=analizar_tablero):
+        """
+        Ejecuta todas las mesas hasta que terminan y muestra el rendimiento de cada una.
+
+        Args:
+            analizar (callable): Función de visión con la firma de `analizar_tablero`. Debe poder
+                                 enviarse a otro proceso (función definida a nivel de módulo).
+                                 Se llama con mostrar=False: en los procesos del grupo no hay
+                                 nadie que vea las ventanas ni pulse teclas.
+
+        Returns:
+            list: Estadísticas de cada mesa (ver SesionMesa.estadisticas).
+        """
+        if not self.sesiones:
+            return []
+        procesos = self.procesos_vision or min(len(self.sesiones), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=procesos) as grupo_vision:
+
+            def analizar_en_grupo(*args):
+                return grupo_vision.submit(analizar, *args, mostrar=False).result()
+
+            hilos = [threading.Thread(target=sesion.ejecutar, args=(analizar_en_grupo,), name=f"mesa-{sesion.nombre}")
+                     for sesion in self.sesiones]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+        estadisticas = [sesion.estadisticas() for sesion in self.sesiones]
+        self.mostrar_informe(estadisticas)
+        return estadisticas
+
+    @staticmethod
+    def mostrar_informe(estadisticas):
+        print("\nRendimiento por mesa:")
+        for datos in estadisticas:
+            linea = (f"  {datos['mesa']}: {datos['turnos']} turnos, {datos['fichas_jugadas']} fichas jugadas en "
+                     f"{datos['segundos']:.1f} s ({datos['turnos_por_hora']:.1f} turnos/h), visión {datos['segundos_vision']:.1f} s")
+            if datos['segundos_simulados'] is not None:
+                linea += f", {datos['segundos_simulados']:.1f} s simulados"
+            if datos['error'] is not None:
+                linea += f", error: {datos['error']}"
+            print(linea)
+
+
+if __name__ == "__main__":
+    # Mesas en simulación: DOMIBOT_MESAS es la lista de puertos de CoppeliaSim (una escena por puerto),
+    # o DOMIBOT_SIMULADOR=local con DOMIBOT_NUM_MESAS mesas en el simulador en proceso.
+    # DOMIBOT_AUTOMATICO=<turnos> sustituye a los jugadores humanos por JugadorAutomatico.
+    turnos_automaticos = os.environ.get("DOMIBOT_AUTOMATICO")
+    orquestador = OrquestadorMesas()
+
+    if os.environ.get("DOMIBOT_SIMULADOR") == "local":
+        from Virtual_Controllers.Domibot_Local import DominoRobotLocal
+        for numero in range(int(os.environ.get("DOMIBOT_NUM_MESAS", "2"))):
+            jugador = JugadorAutomatico(int(turnos_automaticos)) if turnos_automaticos else None
+            orquestador.añadir_mesa(f"mesa{numero}", lambda semilla=numero: DominoRobotLocal(semilla=semilla), jugador=jugador)
+    else:
+        from Virtual_Controllers.Domibot import DominoRobotController
+        for puerto in os.environ.get("DOMIBOT_MESAS", "19999").split(","):
+            jugador = JugadorAutomatico(int(turnos_automaticos)) if turnos_automaticos else None
+            orquestador.añadir_mesa(f"mesa{puerto}", lambda puerto=int(puerto): DominoRobotController(port=puerto), jugador=jugador)
+
+    orquestador.ejecutar()
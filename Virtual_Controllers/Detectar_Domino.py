@@ -304,9 +304,10 @@ def obtener_mitad(coordenadas, lado):
     print(f"Dirección '{lado}' no válida.")
     return coordenadas  # Devolver el diccionario original si el lado no es válido
 
-def obtener_valor_ficha(coordenadas, imagen_path, simulacion=True):
+def obtener_valor_ficha(coordenadas, imagen_path, simulacion=True, mostrar=True):
     """
     Obtiene el valor de una mitad de ficha de dominó a partir de sus coordenadas.
+    Con `mostrar` enseña la máscara de los puntos y espera una tecla (False para ejecuciones desatendidas).
     """
     try:
         imagen = cv2.imread(imagen_path)
@@ -340,8 +341,9 @@ def obtener_valor_ficha(coordenadas, imagen_path, simulacion=True):
                     if 0.5 < circularidad <= 1.0 and 200 < area < 650:
                         puntos_validos.append(contorno)
         
-        cv2.imshow("Contornos", umbral)
-        cv2.waitKey(0)
+        if mostrar:
+            cv2.imshow("Contornos", umbral)
+            cv2.waitKey(0)
 
         num_puntos = len(puntos_validos)
 
@@ -376,7 +378,7 @@ def es_horizontal_o_vertical(coordenadas):
         return "vertical"
 
     
-def obtener_puntuacion_ficha(coordenadas, posicion_vecino, imagen_path, valor_contrario=False, simulacion=True):
+def obtener_puntuacion_ficha(coordenadas, posicion_vecino, imagen_path, valor_contrario=False, simulacion=True, mostrar=True):
     """
     Calcula la puntuación de una ficha de dominó en función de su posición y la
     posición de su vecino.
@@ -389,6 +391,7 @@ def obtener_puntuacion_ficha(coordenadas, posicion_vecino, imagen_path, valor_co
                              'arriba', 'abajo').
         valor_contrario (bool): Si es True, se devuelve el valor contrario.
         imagen_path (str): La ruta a la imagen de la ficha de dominó.
+        mostrar (bool): Si es True, enseña cada mitad analizada y espera una tecla.
     
     Returns:
         int: La puntuación calculada.
@@ -415,13 +418,13 @@ def obtener_puntuacion_ficha(coordenadas, posicion_vecino, imagen_path, valor_co
         print("Ficha de jugador")
         puntuacion = []
         nueva_coordenadas = obtener_mitad(coordenadas, "arriba")
-        puntuacion.append(obtener_valor_ficha(nueva_coordenadas, imagen_path, simulacion))
+        puntuacion.append(obtener_valor_ficha(nueva_coordenadas, imagen_path, simulacion, mostrar))
         nueva_coordenadas = obtener_mitad(coordenadas, "abajo")
-        puntuacion.append(obtener_valor_ficha(nueva_coordenadas, imagen_path, simulacion))
+        puntuacion.append(obtener_valor_ficha(nueva_coordenadas, imagen_path, simulacion, mostrar))
         return puntuacion
     else:
         nueva_coordenadas = obtener_mitad(coordenadas, posicion_valor_a_encontrar)
-        return obtener_valor_ficha(nueva_coordenadas, imagen_path, simulacion)
+        return obtener_valor_ficha(nueva_coordenadas, imagen_path, simulacion, mostrar)
 
 def obtener_fichas_jugador(img_path, tamaño_ficha, simulacion=True):
     """Función secundaria para detectar fichas de dominó en una imagen"""
@@ -445,9 +448,10 @@ def obtener_fichas_jugador(img_path, tamaño_ficha, simulacion=True):
     # Obtener array de datos de fichas en bordes como solicitado
     return [ficha.datos for ficha in fichas]
 
-def obtener_estado_completo(img_path_tablero, img_path_jugador, tamaño_ficha=2900, simulacion=True):
+def obtener_estado_completo(img_path_tablero, img_path_jugador, tamaño_ficha=2900, simulacion=True, mostrar=True):
     """
     Función para obtener el estado completo del juego de dominó.
+    Con `mostrar=False` no abre ventanas ni espera teclas (ver obtener_valor_ficha).
     """
     fichas_borde_data = obtener_estado(img_path_tablero, tamaño_ficha, simulacion=simulacion)
 
@@ -462,7 +466,7 @@ def obtener_estado_completo(img_path_tablero, img_path_jugador, tamaño_ficha=29
 
         img = Obtener_Ficha_Imagen(img_path_tablero, ficha_data[0])
 
-        puntuacion = obtener_puntuacion_ficha(ficha_data[0], ficha_data[1],img_path_tablero, True, simulacion=simulacion)
+        puntuacion = obtener_puntuacion_ficha(ficha_data[0], ficha_data[1],img_path_tablero, True, simulacion=simulacion, mostrar=mostrar)
         print(f"  Puntuación: {puntuacion}")
         # Añadir la puntuación a la lista de datos de la ficha
         fichas_borde_data[i].append(puntuacion)
@@ -479,7 +483,7 @@ def obtener_estado_completo(img_path_tablero, img_path_jugador, tamaño_ficha=29
     for i, ficha_data in enumerate(fichas_jugador_data):
         print(f"Ficha {i}:")
         print(f"  Coordenadas: {ficha_data[0]}")
-        puntuacion = obtener_puntuacion_ficha(ficha_data[0], ficha_data[1],img_path_jugador, True, simulacion=simulacion)
+        puntuacion = obtener_puntuacion_ficha(ficha_data[0], ficha_data[1],img_path_jugador, True, simulacion=simulacion, mostrar=mostrar)
         print(f"  Puntuación: {puntuacion[0]}, {puntuacion[1]}")
         # Añadir la puntuación a la lista de datos de la ficha
         fichas_jugador_data[i].append(puntuacion)
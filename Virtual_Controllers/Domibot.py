@@ -7,28 +7,69 @@ from sympy import N, nsolve
 from sympy.physics.vector import init_vprinting
 from sympy.physics.mechanics import dynamicsymbols
 import Virtual_Controllers.sim as sim
+from Virtual_Controllers.Gestor_Conexiones import gestor_conexiones as GESTOR_CONEXIONES_POR_DEFECTO
 import time
+from contextlib import contextmanager
 import matplotlib.pyplot as plt
 from Virtual_Controllers.Detectar_Domino import obtener_estado, Obtener_Ficha_Imagen, obtener_puntuacion_ficha, obtener_fichas_jugador
 
 
+# Margen de asentamiento (segundos) por fase, que se espera DESPUÉS de que la articulación
+# haya llegado a su objetivo en la simulación (no hace falta un tiempo fijo por movimiento).
+MARGENES_ASENTAMIENTO_POR_DEFECTO = {
+    'desplazamiento': 0.1,  # Después de mover el brazo (joint1, joint2, joint4)
+    'bajada': 0.1,          # Después de bajar el eje Z hasta la ficha
+    'ventosa': 0.3,         # Para que la ventosa agarre o suelte la ficha
+    'subida': 0.0           # Después de subir el eje Z
+}
+
+# Señales del script de la escena con las acciones compuestas pickAt/placeAt (Coppelia/accionesFicha.lua)
+SENAL_ACCIONES_FICHA = 'domibotAccionesFicha'
+SENAL_FIN_ACCION = 'domibotAccionFin'
+DESCENSO_Z_GRADOS = -5 # Desplazamiento del eje Z para coger/soltar (en las unidades de move_joint_by_delta)
+
+
 class DominoRobotController:
-    def __init__(self, port=19999):
+    def __init__(self, port=19999, margenes_asentamiento=None, tolerancia_articulacion=0.002, timeout_movimiento=5.0,
+                 timeout_foto=1.0, modo_sincrono=False, host='127.0.0.1', gestor_conexiones=None):
+        """
+        Args:
+            port (int): Puerto de la API remota de CoppeliaSim.
+            margenes_asentamiento (dict): (Opcional) Márgenes por fase que sustituyen a MARGENES_ASENTAMIENTO_POR_DEFECTO.
+            tolerancia_articulacion (float): Error (rad o m) a partir del cual una articulación se considera en su objetivo.
+            timeout_movimiento (float): Tiempo máximo (s) que se espera a que las articulaciones lleguen a su objetivo.
+            timeout_foto (float): Tiempo máximo (s) que se espera a tener en el buffer una imagen suficientemente nueva.
+            modo_sincrono (bool): Si es True, la simulación avanza paso a paso (simxSynchronousTrigger) tan rápido como
+                                  permite el ordenador, y todas las esperas y timeouts son en tiempo de simulación.
+                                  La escena debe estar parada al conectar (el controlador inicia la simulación).
+            host (str): Dirección del servidor de la API remota de CoppeliaSim.
+            gestor_conexiones (GestorConexiones): (Opcional) Gestor de las conexiones. Por defecto, el compartido
+                                                  por todo el proceso (vea Gestor_Conexiones).
+        """
         init_vprinting(use_latex='mathjax', pretty_print=False)
         self._define_symbols()
         self._initialize_transformation_matrices()
         self._substitute_robot_params()
 
-        self.clientID = self._connect_coppelia(port)
-        if self.clientID != -1:
-            self._get_joint_handles()
-            self._get_suction_cup_handle()
-            self._get_camera_handle()
-        else:
-            print("Error: No se pudo conectar a CoppeliaSim. Las funciones del robot no estarán disponibles.")
+        self.timeout_foto = timeout_foto
+        # Tiempos de simulación (ms) de la última orden de movimiento y de la última imagen leída
+        self.tiempo_ultima_orden = 0
+        self.tiempo_ultima_foto = None
+        self._profundidad_lote = 0
+        self.acciones_en_escena = False # True si la escena tiene pickAt/placeAt (vea _detectar_acciones_escena)
+        self._id_accion = 0
+        self.modo_sincrono = modo_sincrono
+        self.host = host
+        self.port = port
+        self.gestor_conexiones = gestor_conexiones or GESTOR_CONEXIONES_POR_DEFECTO
 
         self.dventosa = 0.011
 
+        self.margenes_asentamiento = dict(MARGENES_ASENTAMIENTO_POR_DEFECTO)
+        self.margenes_asentamiento.update(margenes_asentamiento or {})
+        self.tolerancia_articulacion = tolerancia_articulacion
+        self.timeout_movimiento = timeout_movimiento
+
         # Estado interno de ángulos de joints en radianes
         self.joint_angles = {
             'joint1': 0.0,
@@ -37,9 +78,24 @@ class DominoRobotController:
             'joint4': 0.0
         }
 
+        self.clientID = self._connect_coppelia(port)
+        if self.clientID != -1:
+            self._inicializar_sesion()
+        else:
+            print("Error: No se pudo conectar a CoppeliaSim. Las funciones del robot no estarán disponibles.")
+
+    def _inicializar_sesion(self):
+        """Prepara una conexión nueva: handles, suscripciones en streaming y estado real de las articulaciones."""
+        self._get_joint_handles()
+        self._get_suction_cup_handle()
+        self._get_camera_handle()
+        self._suscribir_camara()
+        self._detectar_acciones_escena()
         # Sincronizar estado interno leyendo ángulos reales al inicio
-        #if self.clientID != -1:
-        #    self._update_joint_angles_from_robot()
+        self._suscribir_articulaciones()
+        self._update_joint_angles_from_robot()
+        if self.modo_sincrono:
+            self._activar_modo_sincrono()
 
     def _define_symbols(self):
         (self.theta1, self.theta2, self.theta3, self.theta4, self.lc, self.la,
@@ -75,35 +131,171 @@ class DominoRobotController:
         self.mbee = self.mbee_symbolic.subs({self.lc: 0.2, self.la: 0.26, self.lb: 0.1425, self.l4: 0.0981})
 
     def _connect_coppelia(self, port):
-        sim.simxFinish(-1)
-        clientID = sim.simxStart('127.0.0.1', port, True, True, 2000, 5)
-        if clientID != -1:
-            print(f"Conectado a CoppeliaSim en el puerto {port}")
-        else:
-            print(f"No se pudo conectar a CoppeliaSim en el puerto {port}")
-        return clientID
+        # Solo se abre (o reutiliza) la conexión de este puerto: las de otras escenas no se tocan
+        return self.gestor_conexiones.obtener_conexion(self.host, port)
+
+    def _asegurar_conexion(self):
+        """
+        Comprueba (localmente) que la conexión sigue viva y, si se ha perdido, vuelve a conectar
+        y prepara la sesión de nuevo.
+
+        Returns:
+            bool: True si hay conexión.
+        """
+        if self.clientID == -1:
+            return False
+        if self.gestor_conexiones.conexion_activa(self.clientID):
+            return True
+        print(f"Conexión con CoppeliaSim en {self.host}:{self.port} perdida. Reconectando...")
+        self.clientID = self.gestor_conexiones.reconectar(self.host, self.port, self.clientID)
+        if self.clientID == -1:
+            return False
+        self._inicializar_sesion()
+        return True
 
     def _get_joint_handles(self):
         if self.clientID == -1:
             return
-        _, self.joint1 = sim.simxGetObjectHandle(self.clientID, 'Joint1', sim.simx_opmode_blocking)
-        _, self.joint2 = sim.simxGetObjectHandle(self.clientID, 'Joint2', sim.simx_opmode_blocking)
-        _, self.joint3 = sim.simxGetObjectHandle(self.clientID, 'Joint3', sim.simx_opmode_blocking)
-        _, self.joint4 = sim.simxGetObjectHandle(self.clientID, 'Joint4', sim.simx_opmode_blocking)
+        self.joint1 = self.gestor_conexiones.obtener_handle(self.clientID, 'Joint1')
+        self.joint2 = self.gestor_conexiones.obtener_handle(self.clientID, 'Joint2')
+        self.joint3 = self.gestor_conexiones.obtener_handle(self.clientID, 'Joint3')
+        self.joint4 = self.gestor_conexiones.obtener_handle(self.clientID, 'Joint4')
         print(f"Handles articulaciones: J1:{self.joint1}, J2:{self.joint2}, J3:{self.joint3}, J4:{self.joint4}")
 
     def _get_suction_cup_handle(self):
         if self.clientID == -1:
             return
-        _, self.suction_pad_handle = sim.simxGetObjectHandle(self.clientID, 'suctionPad', sim.simx_opmode_blocking)
+        self.suction_pad_handle = self.gestor_conexiones.obtener_handle(self.clientID, 'suctionPad')
         print(f"Handle ventosa: {self.suction_pad_handle}")
 
     def _get_camera_handle(self):
         if self.clientID == -1:
             return
-        _, self.sensor_handle = sim.simxGetObjectHandle(self.clientID, 'Vision_sensor', sim.simx_opmode_blocking)
+        self.sensor_handle = self.gestor_conexiones.obtener_handle(self.clientID, 'Vision_sensor')
         print(f"Handle cámara: {self.sensor_handle}")
 
+    def _activar_modo_sincrono(self):
+        """Activa el modo síncrono e inicia la simulación: solo avanza cuando el controlador lo pide."""
+        sim.simxSynchronous(self.clientID, True)
+        sim.simxStartSimulation(self.clientID, sim.simx_opmode_blocking)
+        self._avanzar_paso()
+        print("Modo síncrono activado: la simulación avanza paso a paso.")
+
+    def _avanzar_paso(self):
+        """Avanza un paso de simulación y espera a que termine (modo síncrono)."""
+        sim.simxSynchronousTrigger(self.clientID)
+        # La respuesta al ping llega cuando el servidor ha procesado el paso
+        sim.simxGetPingTime(self.clientID)
+
+    def tiempo_simulacion(self):
+        """Tiempo de simulación (s) del último mensaje recibido del servidor."""
+        return sim.simxGetLastCmdTime(self.clientID) / 1000.0
+
+    def _reloj(self):
+        """Reloj de las esperas y timeouts: tiempo de simulación en modo síncrono, tiempo real si no."""
+        if self.modo_sincrono:
+            return self.tiempo_simulacion()
+        return time.perf_counter()
+
+    def esperar(self, segundos):
+        """
+        Espera `segundos` con el reloj del controlador. En modo síncrono avanza la simulación (como
+        mínimo un paso) hasta que han pasado `segundos` de tiempo simulado.
+        """
+        if not self.modo_sincrono:
+            if segundos > 0:
+                time.sleep(segundos)
+            return
+        fin = self.tiempo_simulacion() + segundos
+        self._avanzar_paso()
+        while self.tiempo_simulacion() < fin:
+            self._avanzar_paso()
+
+    def _suscribir_camara(self):
+        """
+        Suscribe la cámara en modo streaming: el servidor envía cada imagen nueva al buffer del
+        cliente y `obtener_foto` la lee localmente (simx_opmode_buffer) sin esperar una ida y vuelta.
+        """
+        if self.clientID == -1:
+            return
+        # La primera llamada en streaming solo registra la suscripción (todavía no hay imagen)
+        sim.simxGetVisionSensorImageArray(self.clientID, self.sensor_handle, 0, sim.simx_opmode_streaming)
+
+    def _detectar_acciones_escena(self):
+        """
+        Comprueba si el script de la ventosa tiene las acciones compuestas pickAt/placeAt
+        (Coppelia/accionesFicha.lua). Si las tiene, se suscribe a la señal de fin de acción.
+        """
+        if self.clientID == -1:
+            return
+        ret_code, valor = sim.simxGetIntegerSignal(self.clientID, SENAL_ACCIONES_FICHA, sim.simx_opmode_blocking)
+        self.acciones_en_escena = ret_code == sim.simx_return_ok and valor == 1
+        if self.acciones_en_escena:
+            # Se borra el fin de una sesión anterior para no confundirlo con el de la primera acción
+            sim.simxClearIntegerSignal(self.clientID, SENAL_FIN_ACCION, sim.simx_opmode_blocking)
+            sim.simxGetIntegerSignal(self.clientID, SENAL_FIN_ACCION, sim.simx_opmode_streaming)
+            print("Acciones pickAt/placeAt disponibles en la escena.")
+        else:
+            print("La escena no tiene pickAt/placeAt: coger y soltar ficha se secuencian desde Python.")
+
+    def _accion_en_escena(self, funcion):
+        """
+        Ejecuta una acción compuesta del simulador (bajar Z, ventosa, subir Z) con una sola llamada
+        y espera a que el script escriba su identificador en la señal de fin (en negativo si ha fallado).
+
+        Returns:
+            bool: True si la acción ha terminado bien, False si ha fallado, se agota el tiempo o no hay conexión.
+        """
+        if not self._asegurar_conexion():
+            return False
+        self._id_accion += 1
+        parametros = [np.deg2rad(DESCENSO_Z_GRADOS), self.margenes_asentamiento['bajada'],
+                      self.margenes_asentamiento['ventosa'], self.margenes_asentamiento['subida'],
+                      self.tolerancia_articulacion, self.timeout_movimiento]
+        sim.simxCallScriptFunction(self.clientID, 'suctionPad', sim.sim_scripttype_childscript, funcion,
+                                   [self._id_accion], parametros, [], '', sim.simx_opmode_oneshot)
+        self.tiempo_ultima_orden = sim.simxGetLastCmdTime(self.clientID)
+
+        # El script siempre responde antes de 2 * timeout_movimiento + márgenes (de simulación);
+        # el margen extra cubre el retraso de la comunicación
+        timeout = 2 * self.timeout_movimiento + sum(parametros[1:4]) + 1.0
+        limite = self._reloj() + timeout
+        while True:
+            ret_code, valor = sim.simxGetIntegerSignal(self.clientID, SENAL_FIN_ACCION, sim.simx_opmode_buffer)
+            if ret_code == sim.simx_return_ok and valor == self._id_accion:
+                return True
+            if ret_code == sim.simx_return_ok and valor == -self._id_accion:
+                print(f"Aviso: La acción '{funcion}' ha fallado en la escena (el eje Z no ha llegado a su objetivo).")
+                return False
+            if self._reloj() >= limite:
+                print(f"Aviso: La acción '{funcion}' no ha terminado en {timeout:.1f}s.")
+                return False
+            self.esperar(0.005)
+
+    def _suscribir_articulaciones(self):
+        """
+        Suscribe la posición de las cuatro articulaciones en modo streaming: el servidor envía cada
+        lectura nueva al buffer del cliente y `_leer_articulacion` la consulta sin ida y vuelta.
+        """
+        if self.clientID == -1:
+            return
+        for joint_name in self.joint_angles.keys():
+            sim.simxGetJointPosition(self.clientID, getattr(self, joint_name), sim.simx_opmode_streaming)
+
+    def _leer_articulacion(self, joint_name):
+        """
+        Lee la posición de una articulación del buffer de streaming. Si todavía no ha llegado
+        ninguna lectura, la pide al servidor.
+
+        Returns:
+            float: Posición (rad o m), o None si no se ha podido leer.
+        """
+        joint_handle = getattr(self, joint_name)
+        ret_code, posicion = sim.simxGetJointPosition(self.clientID, joint_handle, sim.simx_opmode_buffer)
+        if ret_code != sim.simx_return_ok:
+            ret_code, posicion = sim.simxGetJointPosition(self.clientID, joint_handle, sim.simx_opmode_blocking)
+        return posicion if ret_code == sim.simx_return_ok else None
+
     def _update_joint_angles_from_robot(self):
         if self.clientID == -1:
             return
@@ -112,14 +304,83 @@ class DominoRobotController:
             if joint_handle is None:
                 print(f"No existe handle para {joint_name}")
                 continue
-            ret_code, angle_rad = sim.simxGetJointPosition(self.clientID, joint_handle, sim.simx_opmode_blocking)
-            if ret_code == sim.simx_return_ok:
+            angle_rad = self._leer_articulacion(joint_name)
+            if angle_rad is not None:
                 self.joint_angles[joint_name] = angle_rad
             else:
                 print(f"No se pudo leer el ángulo actual de {joint_name}, se asume 0")
 
-    def move_joint_by_delta(self, joint_name, delta_degrees):
+    def wait_until_reached(self, tolerance=None, timeout=None, joint_names=None, periodo=0.005):
+        """
+        Espera hasta que las articulaciones llegan al objetivo enviado con move_joint_by_delta, leyendo
+        su posición del buffer de streaming. Las que llegan pasan a tener como estado interno la
+        posición leída de la simulación (en lazo cerrado, no la estimada).
+
+        Args:
+            tolerance (float): Error (rad o m) admitido. Por defecto, `tolerancia_articulacion`.
+            timeout (float): Tiempo máximo de espera (s). Por defecto, `timeout_movimiento`.
+            joint_names (list): (Opcional) Articulaciones a esperar. Por defecto, todas.
+            periodo (float): Tiempo (s) entre lecturas del buffer.
+
+        Returns:
+            bool: True si todas han llegado, False si se agota el timeout o no hay conexión.
+        """
+        if self.clientID == -1:
+            return False
+        joint_names = list(joint_names or self.joint_angles.keys())
+        tolerance = self.tolerancia_articulacion if tolerance is None else tolerance
+        timeout = self.timeout_movimiento if timeout is None else timeout
+        limite = self._reloj() + timeout
+        pendientes = joint_names
+        while True:
+            lecturas = {joint_name: self._leer_articulacion(joint_name) for joint_name in pendientes}
+            pendientes = []
+            for joint_name, posicion in lecturas.items():
+                if posicion is None or abs(posicion - self.joint_angles[joint_name]) > tolerance:
+                    pendientes.append(joint_name)
+                else:
+                    self.joint_angles[joint_name] = posicion
+            if not pendientes:
+                return True
+            if self._reloj() >= limite:
+                print(f"Aviso: {pendientes} no han llegado a su objetivo en {timeout:.1f}s.")
+                return False
+            self.esperar(periodo)
+
+    def esperar_articulaciones(self, joint_names=None, timeout=None):
+        """Espera a que las articulaciones lleguen a su objetivo (vea `wait_until_reached`)."""
+        return self.wait_until_reached(timeout=timeout, joint_names=joint_names)
+
+    def esperar_asentamiento(self, fase, joint_names=None):
+        """Espera a que las articulaciones lleguen y después el margen de asentamiento de la fase."""
+        llegado = self.esperar_articulaciones(joint_names)
+        margen = self.margenes_asentamiento[fase]
+        if margen > 0:
+            self.esperar(margen)
+        return llegado
+
+    @contextmanager
+    def lote_ordenes(self):
+        """
+        Agrupa las órdenes enviadas dentro del bloque `with` (simxPauseCommunication): salen en un
+        solo paquete al cerrar el bloque y el servidor las aplica en el mismo paso de simulación.
+        Se puede anidar; el paquete se envía al cerrar el bloque exterior.
+        """
         if self.clientID == -1:
+            yield
+            return
+        if self._profundidad_lote == 0:
+            sim.simxPauseCommunication(self.clientID, 1)
+        self._profundidad_lote += 1
+        try:
+            yield
+        finally:
+            self._profundidad_lote -= 1
+            if self._profundidad_lote == 0:
+                sim.simxPauseCommunication(self.clientID, 0)
+
+    def move_joint_by_delta(self, joint_name, delta_degrees):
+        if not self._asegurar_conexion():
             print("No conectado a CoppeliaSim.")
             return
 
@@ -133,6 +394,7 @@ class DominoRobotController:
         new_angle_rad = current_angle_rad + delta_rad
 
         sim.simxSetJointTargetPosition(self.clientID, joint_handle, new_angle_rad, sim.simx_opmode_oneshot)
+        self.tiempo_ultima_orden = sim.simxGetLastCmdTime(self.clientID)
         print(f"Moviendo '{joint_name}' de {current_angle_rad * 180 / np.pi:.2f}° a {new_angle_rad * 180 / np.pi:.2f}°")
 
         self.joint_angles[joint_name] = new_angle_rad
@@ -221,9 +483,11 @@ class DominoRobotController:
             angulo_joint2 = th2_sol * 180 / np.pi
             angulo_joint4 = rotacion
 
-            self.move_joint_by_delta('joint1', angulo_joint1)
-            self.move_joint_by_delta('joint2', angulo_joint2)
-            self.move_joint_by_delta('joint4', -(angulo_joint1 + angulo_joint2)+angulo_joint4)  # Ajustar joint4 para mantener equilibrio
+            with self.lote_ordenes():
+                self.move_joint_by_delta('joint1', angulo_joint1)
+                self.move_joint_by_delta('joint2', angulo_joint2)
+                self.move_joint_by_delta('joint4', -(angulo_joint1 + angulo_joint2)+angulo_joint4)  # Ajustar joint4 para mantener equilibrio
+            self.esperar_asentamiento('desplazamiento', ['joint1', 'joint2', 'joint4'])
 
             print(f"✔️ Movimiento exitoso a XY ({px:.3f}, {py:.3f}).")
             print(f"Ángulos (rad): θ1={th1_sol.evalf():.3f}, θ2={th2_sol.evalf():.3f}, θ4={yaw:.3f}")
@@ -234,41 +498,89 @@ class DominoRobotController:
         
     def disconnect(self):
         if self.clientID != -1:
-            sim.simxFinish(self.clientID)
-            print("Desconectado de CoppeliaSim.")
+            # Las suscripciones son de la conexión: solo se cancelan si ningún otro controlador la comparte
+            if self.gestor_conexiones.usuarios(self.host, self.port) <= 1 and self.gestor_conexiones.conexion_activa(self.clientID):
+                if self.modo_sincrono:
+                    # Se devuelve la simulación al modo asíncrono para que no quede esperando pasos
+                    sim.simxSynchronous(self.clientID, False)
+                sim.simxGetVisionSensorImageArray(self.clientID, self.sensor_handle, 0, sim.simx_opmode_discontinue)
+                if self.acciones_en_escena:
+                    sim.simxGetIntegerSignal(self.clientID, SENAL_FIN_ACCION, sim.simx_opmode_discontinue)
+                for joint_name in self.joint_angles.keys():
+                    sim.simxGetJointPosition(self.clientID, getattr(self, joint_name), sim.simx_opmode_discontinue)
+            self.gestor_conexiones.liberar_conexion(self.host, self.port)
             self.clientID = -1
 
-    def obtener_foto(self):
-        if self.clientID == -1:
+    def obtener_foto(self, posterior_a=None, timeout=None, periodo=0.005):
+        """
+        Devuelve la imagen más reciente de la cámara leída del buffer de streaming (sin ida y vuelta
+        al servidor). Su tiempo de simulación queda en `tiempo_ultima_foto`.
+
+        Args:
+            posterior_a (int): Tiempo de simulación (ms) que la imagen debe superar. Por defecto, el de la
+                               última orden de movimiento (`tiempo_ultima_orden`); 0 acepta cualquier imagen.
+            timeout (float): Tiempo máximo (s) de espera de una imagen nueva. Por defecto, `timeout_foto`.
+            periodo (float): Tiempo (s) entre lecturas del buffer mientras se espera.
+
+        Returns:
+            np.ndarray: Imagen RGB (alto, ancho, 3) uint8, o None si no hay conexión o no se ha podido leer.
+        """
+        if not self._asegurar_conexion():
             print("No conectado a CoppeliaSim.")
             return
 
-        retCode, resolution, image=sim.simxGetVisionSensorImage(self.clientID,self.sensor_handle,0,sim.simx_opmode_oneshot_wait)
-        img=np.array(image).astype(np.uint8)
-        img.resize([resolution[1],resolution[0],3])
-        img = np.flipud(img)
-        
+        posterior_a = self.tiempo_ultima_orden if posterior_a is None else posterior_a
+        timeout = self.timeout_foto if timeout is None else timeout
+        limite = self._reloj() + timeout
+        while True:
+            # La imagen se copia una sola vez del buffer de la API remota a un array propio, ya volteada
+            retCode, resolution, img = sim.simxGetVisionSensorImageArray(self.clientID, self.sensor_handle, 0,
+                                                                         sim.simx_opmode_buffer, flip=True)
+            # Tiempo de simulación del último mensaje recibido del servidor (el que ha traído la imagen)
+            tiempo = sim.simxGetLastCmdTime(self.clientID)
+            if retCode == sim.simx_return_ok and tiempo > posterior_a:
+                self.tiempo_ultima_foto = tiempo
+                return img
+            if self._reloj() >= limite:
+                break
+            self.esperar(periodo)
+
+        # Sin imagen nueva en el buffer (p.ej. la suscripción se ha perdido): se pide directamente
+        print(f"Aviso: No hay imagen de streaming posterior a t={posterior_a} ms en {timeout:.1f}s. Se pide una imagen al servidor.")
+        retCode, resolution, img = sim.simxGetVisionSensorImageArray(self.clientID, self.sensor_handle, 0,
+                                                                     sim.simx_opmode_oneshot_wait, flip=True)
+        if retCode != sim.simx_return_ok:
+            print(f"Error al obtener la imagen de la cámara (código {retCode}).")
+            return None
+        self.tiempo_ultima_foto = sim.simxGetLastCmdTime(self.clientID)
+        self._suscribir_camara()
         return img
     
     def coger_ficha(self):
-        self.move_joint_by_delta('joint3', -5)
-        time.sleep(2)
+        if self.acciones_en_escena:
+            return self._accion_en_escena('pickAt')
+
+        self.move_joint_by_delta('joint3', DESCENSO_Z_GRADOS)
+        self.esperar_asentamiento('bajada', ['joint3'])
         # Activar la ventosa
         res,retInts,retFloats,retStrings,retBuffer=sim.simxCallScriptFunction(self.clientID,'suctionPad', sim.sim_scripttype_childscript, 'setEffector', [1], [], [], '', sim.simx_opmode_blocking)
 
-        time.sleep(1)
-        self.move_joint_by_delta('joint3', 5)
-        time.sleep(2)
+        self.esperar(self.margenes_asentamiento['ventosa'])
+        self.move_joint_by_delta('joint3', -DESCENSO_Z_GRADOS)
+        return self.esperar_asentamiento('subida', ['joint3'])
 
     def soltar_ficha(self):
-        self.move_joint_by_delta('joint3', -5)
-        time.sleep(2)
+        if self.acciones_en_escena:
+            return self._accion_en_escena('placeAt')
+
+        self.move_joint_by_delta('joint3', DESCENSO_Z_GRADOS)
+        self.esperar_asentamiento('bajada', ['joint3'])
         # Activar la ventosa
         res,retInts,retFloats,retStrings,retBuffer=sim.simxCallScriptFunction(self.clientID,'suctionPad', sim.sim_scripttype_childscript, 'setEffector', [0], [], [], '', sim.simx_opmode_blocking)
 
-        time.sleep(1)
-        self.move_joint_by_delta('joint3', 5)
-        time.sleep(2)
+        self.esperar(self.margenes_asentamiento['ventosa'])
+        self.move_joint_by_delta('joint3', -DESCENSO_Z_GRADOS)
+        return self.esperar_asentamiento('subida', ['joint3'])
 
     def move_posicion_inicial(self):
         """
@@ -279,10 +591,11 @@ class DominoRobotController:
         angulo_joint2 = -self.joint_angles['joint2']* 180 / np.pi
 
         print(f"Moviendo a posición inicial: Joint1: {angulo_joint1}°, Joint2: {angulo_joint2}°")
-        self.move_joint_by_delta('joint1', angulo_joint1)
-        self.move_joint_by_delta('joint2', angulo_joint2)
-        self.move_joint_by_delta('joint4', -(angulo_joint1+angulo_joint2))
-        time.sleep(2)
+        with self.lote_ordenes():
+            self.move_joint_by_delta('joint1', angulo_joint1)
+            self.move_joint_by_delta('joint2', angulo_joint2)
+            self.move_joint_by_delta('joint4', -(angulo_joint1+angulo_joint2))
+        self.esperar_asentamiento('desplazamiento', ['joint1', 'joint2', 'joint4'])
 
     def move_posicion_recta(self):
         """
@@ -292,10 +605,11 @@ class DominoRobotController:
         angulo_joint1 = -self.joint_angles['joint1']* 180 / np.pi
         angulo_joint2 = -self.joint_angles['joint2']* 180 / np.pi
 
-        self.move_joint_by_delta('joint1', angulo_joint1)
-        self.move_joint_by_delta('joint2', angulo_joint2)
-        self.move_joint_by_delta('joint4', -(angulo_joint1+angulo_joint2))  # Bajar un poco para evitar colisiones
-        time.sleep(2)
+        with self.lote_ordenes():
+            self.move_joint_by_delta('joint1', angulo_joint1)
+            self.move_joint_by_delta('joint2', angulo_joint2)
+            self.move_joint_by_delta('joint4', -(angulo_joint1+angulo_joint2))  # Bajar un poco para evitar colisiones
+        self.esperar_asentamiento('desplazamiento', ['joint1', 'joint2', 'joint4'])
 
 def pixel_to_world_linear(u, v,
                            img_resolution=(640, 480),
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import random
+from contextlib import contextmanager
+import numpy as np
+
+# Geometría del brazo (la misma que DominoRobotController)
+LA = 0.26
+LB = 0.1425
+ALCANCE_MAX = LA + LB
+
+# Zona de la mesa que ve la cámara (los mismos límites por defecto que pixel_to_world_linear)
+RESOLUCION_CAMARA = (640, 480)
+LIMITES_X = (0.475, 0.025)  # eje real X, controlado por v
+LIMITES_Y = (0.30, -0.30)   # eje real Y, controlado por u
+
+# Dimensiones de una ficha en la escena (m)
+LARGO_FICHA = 0.07
+ANCHO_FICHA = 0.035
+RADIO_PUNTO = 0.0035
+RADIO_AGARRE = 0.02  # Distancia máxima (m) entre la ventosa y el centro de una ficha para cogerla
+
+# Colores de la imagen (RGB)
+COLOR_MESA = (30, 90, 40)
+COLOR_FICHA = (245, 245, 245)
+COLOR_PUNTO = (20, 20, 20)
+
+# Posición de los puntos de cada valor en una mitad de ficha (en unidades de separación entre puntos)
+PUNTOS_POR_VALOR = {
+    0: [],
+    1: [(0, 0)],
+    2: [(-1, -1), (1, 1)],
+    3: [(-1, -1), (0, 0), (1, 1)],
+    4: [(-1, -1), (-1, 1), (1, -1), (1, 1)],
+    5: [(-1, -1), (-1, 1), (0, 0), (1, -1), (1, 1)],
+    6: [(-1, -1), (-1, 0), (-1, 1), (1, -1), (1, 0), (1, 1)],
+}
+
+# Velocidades máximas de las articulaciones (rad/s; m/s para joint3)
+VELOCIDADES_ARTICULACIONES = {'joint1': 1.0, 'joint2': 1.0, 'joint3': 0.05, 'joint4': 2.0}
+
+# Mismos márgenes por defecto que DominoRobotController
+MARGENES_ASENTAMIENTO_POR_DEFECTO = {
+    'desplazamiento': 0.1,
+    'bajada': 0.1,
+    'ventosa': 0.3,
+    'subida': 0.0
+}
+DESCENSO_Z_GRADOS = -5
+
+
+class FichaMesa:
+    """Ficha de dominó sobre la mesa simulada (o en la ventosa)."""
+
+    def __init__(self, valores, x, y, angulo=0.0):
+        """
+        Args:
+            valores (tuple): Puntos de cada mitad (a, b). `a` es la mitad del lado +X de la ficha con ángulo 0.
+            x, y (float): Posición del centro en la mesa (m).
+            angulo (float): Orientación (grados). Con ángulo 0 el lado largo va a lo largo del eje X.
+        """
+        self.valores = tuple(valores)
+        self.x = x
+        self.y = y
+        self.angulo = angulo
+        self.en_ventosa = False
+
+    def __repr__(self):
+        estado = "en ventosa" if self.en_ventosa else f"({self.x:.3f}, {self.y:.3f}) {self.angulo:.1f}°"
+        return f"FichaMesa({self.valores[0]}|{self.valores[1]}, {estado})"
+
+
+class DominoRobotLocal:
+    """
+    Simulador en proceso, sin CoppeliaSim, con la misma interfaz que DominoRobotController
+    (move_domino, move_posicion_inicial, move_posicion_recta, coger_ficha, soltar_ficha,
+    obtener_foto, disconnect).
+
+    Mantiene un modelo cinemático del brazo (las articulaciones se mueven a velocidad constante
+    hacia su objetivo) y un modelo 2-D de las fichas de la mesa, y dibuja la imagen de la cámara
+    a partir del estado de la mesa. El tiempo es simulado: las esperas avanzan el reloj sin
+    dormir, así que una partida entera se ejecuta mucho más rápido que en tiempo real.
+    """
+
+    def __init__(self, fichas=None, semilla=None, margenes_asentamiento=None, tolerancia_articulacion=0.002,
+                 timeout_movimiento=5.0):
+        """
+        Args:
+            fichas (list): (Opcional) Fichas iniciales (FichaMesa). Por defecto se reparte una partida
+                           con `repartir_partida(semilla)`.
+            semilla (int): Semilla del reparto por defecto.
+            margenes_asentamiento (dict): (Opcional) Márgenes por fase que sustituyen a los por defecto.
+            tolerancia_articulacion (float): Error (rad o m) a partir del cual una articulación se considera en su objetivo.
+            timeout_movimiento (float): Tiempo máximo (s, simulado) que se espera a que las articulaciones lleguen.
+        """
+        self.clientID = 0  # Siempre "conectado" (main.py comprueba clientID == -1)
+        self.dventosa = 0.011
+        self.margenes_asentamiento = dict(MARGENES_ASENTAMIENTO_POR_DEFECTO)
+        self.margenes_asentamiento.update(margenes_asentamiento or {})
+        self.tolerancia_articulacion = tolerancia_articulacion
+        self.timeout_movimiento = timeout_movimiento
+        self.modo_sincrono = True
+
+        self.fichas = list(fichas) if fichas is not None else repartir_partida(semilla)
+        self.ficha_en_ventosa = None
+        self._angulo_relativo_ficha = 0.0  # Ángulo de la ficha cogida respecto a la ventosa
+
+        self._tiempo = 0.0  # Reloj simulado (s)
+        self.tiempo_ultima_orden = 0
+        self.tiempo_ultima_foto = None
+        self.joint_angles = {'joint1': 0.0, 'joint2': 0.0, 'joint3': 0.0, 'joint4': 0.0}  # Objetivos
+        # Movimiento en curso de cada articulación: (posición inicial, instante de inicio)
+        self._movimientos = {joint_name: (0.0, 0.0) for joint_name in self.joint_angles}
+
+    # --- Reloj y cinemática ---
+
+    def tiempo_simulacion(self):
+        """Tiempo simulado (s)."""
+        return self._tiempo
+
+    def esperar(self, segundos):
+        """Avanza el reloj simulado (no duerme)."""
+        if segundos > 0:
+            self._tiempo += segundos
+
+    def _posicion(self, joint_name):
+        """Posición actual de una articulación según su movimiento a velocidad constante."""
+        inicio, t_inicio = self._movimientos[joint_name]
+        objetivo = self.joint_angles[joint_name]
+        recorrido = VELOCIDADES_ARTICULACIONES[joint_name] * (self._tiempo - t_inicio)
+        if recorrido >= abs(objetivo - inicio):
+            return objetivo
+        return inicio + np.sign(objetivo - inicio) * recorrido
+
+    def _tiempo_restante(self, joint_name):
+        return abs(self.joint_angles[joint_name] - self._posicion(joint_name)) / VELOCIDADES_ARTICULACIONES[joint_name]
+
+    def posicion_ventosa(self):
+        """Posición XY (m) y orientación (grados) actuales de la ventosa sobre la mesa."""
+        theta1, theta2, theta4 = (self._posicion(joint_name) for joint_name in ('joint1', 'joint2', 'joint4'))
+        x = LA * np.cos(theta1) + LB * np.cos(theta1 + theta2)
+        y = LA * np.sin(theta1) + LB * np.sin(theta1 + theta2)
+        return x, y, np.rad2deg(theta1 + theta2 + theta4)
+
+    def wait_until_reached(self, tolerance=None, timeout=None, joint_names=None):
+        """Avanza el reloj hasta que las articulaciones llegan a su objetivo (o se agota el timeout)."""
+        joint_names = list(joint_names or self.joint_angles.keys())
+        timeout = self.timeout_movimiento if timeout is None else timeout
+        restante = max(self._tiempo_restante(joint_name) for joint_name in joint_names)
+        if restante > timeout:
+            self.esperar(timeout)
+            print(f"Aviso: {joint_names} no han llegado a su objetivo en {timeout:.1f}s.")
+            return False
+        self.esperar(restante)
+        return True
+
+    def esperar_articulaciones(self, joint_names=None, timeout=None):
+        return self.wait_until_reached(timeout=timeout, joint_names=joint_names)
+
+    def esperar_asentamiento(self, fase, joint_names=None):
+        llegado = self.esperar_articulaciones(joint_names)
+        self.esperar(self.margenes_asentamiento[fase])
+        return llegado
+
+    @contextmanager
+    def lote_ordenes(self):
+        """Las órdenes ya se aplican todas en el mismo instante simulado."""
+        yield
+
+    def move_joint_by_delta(self, joint_name, delta_degrees):
+        if joint_name not in self.joint_angles:
+            print(f"Joint '{joint_name}' no reconocido.")
+            return
+        posicion = self._posicion(joint_name)
+        self._movimientos[joint_name] = (posicion, self._tiempo)
+        self.joint_angles[joint_name] += np.deg2rad(delta_degrees)
+        self.tiempo_ultima_orden = int(self._tiempo * 1000)
+
+    # --- Movimientos (misma cinemática que DominoRobotController) ---
+
+    def move_domino(self, px, py, roll, yaw, rotacion=0):
+        roll = np.deg2rad(roll)
+        yaw = np.deg2rad(yaw)
+        Rx = np.array([[1, 0, 0], [0, np.cos(roll), -np.sin(roll)], [0, np.sin(roll), np.cos(roll)]])
+        Rz = np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
+        offset_global = (Rz @ Rx) @ np.array([0, 0, -self.dventosa])
+        px_corr = px + offset_global[0]
+        py_corr = py + offset_global[1]
+
+        r = np.hypot(px_corr, py_corr)
+        if r > ALCANCE_MAX:
+            print(f"Error: el punto ({px_corr:.3f}, {py_corr:.3f}) está fuera del alcance del robot ({ALCANCE_MAX:.3f} m).")
+            return
+        cos_theta2 = (r**2 - LA**2 - LB**2) / (2 * LA * LB)
+        if abs(cos_theta2) > 1:
+            print("Error: configuración geométrica imposible (cosθ2 fuera de [-1, 1]).")
+            return
+        theta2 = np.arccos(cos_theta2)
+        theta1 = np.arctan2(py_corr, px_corr) - np.arctan2(LB * np.sin(theta2), LA + LB * np.cos(theta2))
+
+        angulo_joint1 = np.rad2deg(theta1)
+        angulo_joint2 = np.rad2deg(theta2)
+        with self.lote_ordenes():
+            self.move_joint_by_delta('joint1', angulo_joint1)
+            self.move_joint_by_delta('joint2', angulo_joint2)
+            self.move_joint_by_delta('joint4', -(angulo_joint1 + angulo_joint2) + rotacion)
+        self.esperar_asentamiento('desplazamiento', ['joint1', 'joint2', 'joint4'])
+
+    def move_posicion_inicial(self):
+        angulo_joint1 = 90 - np.rad2deg(self.joint_angles['joint1'])
+        angulo_joint2 = -np.rad2deg(self.joint_angles['joint2'])
+        with self.lote_ordenes():
+            self.move_joint_by_delta('joint1', angulo_joint1)
+            self.move_joint_by_delta('joint2', angulo_joint2)
+            self.move_joint_by_delta('joint4', -(angulo_joint1 + angulo_joint2))
+        self.esperar_asentamiento('desplazamiento', ['joint1', 'joint2', 'joint4'])
+
+    def move_posicion_recta(self):
+        angulo_joint1 = -np.rad2deg(self.joint_angles['joint1'])
+        angulo_joint2 = -np.rad2deg(self.joint_angles['joint2'])
+        with self.lote_ordenes():
+            self.move_joint_by_delta('joint1', angulo_joint1)
+            self.move_joint_by_delta('joint2', angulo_joint2)
+            self.move_joint_by_delta('joint4', -(angulo_joint1 + angulo_joint2))
+        self.esperar_asentamiento('desplazamiento', ['joint1', 'joint2', 'joint4'])
+
+    # --- Ventosa ---
+
+    def coger_ficha(self):
+        return self._accion_ventosa(activar=True)
+
+    def soltar_ficha(self):
+        return self._accion_ventosa(activar=False)
+
+    def _accion_ventosa(self, activar):
+        self.move_joint_by_delta('joint3', DESCENSO_Z_GRADOS)
+        self.esperar_asentamiento('bajada', ['joint3'])
+        x, y, angulo = self.posicion_ventosa()
+        if activar:
+            exito = self._coger(x, y, angulo)
+        else:
+            exito = self._soltar(x, y, angulo)
+        self.esperar(self.margenes_asentamiento['ventosa'])
+        self.move_joint_by_delta('joint3', -DESCENSO_Z_GRADOS)
+        return self.esperar_asentamiento('subida', ['joint3']) and exito
+
+    def _coger(self, x, y, angulo):
+        if self.ficha_en_ventosa is not None:
+            return True
+        libres = [ficha for ficha in self.fichas if not ficha.en_ventosa]
+        if not libres:
+            print("Aviso: No hay fichas en la mesa.")
+            return False
+        ficha = min(libres, key=lambda f: np.hypot(f.x - x, f.y - y))
+        distancia = np.hypot(ficha.x - x, ficha.y - y)
+        if distancia > RADIO_AGARRE:
+            print(f"Aviso: Ninguna ficha bajo la ventosa en ({x:.3f}, {y:.3f}); la más cercana está a {distancia * 1000:.1f} mm.")
+            return False
+        ficha.en_ventosa = True
+        self.ficha_en_ventosa = ficha
+        self._angulo_relativo_ficha = ficha.angulo - angulo
+        return True
+
+    def _soltar(self, x, y, angulo):
+        ficha = self.ficha_en_ventosa
+        if ficha is None:
+            return True
+        ficha.x, ficha.y = x, y
+        ficha.angulo = (angulo + self._angulo_relativo_ficha) % 360
+        ficha.en_ventosa = False
+        self.ficha_en_ventosa = None
+        return True
+
+    # --- Cámara ---
+
+    def obtener_foto(self, posterior_a=None, timeout=None):
+        """
+        Dibuja la imagen de la cámara cenital con el estado actual de la mesa (la ficha que lleva la
+        ventosa se ve en su posición). El brazo no se dibuja.
+
+        Returns:
+            np.ndarray: Imagen RGB (alto, ancho, 3) uint8.
+        """
+        ancho, alto = RESOLUCION_CAMARA
+        imagen = np.empty((alto, ancho, 3), dtype=np.uint8)
+        imagen[:] = COLOR_MESA
+        x_ventosa, y_ventosa, angulo_ventosa = self.posicion_ventosa()
+        for ficha in self.fichas:
+            if ficha.en_ventosa:
+                dibujar_ficha(imagen, ficha.valores, x_ventosa, y_ventosa, angulo_ventosa + self._angulo_relativo_ficha)
+            else:
+                dibujar_ficha(imagen, ficha.valores, ficha.x, ficha.y, ficha.angulo)
+        self.tiempo_ultima_foto = int(self._tiempo * 1000)
+        return imagen
+
+    def disconnect(self):
+        self.clientID = -1
+        print("Simulador local cerrado.")
+
+
+def mundo_a_pixel(x, y):
+    """Inversa de pixel_to_world_linear con los límites por defecto: (x, y) en m -> (u, v) en píxeles."""
+    ancho, alto = RESOLUCION_CAMARA
+    u = (y - LIMITES_Y[0]) / (LIMITES_Y[1] - LIMITES_Y[0]) * ancho
+    v = (x - LIMITES_X[0]) / (LIMITES_X[1] - LIMITES_X[0]) * alto
+    return u, v
+
+
+def dibujar_ficha(imagen, valores, x, y, angulo):
+    """Dibuja una ficha (rectángulo blanco con los puntos de cada mitad) en la imagen de la cámara."""
+    alto, ancho = imagen.shape[:2]
+    pixeles_por_metro = ancho / abs(LIMITES_Y[1] - LIMITES_Y[0])
+    u_centro, v_centro = mundo_a_pixel(x, y)
+    radio = int(np.ceil(np.hypot(LARGO_FICHA, ANCHO_FICHA) / 2 * pixeles_por_metro)) + 1
+    u0, u1 = max(int(u_centro) - radio, 0), min(int(u_centro) + radio + 1, ancho)
+    v0, v1 = max(int(v_centro) - radio, 0), min(int(v_centro) + radio + 1, alto)
+    if u0 >= u1 or v0 >= v1:
+        return
+
+    # Coordenadas de cada píxel de la zona en el sistema de la ficha (a: lado largo, b: lado corto), en m
+    vs, us = np.mgrid[v0:v1, u0:u1]
+    dx = -(vs + 0.5 - v_centro) / pixeles_por_metro  # X crece hacia arriba de la imagen
+    dy = -(us + 0.5 - u_centro) / pixeles_por_metro  # Y crece hacia la izquierda de la imagen
+    coseno, seno = np.cos(np.deg2rad(angulo)), np.sin(np.deg2rad(angulo))
+    a = dx * coseno + dy * seno
+    b = -dx * seno + dy * coseno
+
+    zona = imagen[v0:v1, u0:u1]
+    zona[(np.abs(a) <= LARGO_FICHA / 2) & (np.abs(b) <= ANCHO_FICHA / 2)] = COLOR_FICHA
+    separacion = ANCHO_FICHA * 0.28
+    for signo, valor in ((1, valores[0]), (-1, valores[1])):
+        centro_mitad = signo * LARGO_FICHA / 4
+        for ia, ib in PUNTOS_POR_VALOR[valor]:
+            punto = (a - centro_mitad - ia * separacion) ** 2 + (b - ib * separacion) ** 2 <= RADIO_PUNTO ** 2
+            zona[punto] = COLOR_PUNTO
+
+
+def repartir_partida(semilla=None, fichas_jugador=7):
+    """
+    Reparte una partida: una ficha en el centro de la zona del tablero y `fichas_jugador` fichas
+    en fila en la zona del jugador (tercio inferior de la imagen).
+
+    Returns:
+        list: Fichas (FichaMesa) de la mesa.
+    """
+    generador = random.Random(semilla)
+    juego = [(a, b) for a in range(7) for b in range(a, 7)]
+    generador.shuffle(juego)
+    fichas = [FichaMesa(juego.pop(), 0.30, 0.0)]
+    separacion = 0.06
+    for i in range(fichas_jugador):
+        y = (i - (fichas_jugador - 1) / 2) * separacion
+        fichas.append(FichaMesa(juego.pop(), 0.12, y))
+    return fichas
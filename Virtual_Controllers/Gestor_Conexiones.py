@@ -0,0 +1,140 @@
+import threading
+import Virtual_Controllers.sim as sim
+
+
+class GestorConexiones:
+    """
+    Conjunto de conexiones de la API remota de CoppeliaSim, una por (host, puerto).
+
+    Permite controlar varias escenas (mesas) desde un mismo proceso: cada DominoRobotController
+    pide su conexión al gestor en lugar de llamar a `simxFinish(-1)`, que cerraría las de todos.
+    El gestor:
+        * reutiliza la conexión de un (host, puerto) entre los controladores que la comparten
+          (se cierra cuando la libera el último),
+        * guarda en caché los handles de objetos de cada conexión,
+        * vuelve a conectar si la conexión se ha perdido (los handles en caché se descartan),
+        * al cerrar, solo termina sus propias conexiones.
+    """
+
+    def __init__(self, timeout_ms=2000, ciclo_comunicacion_ms=5):
+        """
+        Args:
+            timeout_ms (int): Tiempo máximo (ms) de espera al conectar.
+            ciclo_comunicacion_ms (int): Periodo (ms) del hilo de comunicación de la API remota.
+        """
+        self.timeout_ms = timeout_ms
+        self.ciclo_comunicacion_ms = ciclo_comunicacion_ms
+        self._conexiones = {}  # (host, puerto) -> clientID
+        self._usuarios = {}    # (host, puerto) -> número de controladores que usan la conexión
+        self._handles = {}     # clientID -> {nombre del objeto: handle}
+        self._lock = threading.RLock()
+
+    def obtener_conexion(self, host, puerto):
+        """
+        Devuelve el clientID de la conexión con (host, puerto), conectando si hace falta, y la
+        marca como usada por un controlador más (hay que liberarla con `liberar_conexion`).
+
+        Returns:
+            int: clientID, o -1 si no se ha podido conectar.
+        """
+        with self._lock:
+            clave = (host, puerto)
+            client_id = self._conexiones.get(clave, -1)
+            if not self.conexion_activa(client_id):
+                client_id = self._renovar(host, puerto, client_id)
+            if client_id != -1:
+                self._usuarios[clave] = self._usuarios.get(clave, 0) + 1
+            return client_id
+
+    def reconectar(self, host, puerto, client_id_perdido):
+        """
+        Sustituye la conexión perdida con (host, puerto) por una nueva, sin cambiar quién la usa.
+
+        Si otro controlador que comparte la conexión ya la ha renovado (el clientID del gestor ya
+        no es `client_id_perdido` y está viva), devuelve la conexión renovada sin cerrarla.
+
+        Args:
+            client_id_perdido (int): clientID que el controlador ha encontrado caído.
+
+        Returns:
+            int: clientID vivo, o -1 si no se ha podido conectar.
+        """
+        with self._lock:
+            client_id = self._conexiones.get((host, puerto), -1)
+            if client_id != client_id_perdido and self.conexion_activa(client_id):
+                return client_id
+            return self._renovar(host, puerto, client_id)
+
+    def liberar_conexion(self, host, puerto):
+        """Un controlador deja de usar la conexión; se cierra cuando no la usa ninguno."""
+        with self._lock:
+            clave = (host, puerto)
+            if clave not in self._usuarios:
+                return
+            self._usuarios[clave] -= 1
+            if self._usuarios[clave] <= 0:
+                del self._usuarios[clave]
+                self._cerrar(host, puerto)
+
+    def cerrar_todas(self):
+        """Cierra todas las conexiones del gestor (y solo esas)."""
+        with self._lock:
+            for host, puerto in list(self._conexiones):
+                self._cerrar(host, puerto)
+            self._usuarios.clear()
+
+    def usuarios(self, host, puerto):
+        """Número de controladores que usan la conexión con (host, puerto)."""
+        with self._lock:
+            return self._usuarios.get((host, puerto), 0)
+
+    @staticmethod
+    def conexion_activa(client_id):
+        """True si la conexión sigue viva (consulta local, sin ida y vuelta al servidor)."""
+        return client_id != -1 and sim.simxGetConnectionId(client_id) != -1
+
+    def obtener_handle(self, client_id, nombre):
+        """
+        Devuelve el handle de un objeto de la escena, guardado en caché para cada conexión.
+
+        Returns:
+            int: Handle del objeto, o None si no existe o no se ha podido leer.
+        """
+        with self._lock:
+            handles = self._handles.setdefault(client_id, {})
+            if nombre in handles:
+                return handles[nombre]
+        ret_code, handle = sim.simxGetObjectHandle(client_id, nombre, sim.simx_opmode_blocking)
+        if ret_code != sim.simx_return_ok:
+            print(f"No se pudo obtener el handle de '{nombre}' (código {ret_code}).")
+            return None
+        with self._lock:
+            self._handles.setdefault(client_id, {})[nombre] = handle
+        return handle
+
+    def _renovar(self, host, puerto, client_id_perdido):
+        # Termina la conexión caída (simxFinish y caché de handles) antes de abrir la nueva
+        if client_id_perdido != -1:
+            self._cerrar(host, puerto)
+        return self._conectar(host, puerto)
+
+    def _conectar(self, host, puerto):
+        client_id = sim.simxStart(host, puerto, True, True, self.timeout_ms, self.ciclo_comunicacion_ms)
+        if client_id != -1:
+            print(f"Conectado a CoppeliaSim en {host}:{puerto} (clientID {client_id})")
+            self._conexiones[(host, puerto)] = client_id
+        else:
+            print(f"No se pudo conectar a CoppeliaSim en {host}:{puerto}")
+        return client_id
+
+    def _cerrar(self, host, puerto):
+        client_id = self._conexiones.pop((host, puerto), -1)
+        if client_id == -1:
+            return
+        sim.simxFinish(client_id)
+        self._handles.pop(client_id, None)
+        print(f"Desconectado de CoppeliaSim en {host}:{puerto}.")
+
+
+# Gestor compartido por defecto por todos los DominoRobotController del proceso
+gestor_conexiones = GestorConexiones()
@@ -0,0 +1,275 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import Virtual_Controllers.sim as sim
+
+# Nombre de cada modo de operación (los 16 bits bajos son el periodo o el tamaño de trozo del modo)
+NOMBRES_MODOS = {
+    sim.simx_opmode_oneshot: 'oneshot',
+    sim.simx_opmode_blocking: 'blocking',
+    sim.simx_opmode_streaming: 'streaming',
+    sim.simx_opmode_oneshot_split: 'oneshot_split',
+    sim.simx_opmode_streaming_split: 'streaming_split',
+    sim.simx_opmode_discontinue: 'discontinue',
+    sim.simx_opmode_buffer: 'buffer',
+    sim.simx_opmode_remove: 'remove',
+}
+SIN_MODO = '-'  # Funciones locales sin modo de operación (simxStart, simxGetLastCmdTime, ...)
+
+# Utilidades de sim.py que no hablan con el servidor: no se miden
+FUNCIONES_NO_MEDIDAS = {'simxPackInts', 'simxUnpackInts', 'simxPackFloats', 'simxUnpackFloats', 'simxCreateBuffer', 'simxReleaseBuffer'}
+
+# Bytes por elemento de las listas que intercambia la API (c_float / c_int salvo las imágenes, c_byte)
+BYTES_POR_ELEMENTO = 4
+BYTES_POR_ELEMENTO_FUNCION = {'simxGetVisionSensorImage': 1, 'simxSetVisionSensorImage': 1}
+
+# Límites superiores (µs) de los intervalos del histograma de latencias: 1, 2, 4, ... ~16.8 s
+LIMITES_HISTOGRAMA_US = [2 ** i for i in range(25)]
+
+
+def _tamaño(valor, bytes_por_elemento):
+    """Bytes de un dato intercambiado con el servidor (0 para escalares y handles)."""
+    if hasattr(valor, 'nbytes'):  # numpy
+        return int(valor.nbytes)
+    if isinstance(valor, (bytes, bytearray, str)):
+        return len(valor)
+    if isinstance(valor, (list, tuple)):
+        if not valor:
+            return 0
+        if isinstance(valor[0], (int, float)) or valor[0] is None:
+            return len(valor) * bytes_por_elemento
+        return sum(_tamaño(elemento, bytes_por_elemento) for elemento in valor)
+    return 0
+
+
+def _indice_intervalo(latencia_us):
+    for indice, limite in enumerate(LIMITES_HISTOGRAMA_US):
+        if latencia_us <= limite:
+            return indice
+    return len(LIMITES_HISTOGRAMA_US)
+
+
+class EstadisticaLlamada:
+    """Llamadas, bytes y latencias acumuladas de una función simx* con un modo de operación."""
+
+    def __init__(self):
+        self.llamadas = 0
+        self.bytes_enviados = 0
+        self.bytes_recibidos = 0
+        self.segundos_total = 0.0
+        self.segundos_min = float('inf')
+        self.segundos_max = 0.0
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA_US) + 1)
+        self.codigos_retorno = {}
+
+    def registrar(self, segundos, bytes_enviados, bytes_recibidos, codigo_retorno):
+        self.llamadas += 1
+        self.bytes_enviados += bytes_enviados
+        self.bytes_recibidos += bytes_recibidos
+        self.segundos_total += segundos
+        self.segundos_min = min(self.segundos_min, segundos)
+        self.segundos_max = max(self.segundos_max, segundos)
+        self.histograma[_indice_intervalo(segundos * 1e6)] += 1
+        if codigo_retorno is not None:
+            self.codigos_retorno[codigo_retorno] = self.codigos_retorno.get(codigo_retorno, 0) + 1
+
+    def percentil(self, p):
+        """Latencia (s) del percentil `p` (0-100), aproximada por el límite superior de su intervalo."""
+        objetivo = self.llamadas * p / 100.0
+        acumuladas = 0
+        for indice, cuenta in enumerate(self.histograma):
+            acumuladas += cuenta
+            if cuenta and acumuladas >= objetivo:
+                if indice == len(LIMITES_HISTOGRAMA_US):
+                    return self.segundos_max
+                return min(LIMITES_HISTOGRAMA_US[indice] / 1e6, self.segundos_max)
+        return 0.0
+
+    def como_dict(self):
+        histograma = {}
+        for indice, cuenta in enumerate(self.histograma):
+            if cuenta:
+                limite = f"<={LIMITES_HISTOGRAMA_US[indice]}us" if indice < len(LIMITES_HISTOGRAMA_US) else "mayor"
+                histograma[limite] = cuenta
+        return {
+            'llamadas': self.llamadas,
+            'bytes_enviados': self.bytes_enviados,
+            'bytes_recibidos': self.bytes_recibidos,
+            'segundos_total': self.segundos_total,
+            'segundos_medio': self.segundos_total / self.llamadas if self.llamadas else 0.0,
+            'segundos_min': self.segundos_min if self.llamadas else 0.0,
+            'segundos_max': self.segundos_max,
+            'segundos_p50': self.percentil(50),
+            'segundos_p99': self.percentil(99),
+            'histograma': histograma,
+            'codigos_retorno': {str(codigo): cuenta for codigo, cuenta in self.codigos_retorno.items()},
+        }
+
+
+class InstrumentacionSim:
+    """
+    Medición opcional de las llamadas a la API remota (Virtual_Controllers.sim).
+
+    Al activarla sustituye cada función simx* del módulo sim por una envoltura que mide su
+    latencia y los bytes enviados y recibidos (imágenes, buffers, cadenas y listas), agrupados
+    por función y modo de operación. Los controladores llaman a `sim.simx...` en cada uso, así
+    que ven la envoltura sin cambios. Al desactivarla se restauran las funciones originales:
+    desactivada no añade ningún coste.
+
+    Uso:
+        with InstrumentacionSim(trazar=True) as instrumentacion:
+            ... jugar turnos ...
+        instrumentacion.mostrar_resumen()
+        instrumentacion.guardar_traza_chrome("traza_sim.json")  # chrome://tracing o Perfetto
+    """
+
+    def __init__(self, trazar=False, max_eventos=200000):
+        """
+        Args:
+            trazar (bool): Si es True guarda también cada llamada como evento para la traza de Chrome.
+            max_eventos (int): Máximo de eventos de traza guardados (los siguientes se descartan).
+        """
+        self.trazar = trazar
+        self.max_eventos = max_eventos
+        self.estadisticas = {}  # (función, modo) -> EstadisticaLlamada
+        self.eventos = []
+        self.eventos_descartados = 0
+        self._originales = {}
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+
+    @property
+    def activa(self):
+        return bool(self._originales)
+
+    def activar(self):
+        """Sustituye las funciones simx* del módulo sim por sus envolturas medidas."""
+        if self.activa:
+            return self
+        for nombre, funcion in list(vars(sim).items()):
+            if nombre.startswith('simx') and nombre not in FUNCIONES_NO_MEDIDAS and inspect.isfunction(funcion):
+                self._originales[nombre] = funcion
+                setattr(sim, nombre, self._envolver(nombre, funcion))
+        return self
+
+    def desactivar(self):
+        """Restaura las funciones originales del módulo sim (los datos medidos se conservan)."""
+        for nombre, funcion in self._originales.items():
+            setattr(sim, nombre, funcion)
+        self._originales = {}
+
+    def __enter__(self):
+        return self.activar()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.desactivar()
+
+    def reiniciar(self):
+        """Borra las estadísticas y los eventos medidos."""
+        with self._lock:
+            self.estadisticas = {}
+            self.eventos = []
+            self.eventos_descartados = 0
+            self._inicio = time.perf_counter()
+
+    def _envolver(self, nombre, funcion):
+        parametros = list(inspect.signature(funcion).parameters)
+        indice_modo = parametros.index('operationMode') if 'operationMode' in parametros else None
+        bytes_por_elemento = BYTES_POR_ELEMENTO_FUNCION.get(nombre, BYTES_POR_ELEMENTO)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            segundos = time.perf_counter() - inicio
+
+            modo = SIN_MODO
+            if indice_modo is not None:
+                valor_modo = args[indice_modo] if len(args) > indice_modo else kwargs.get('operationMode')
+                if valor_modo is not None:
+                    valor_modo &= 0xFF0000
+                    modo = NOMBRES_MODOS.get(valor_modo, hex(valor_modo))
+            # El primer argumento es el clientID (o la dirección en simxStart): no son datos
+            bytes_enviados = sum(_tamaño(arg, bytes_por_elemento) for arg in args[1:]) + \
+                sum(_tamaño(arg, bytes_por_elemento) for arg in kwargs.values())
+            if isinstance(resultado, tuple):
+                codigo_retorno = resultado[0]
+                bytes_recibidos = sum(_tamaño(valor, bytes_por_elemento) for valor in resultado[1:])
+            else:
+                codigo_retorno = resultado if indice_modo is not None else None
+                bytes_recibidos = 0
+            self._registrar(nombre, modo, inicio, segundos, bytes_enviados, bytes_recibidos, codigo_retorno)
+            return resultado
+
+        return envoltura
+
+    def _registrar(self, nombre, modo, inicio, segundos, bytes_enviados, bytes_recibidos, codigo_retorno):
+        with self._lock:
+            clave = (nombre, modo)
+            if clave not in self.estadisticas:
+                self.estadisticas[clave] = EstadisticaLlamada()
+            self.estadisticas[clave].registrar(segundos, bytes_enviados, bytes_recibidos, codigo_retorno)
+            if self.trazar:
+                if len(self.eventos) < self.max_eventos:
+                    self.eventos.append((nombre, modo, inicio, segundos, threading.get_ident(), bytes_enviados, bytes_recibidos, codigo_retorno))
+                else:
+                    self.eventos_descartados += 1
+
+    def resumen(self):
+        """
+        Returns:
+            dict: {"función|modo": estadísticas (ver EstadisticaLlamada.como_dict)}, ordenado por tiempo total.
+        """
+        with self._lock:
+            elementos = sorted(self.estadisticas.items(), key=lambda elemento: elemento[1].segundos_total, reverse=True)
+            return {f"{nombre}|{modo}": estadistica.como_dict() for (nombre, modo), estadistica in elementos}
+
+    def mostrar_resumen(self, maximo=20):
+        """Muestra las `maximo` combinaciones función/modo con más tiempo total."""
+        resumen = self.resumen()
+        segundos_total = sum(datos['segundos_total'] for datos in resumen.values())
+        print(f"Llamadas a la API remota: {sum(datos['llamadas'] for datos in resumen.values())}, {segundos_total:.3f} s en total")
+        for clave, datos in list(resumen.items())[:maximo]:
+            print(f"  {clave:55s} {datos['llamadas']:7d} llamadas {datos['segundos_total']:8.3f} s "
+                  f"(p50 {datos['segundos_p50'] * 1e3:.3f} ms, p99 {datos['segundos_p99'] * 1e3:.3f} ms) "
+                  f"{datos['bytes_enviados']} B enviados, {datos['bytes_recibidos']} B recibidos")
+
+    def guardar_json(self, ruta):
+        """Guarda el resumen (ver `resumen`) en un fichero JSON."""
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(ruta, 'w') as f:
+            json.dump(self.resumen(), f, indent=2)
+        print(f"Resumen de la API remota guardado en '{ruta}'")
+
+    def guardar_traza_chrome(self, ruta):
+        """
+        Guarda las llamadas medidas (necesita `trazar=True`) en formato Chrome Trace Event, para
+        abrirlas en chrome://tracing o en Perfetto. Cada hilo es una fila; la categoría es el modo.
+        """
+        if not self.trazar:
+            print("La traza de Chrome necesita InstrumentacionSim(trazar=True).")
+            return False
+        with self._lock:
+            eventos = [{
+                'name': nombre,
+                'cat': modo,
+                'ph': 'X',
+                'ts': (inicio - self._inicio) * 1e6,
+                'dur': segundos * 1e6,
+                'pid': os.getpid(),
+                'tid': hilo,
+                'args': {'bytes_enviados': enviados, 'bytes_recibidos': recibidos, 'codigo_retorno': codigo},
+            } for nombre, modo, inicio, segundos, hilo, enviados, recibidos, codigo in self.eventos]
+            descartados = self.eventos_descartados
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(ruta, 'w') as f:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms', 'otherData': {'eventos_descartados': descartados}}, f)
+        print(f"Traza de la API remota guardada en '{ruta}' ({len(eventos)} eventos)")
+        return True
@@ -4,41 +4,85 @@ import time
 from gtts import gTTS
 import os
 import time
+import hashlib
+import tempfile
+import threading
 import pygame
 
-def hablar(texto, idioma='es', nombre_archivo="temp_audio.mp3", velocidad_normal=True):
+# Caché compartida de audios de gTTS: las mismas frases se repiten en cada turno y en cada mesa,
+# así que cada (texto, idioma, velocidad) se genera una sola vez y se reutiliza el MP3.
+DIRECTORIO_CACHE_AUDIO = os.path.join(tempfile.gettempdir(), "domibot_tts")
+_lock_cache_audio = threading.Lock()
+_lock_reproduccion = threading.Lock()
+
+
+def obtener_audio(texto, idioma='es', velocidad_normal=True):
+    """
+    Devuelve la ruta del MP3 de la frase, generándolo con gTTS solo si no está en la caché.
+
+    Args:
+        texto (str): El texto que se va a convertir a voz.
+        idioma (str): El código del idioma.
+        velocidad_normal (bool): Si es False, la voz es más lenta.
+
+    Returns:
+        str: Ruta del archivo MP3 en la caché.
+    """
+    clave = hashlib.sha1(f"{idioma}|{velocidad_normal}|{texto}".encode("utf-8")).hexdigest()
+    ruta = os.path.join(DIRECTORIO_CACHE_AUDIO, f"{clave}.mp3")
+    with _lock_cache_audio:
+        if not os.path.exists(ruta):
+            os.makedirs(DIRECTORIO_CACHE_AUDIO, exist_ok=True)
+            # Se guarda con otro nombre y se renombra para que nadie lea un MP3 a medio escribir
+            ruta_temporal = ruta + ".tmp"
+            gTTS(text=texto, lang=idioma, slow=not velocidad_normal).save(ruta_temporal)
+            os.replace(ruta_temporal, ruta)
+            print(f"Audio generado y guardado en caché como '{ruta}'")
+    return ruta
+
+
+def hablar(texto, idioma='es', nombre_archivo=None, velocidad_normal=True):
     """
     Convierte texto a voz usando gTTS y lo reproduce al instante con pygame.
 
     Args:
         texto (str): El texto que se va a convertir a voz.
         idioma (str): El código del idioma (ej. 'es' para español, 'es-es' para español de España).
-        nombre_archivo (str): Nombre temporal del archivo MP3 a guardar y reproducir.
+        nombre_archivo (str): Archivo MP3 temporal a generar y borrar después. Por defecto (None)
+            se usa la caché compartida de audios, que no se borra.
         velocidad_normal (bool): Si es True, la velocidad es normal. Si es False, es más lenta.
     """
     try:
-        # Crea el objeto gTTS
-        tts = gTTS(text=texto, lang=idioma, slow=not velocidad_normal)
-
-        # Guarda el archivo de audio temporal
-        tts.save(nombre_archivo)
-        print(f"Audio generado y guardado como '{nombre_archivo}'")
-
-        # Inicializa el mezclador de pygame
-        # Frecuencia de muestreo (Hz), Tamaño del buffer de audio, Canales (1=mono, 2=estéreo), Tamaño del buffer
-        # A menudo 44100 Hz es bueno para MP3.
-        pygame.mixer.init(44100, -16, 2, 2048) # Puedes ajustar estos valores si tienes problemas de audio
-        
-        # Carga el archivo de audio
-        pygame.mixer.music.load(nombre_archivo)
-        
-        # Reproduce el audio
-        pygame.mixer.music.play()
-        print("Reproduciendo audio con Pygame...")
-
-        # Espera a que la reproducción termine
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1) # Pequeña pausa para no consumir CPU innecesariamente
+        if nombre_archivo is None:
+            ruta_audio = obtener_audio(texto, idioma, velocidad_normal)
+        else:
+            # Crea el objeto gTTS y guarda el archivo de audio temporal
+            gTTS(text=texto, lang=idioma, slow=not velocidad_normal).save(nombre_archivo)
+            print(f"Audio generado y guardado como '{nombre_archivo}'")
+            ruta_audio = nombre_archivo
+
+        # Solo hay un mezclador de pygame por proceso: las sesiones hablan por turnos
+        with _lock_reproduccion:
+            try:
+                # Inicializa el mezclador de pygame
+                # Frecuencia de muestreo (Hz), Tamaño del buffer de audio, Canales (1=mono, 2=estéreo), Tamaño del buffer
+                # A menudo 44100 Hz es bueno para MP3.
+                pygame.mixer.init(44100, -16, 2, 2048) # Puedes ajustar estos valores si tienes problemas de audio
+
+                # Carga el archivo de audio
+                pygame.mixer.music.load(ruta_audio)
+
+                # Reproduce el audio
+                pygame.mixer.music.play()
+                print("Reproduciendo audio con Pygame...")
+
+                # Espera a que la reproducción termine
+                while pygame.mixer.music.get_busy():
+                    time.sleep(0.1) # Pequeña pausa para no consumir CPU innecesariamente
+            finally:
+                # Detiene el mezclador de Pygame y lo quita del sistema
+                if pygame.mixer.get_init():
+                    pygame.mixer.quit()
 
     except ImportError as e:
         print(f"Error de importación: {e}")
@@ -47,11 +91,8 @@ def hablar(texto, idioma='es', nombre_archivo="temp_audio.mp3", velocidad_normal
         print(f"Ocurrió un error: {e}")
         print("Asegúrate de tener conexión a internet para gTTS y las dependencias de audio de Pygame instaladas.")
     finally:
-        # Detiene el mezclador de Pygame y lo quita del sistema
-        if pygame.mixer.get_init():
-            pygame.mixer.quit()
-        # Intenta eliminar el archivo temporal después de la reproducción
-        if os.path.exists(nombre_archivo):
+        # Intenta eliminar el archivo temporal después de la reproducción (los de la caché se conservan)
+        if nombre_archivo is not None and os.path.exists(nombre_archivo):
             os.remove(nombre_archivo)
             print(f"Archivo temporal '{nombre_archivo}' eliminado.")
 
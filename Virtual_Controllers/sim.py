@@ -324,6 +324,58 @@ def simxGetVisionSensorDepthBuffer(clientID, sensorHandle, operationMode):
             reso.append(resolution[i])
     return ret, reso, buffer
 
+def simxGetVisionSensorImageArray(clientID, sensorHandle, options, operationMode, out=None, flip=False):
+    '''
+    NumPy variant of simxGetVisionSensorImage. Instead of copying the C buffer into a Python list
+    byte by byte, it wraps the returned pointer with numpy and copies it once into an owned uint8
+    array of shape (height, width, 3) (or (height, width) for greyscale, options bit 0 set).
+    If `out` has that shape and dtype it is reused as the frame buffer. With `flip` the rows are
+    flipped during the copy (CoppeliaSim images start at the bottom row).
+    Returns (returnCode, resolution, array); array is None if returnCode is not simx_return_ok.
+    '''
+    import numpy as np
+
+    resolution = (ct.c_int*2)()
+    c_image  = ct.POINTER(ct.c_byte)()
+    bytesPerPixel = 1 if (options & 1) != 0 else 3
+    ret = c_GetVisionSensorImage(clientID, sensorHandle, resolution, ct.byref(c_image), options, operationMode)
+    if ret != 0:
+        return ret, [], None
+
+    width, height = resolution[0], resolution[1]
+    shape = (height, width, bytesPerPixel) if bytesPerPixel == 3 else (height, width)
+    frame = np.ctypeslib.as_array(ct.cast(c_image, ct.POINTER(ct.c_ubyte)), shape=(width * height * bytesPerPixel,)).reshape(shape)
+    if flip:
+        frame = frame[::-1]
+    if out is None or out.shape != shape or out.dtype != np.uint8:
+        out = np.empty(shape, dtype=np.uint8)
+    np.copyto(out, frame)
+    return ret, [width, height], out
+
+def simxGetVisionSensorDepthBufferArray(clientID, sensorHandle, operationMode, out=None, flip=False):
+    '''
+    NumPy variant of simxGetVisionSensorDepthBuffer: copies the depth buffer once into an owned
+    float32 array of shape (height, width), reusing `out` if it matches. See simxGetVisionSensorImageArray.
+    Returns (returnCode, resolution, array); array is None if returnCode is not simx_return_ok.
+    '''
+    import numpy as np
+
+    c_buffer  = ct.POINTER(ct.c_float)()
+    resolution = (ct.c_int*2)()
+    ret = c_GetVisionSensorDepthBuffer(clientID, sensorHandle, resolution, ct.byref(c_buffer), operationMode)
+    if ret != 0:
+        return ret, [], None
+
+    width, height = resolution[0], resolution[1]
+    shape = (height, width)
+    depth = np.ctypeslib.as_array(c_buffer, shape=(width * height,)).reshape(shape)
+    if flip:
+        depth = depth[::-1]
+    if out is None or out.shape != shape or out.dtype != np.float32:
+        out = np.empty(shape, dtype=np.float32)
+    np.copyto(out, depth)
+    return ret, [width, height], out
+
 def simxGetObjectChild(clientID, parentObjectHandle, childIndex, operationMode):
     '''
     Please have a look at the function description/documentation in the CoppeliaSim user manual
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prueba de una partida desatendida con el simulador en proceso (DominoRobotLocal).
+
+Juega dos mesas a la vez, cada una en su hilo como en OrquestadorMesas, con JugadorAutomatico.
+La visión se sustituye por un analizador que devuelve las fichas del modelo de la mesa (mismo
+formato que obtener_estado_completo): los extremos de la cadena del tablero, que crece en
+horizontal, y las fichas del jugador. No se usa el grupo de procesos del orquestador porque el
+analizador tiene que leer el modelo de la mesa, que vive en este proceso.
+
+Comprueba que:
+    * coger_ficha y soltar_ficha devuelven True en todos los turnos,
+    * cada mesa juega fichas y las fichas jugadas pasan de la zona del jugador al tablero,
+    * el reloj simulado avanza (segundos_simulados > 0).
+
+Ejecución (desde la raíz del proyecto):
+    python Virtual_ControllersTest/test.domibotLocal-virtual.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from Juego_Domino import OFFSET_JUGADOR_SIMULACION, JugadorAutomatico
+from Orquestador_Mesas import OrquestadorMesas, SesionMesa
+from Virtual_Controllers.Domibot_Local import ANCHO_FICHA, LARGO_FICHA, DominoRobotLocal, mundo_a_pixel, repartir_partida
+
+SEMILLAS = (0, 1)
+TURNOS = 3
+
+
+def repartir_mesa(semilla):
+    """Reparto por defecto, con la ficha inicial en horizontal en la imagen para que la cadena crezca a lo ancho."""
+    fichas = repartir_partida(semilla)
+    fichas[0].angulo = 90.0
+    return fichas
+
+
+def caja_y_mitades(ficha):
+    """
+    Returns:
+        tuple: Bounding box de la ficha en la imagen ({'x1', 'y1', 'x2', 'y2'}) y el centro (u, v)
+               de cada mitad, en el orden de `ficha.valores`.
+    """
+    coseno, seno = np.cos(np.deg2rad(ficha.angulo)), np.sin(np.deg2rad(ficha.angulo))
+    largo = np.array([coseno, seno]) * LARGO_FICHA / 2
+    ancho = np.array([-seno, coseno]) * ANCHO_FICHA / 2
+    centro = np.array([ficha.x, ficha.y])
+    esquinas = [mundo_a_pixel(*(centro + sl * largo + sa * ancho)) for sl in (1, -1) for sa in (1, -1)]
+    us, vs = zip(*esquinas)
+    bbox = {'x1': min(us), 'y1': min(vs), 'x2': max(us), 'y2': max(vs)}
+    mitades = (mundo_a_pixel(*(centro + largo / 2)), mundo_a_pixel(*(centro - largo / 2)))
+    return bbox, mitades
+
+
+def analizador_de_mesa(sesion):
+    """Analizador con la firma de analizar_tablero que lee el modelo de la mesa de `sesion`."""
+
+    def analizar(directorio_trabajo, ruta_tablero, ruta_jugador, tamaño_ficha, simulacion, mostrar=True):
+        tablero, fichas_jugador_data = [], []
+        for ficha in sesion.robot.fichas:
+            if ficha.en_ventosa:
+                continue
+            bbox, mitades = caja_y_mitades(ficha)
+            if (bbox['y1'] + bbox['y2']) / 2 < OFFSET_JUGADOR_SIMULACION:
+                tablero.append((ficha, bbox, mitades))
+            else:
+                # Coordenadas relativas a la parte inferior; puntuación de arriba a abajo
+                bbox = dict(bbox, y1=bbox['y1'] - OFFSET_JUGADOR_SIMULACION, y2=bbox['y2'] - OFFSET_JUGADOR_SIMULACION)
+                orden = sorted(range(2), key=lambda i: mitades[i][1])
+                fichas_jugador_data.append([bbox, None, 0, [ficha.valores[i] for i in orden]])
+
+        # Extremos de la cadena: la ficha más a la izquierda tiene el vecino a la derecha y viceversa
+        tablero.sort(key=lambda datos: (datos[1]['x1'] + datos[1]['x2']) / 2)
+        fichas_borde_data = []
+        for (ficha, bbox, mitades), vecino, libre in ((tablero[0], 'derecha', min), (tablero[-1], 'izquierda', max)):
+            valor = ficha.valores[libre(range(2), key=lambda i: mitades[i][0])]
+            puntuacion = [valor, valor] if ficha.valores[0] == ficha.valores[1] else valor
+            fichas_borde_data.append([bbox, vecino, 1, puntuacion])
+        posibles_fichas = [datos[3] if isinstance(datos[3], int) else datos[3][0] for datos in fichas_borde_data]
+        return fichas_borde_data, fichas_jugador_data, posibles_fichas
+
+    return analizar
+
+
+def crear_robot_registrado(semilla, acciones):
+    """Crea la mesa y guarda en `acciones` el resultado de cada coger_ficha/soltar_ficha."""
+
+    def crear_robot():
+        robot = DominoRobotLocal(fichas=repartir_mesa(semilla))
+        for nombre in ('coger_ficha', 'soltar_ficha'):
+            accion = getattr(robot, nombre)
+
+            def registrada(accion=accion, nombre=nombre):
+                resultado = accion()
+                acciones.append((nombre, resultado))
+                return resultado
+
+            setattr(robot, nombre, registrada)
+        return robot
+
+    return crear_robot
+
+
+if __name__ == "__main__":
+    directorio = tempfile.mkdtemp(prefix="domibot_local_")
+    mesas = []
+    for semilla in SEMILLAS:
+        acciones = []
+        sesion = SesionMesa(f"mesa{semilla}", crear_robot_registrado(semilla, acciones), jugador=JugadorAutomatico(TURNOS),
+                            directorio_trabajo=os.path.join(directorio, f"mesa{semilla}"), turnos_maximos=TURNOS)
+        mesas.append((sesion, acciones))
+
+    with redirect_stdout(io.StringIO()):
+        hilos = [threading.Thread(target=sesion.ejecutar, args=(analizador_de_mesa(sesion),)) for sesion, _ in mesas]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+    OrquestadorMesas.mostrar_informe([sesion.estadisticas() for sesion, _ in mesas])
+    for sesion, acciones in mesas:
+        estadisticas = sesion.estadisticas()
+        iniciales = repartir_mesa(int(sesion.nombre[len("mesa"):]))
+        movidas = [(antes, despues) for antes, despues in zip(iniciales, sesion.robot.fichas)
+                   if (antes.x, antes.y) != (despues.x, despues.y)]
+        print(f"{sesion.nombre}: acciones de la ventosa {acciones}")
+        for antes, despues in movidas:
+            print(f"  {despues.valores}: ({antes.x:.3f}, {antes.y:.3f}) -> ({despues.x:.3f}, {despues.y:.3f}) {despues.angulo:.1f}°")
+
+        assert estadisticas['error'] is None, f"{sesion.nombre}: {estadisticas['error']}"
+        assert estadisticas['fichas_jugadas'] > 0, f"{sesion.nombre}: no se ha jugado ninguna ficha"
+        assert acciones and all(resultado for _, resultado in acciones), f"{sesion.nombre}: la ventosa ha fallado: {acciones}"
+        assert len(acciones) == 2 * estadisticas['fichas_jugadas']
+        assert len(movidas) == estadisticas['fichas_jugadas'], f"{sesion.nombre}: se han movido {len(movidas)} fichas"
+        for _, despues in movidas:
+            _, v = mundo_a_pixel(despues.x, despues.y)
+            assert v < OFFSET_JUGADOR_SIMULACION, f"{sesion.nombre}: la ficha {despues} no ha llegado al tablero"
+        assert estadisticas['segundos_simulados'] is not None and estadisticas['segundos_simulados'] > 0
+
+    print("OK")